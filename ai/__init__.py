@@ -1,5 +1,14 @@
-"""AI helpers for pegy: thin client and prompt helpers."""
+"""AI helpers for pegy: thin client, prompt helpers and a background summary worker."""
 
-from .client import generate_company_summary, get_cached_summary, clear_cache
+from .client import generate_company_summary, get_cached_summary, get_cached_summaries, clear_cache
+from .worker import SummaryWorker, SummaryJob, get_worker
 
-__all__ = ["generate_company_summary", "get_cached_summary", "clear_cache"]
+__all__ = [
+    "generate_company_summary",
+    "get_cached_summary",
+    "get_cached_summaries",
+    "clear_cache",
+    "SummaryWorker",
+    "SummaryJob",
+    "get_worker",
+]
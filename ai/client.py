@@ -1,63 +1,118 @@
-from dotenv import load_dotenv
 import os
 import json
 from pathlib import Path
+import threading
 import time
 import typing as t
 
-try:
-    import openai
-except Exception:
-    openai = None
+from core.metrics import metrics
+from core.singleflight import summaries_flight
 
-# New OpenAI client (openai>=1.0) exposes OpenAI class
-try:
-    from openai import OpenAI as OpenAIClient
-except Exception:
-    OpenAIClient = None
+from .store import SummaryStore
 
 # Cache directory
 CACHE_DIR = Path(__file__).resolve().parent / "cache"
-CACHE_DIR.mkdir(parents=True, exist_ok=True)
+SUMMARY_DB = Path(os.environ.get("PEGY_SUMMARY_DB", CACHE_DIR / "summaries.sqlite"))
 
-# load .env file if present
-load_dotenv()
+# Bump when the prompt changes so older summaries are regenerated.
+PROMPT_VERSION = "1"
 
+# The OpenAI SDK (and `.env`) are loaded by `_load_openai` on the first
+# summary request: importing openai takes longer than the rest of the app.
+openai = None
+OpenAIClient = None
+_openai_loaded = False
+_openai_lock = threading.Lock()
 
-def _cache_path(symbol: str) -> Path:
-    return CACHE_DIR / f"{symbol.upper()}.json"
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> SummaryStore:
+    """Return the process-wide summary store, opening it on first use.
+
+    The first open also imports summaries left as `ai/cache/<SYMBOL>.json`
+    by older versions (each file once; see `SummaryStore.import_json_dir`).
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = SummaryStore(SUMMARY_DB, PROMPT_VERSION)
+            if CACHE_DIR.is_dir():
+                _store.import_json_dir(CACHE_DIR)
+        return _store
 
 
 def get_cached_summary(symbol: str) -> t.Optional[dict]:
-    p = _cache_path(symbol)
-    if p.exists():
-        try:
-            return json.loads(p.read_text(encoding="utf-8"))
-        except Exception:
-            return None
-    return None
+    doc = get_store().get(symbol)
+    metrics.incr("cache.summary.hit" if doc else "cache.summary.miss")
+    return doc
+
+
+def get_cached_summaries(symbols: t.Iterable[str]) -> t.Dict[str, dict]:
+    """Return `{SYMBOL: summary}` for every symbol with a cached summary, in one lookup."""
+    symbols = list(symbols)
+    found = get_store().get_many(symbols)
+    metrics.incr("cache.summary.hit", len(found))
+    metrics.incr("cache.summary.miss", len({s.upper() for s in symbols}) - len(found))
+    return found
 
 
 def clear_cache(symbol: t.Optional[str] = None):
-    if symbol:
-        p = _cache_path(symbol)
-        if p.exists():
-            p.unlink()
-    else:
-        for f in CACHE_DIR.glob("*.json"):
-            try:
-                f.unlink()
-            except Exception:
-                pass
+    get_store().delete(symbol)
+
+
+def _load_openai():
+    global openai, OpenAIClient, _openai_loaded
+    with _openai_lock:
+        if _openai_loaded:
+            return
+        try:
+            from dotenv import load_dotenv
+
+            # load .env file if present
+            load_dotenv()
+        except Exception:
+            pass
+        try:
+            import openai
+        except Exception:
+            openai = None
+        # New OpenAI client (openai>=1.0) exposes OpenAI class
+        try:
+            from openai import OpenAI as OpenAIClient
+        except Exception:
+            OpenAIClient = None
+        _openai_loaded = True
 
 
 def _ensure_openai():
+    _load_openai()
     if openai is None:
         raise RuntimeError("openai package not installed. Add openai to requirements.txt and reinstall.")
     if not os.environ.get("OPENAI_API_KEY"):
         raise RuntimeError("OPENAI_API_KEY not set in environment. Export your key and retry.")
 
 
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Return the process-wide OpenAI client, creating it on first use.
+
+    The client holds a pooled HTTP connection, so sharing one instance keeps
+    connections alive across summaries and threads. SDK-level retries are
+    off: `ai.worker.SummaryWorker` owns the retry/backoff policy.
+    """
+    global _client
+    _load_openai()
+    with _client_lock:
+        if _client is None:
+            _client = OpenAIClient(max_retries=0)
+        return _client
+
+
 def _build_prompt(symbol: str, company_name: t.Optional[str]) -> str:
     display_name = company_name or symbol
     # Template: request JSON only with the requested fields
@@ -84,22 +139,31 @@ Return valid JSON only, for example:
 def generate_company_summary(symbol: str, company_name: t.Optional[str] = None, model: str = "gpt-4o-mini", timeout: int = 30) -> dict:
     """Generate a 5-field summary for a company via OpenAI and cache result locally.
 
-    Caches results to `ai/cache/<SYMBOL>.json`.
-    Requires `OPENAI_API_KEY` env var and the `openai` package.
+    Caches results in the summary store (`ai/cache/summaries.sqlite`).
+    Requires `OPENAI_API_KEY` env var and the `openai` package. Concurrent
+    requests for the same symbol (from any session) share one OpenAI call.
     """
     sym = symbol.upper()
     cached = get_cached_summary(sym)
     if cached:
         return cached
+    return summaries_flight.do(sym, _request, sym, symbol, company_name, model, timeout)
+
 
+def _request(sym, symbol, company_name, model, timeout) -> dict:
     _ensure_openai()
+    metrics.incr("ai.generate.requests")
+    with metrics.timer("ai.generate", key=sym):
+        return _generate(sym, symbol, company_name, model, timeout)
+
 
+def _generate(sym, symbol, company_name, model, timeout) -> dict:
     prompt = _build_prompt(sym, company_name)
 
     # Use new OpenAI client if available; otherwise fall back to older APIs
     try:
         if OpenAIClient is not None:
-            client = OpenAIClient()
+            client = get_client()
             resp = client.chat.completions.create(
                 model=model,
                 messages=[{"role": "system", "content": "You are a concise analyst."},
@@ -153,9 +217,9 @@ def generate_company_summary(symbol: str, company_name: t.Optional[str] = None,
                 raise
 
         # Persist to cache
-        p = _cache_path(sym)
-        p.write_text(json.dumps(doc, ensure_ascii=False, indent=2), encoding="utf-8")
+        get_store().put(sym, doc, model=model)
         return doc
 
     except Exception as e:
-        raise RuntimeError(f"AI summary generation failed for {symbol}: {e}")
+        metrics.incr("ai.generate.errors")
+        raise RuntimeError(f"AI summary generation failed for {symbol}: {e}") from e
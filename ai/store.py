@@ -0,0 +1,151 @@
+import json
+import sqlite3
+import threading
+import time
+import typing as t
+from collections import OrderedDict
+from pathlib import Path
+
+# Summaries older than this are regenerated.
+DEFAULT_TTL = 30 * 24 * 3600
+DEFAULT_LRU_SIZE = 4096
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS summaries (
+    symbol TEXT PRIMARY KEY,
+    doc TEXT NOT NULL,
+    model TEXT,
+    prompt_version TEXT,
+    created_at REAL NOT NULL
+)
+"""
+
+
+class SummaryStore:
+    """AI summaries in one SQLite file with an in-process LRU in front.
+
+    Each summary is stored with the model and prompt version that produced
+    it and its creation time; entries past `ttl` or from another prompt
+    version read as missing. Writes are single transactions, so concurrent
+    sessions (threads or processes) never see half-written entries. The LRU
+    only holds hits, so summaries written by other processes are picked up
+    on the next lookup.
+    """
+
+    def __init__(self, path: t.Union[str, Path], prompt_version: str, ttl: t.Optional[float] = DEFAULT_TTL,
+                 lru_size: int = DEFAULT_LRU_SIZE):
+        self.path = Path(path)
+        self.prompt_version = prompt_version
+        self.ttl = ttl
+        self.lru_size = lru_size
+        self._lru: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._conn() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            self._local.conn = conn
+        return conn
+
+    def _fresh(self, prompt_version, created_at, now) -> bool:
+        if prompt_version != self.prompt_version:
+            return False
+        return self.ttl is None or now - created_at <= self.ttl
+
+    def _remember(self, symbol, entry):
+        with self._lock:
+            self._lru[symbol] = entry
+            self._lru.move_to_end(symbol)
+            while len(self._lru) > self.lru_size:
+                self._lru.popitem(last=False)
+
+    def get_many(self, symbols: t.Iterable[str]) -> t.Dict[str, dict]:
+        """Return `{symbol: doc}` for every symbol with a fresh summary."""
+        now = time.time()
+        out: t.Dict[str, dict] = {}
+        todo = []
+        with self._lock:
+            for sym in {s.upper() for s in symbols}:
+                entry = self._lru.get(sym)
+                if entry is not None and self._fresh(entry[1], entry[2], now):
+                    self._lru.move_to_end(sym)
+                    out[sym] = entry[0]
+                else:
+                    todo.append(sym)
+
+        conn = self._conn()
+        for i in range(0, len(todo), 500):
+            chunk = todo[i:i + 500]
+            rows = conn.execute(
+                f"SELECT symbol, doc, prompt_version, created_at FROM summaries WHERE symbol IN ({','.join('?' * len(chunk))})",
+                chunk,
+            ).fetchall()
+            for sym, doc, prompt_version, created_at in rows:
+                if not self._fresh(prompt_version, created_at, now):
+                    continue
+                try:
+                    entry = (json.loads(doc), prompt_version, created_at)
+                except ValueError:
+                    continue
+                self._remember(sym, entry)
+                out[sym] = entry[0]
+        return out
+
+    def get(self, symbol: str) -> t.Optional[dict]:
+        return self.get_many([symbol]).get(symbol.upper())
+
+    def put(self, symbol: str, doc: dict, model: t.Optional[str] = None, created_at: t.Optional[float] = None):
+        sym = symbol.upper()
+        created_at = time.time() if created_at is None else created_at
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO summaries (symbol, doc, model, prompt_version, created_at) VALUES (?, ?, ?, ?, ?)",
+                (sym, json.dumps(doc, ensure_ascii=False), model, self.prompt_version, created_at),
+            )
+        self._remember(sym, (doc, self.prompt_version, created_at))
+
+    def delete(self, symbol: t.Optional[str] = None):
+        """Delete one symbol's summary, or all summaries when `symbol` is None."""
+        with self._conn() as conn:
+            if symbol is None:
+                conn.execute("DELETE FROM summaries")
+            else:
+                conn.execute("DELETE FROM summaries WHERE symbol = ?", (symbol.upper(),))
+        with self._lock:
+            if symbol is None:
+                self._lru.clear()
+            else:
+                self._lru.pop(symbol.upper(), None)
+
+    def import_json_dir(self, directory: t.Union[str, Path], model: t.Optional[str] = None) -> int:
+        """Import legacy `<SYMBOL>.json` summary files not already in the store.
+
+        Each file is renamed to `<SYMBOL>.json.migrated` once imported, so
+        the import runs once per file and a summary deleted from the store
+        doesn't come back on the next start. Unreadable files are left as
+        they are.
+        """
+        count = 0
+        for f in sorted(Path(directory).glob("*.json")):
+            sym = f.stem.upper()
+            try:
+                doc = json.loads(f.read_text(encoding="utf-8"))
+            except Exception:
+                continue
+            with self._conn() as conn:
+                cur = conn.execute(
+                    "INSERT OR IGNORE INTO summaries (symbol, doc, model, prompt_version, created_at) VALUES (?, ?, ?, ?, ?)",
+                    (sym, json.dumps(doc, ensure_ascii=False), model, self.prompt_version, f.stat().st_mtime),
+                )
+                count += cur.rowcount
+            try:
+                f.replace(f.with_name(f.name + ".migrated"))
+            except OSError:
+                pass
+        return count
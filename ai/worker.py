@@ -0,0 +1,154 @@
+import random
+import threading
+import time
+import typing as t
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from .client import generate_company_summary, get_cached_summaries
+
+# Concurrent OpenAI requests per process.
+DEFAULT_CONCURRENCY = 4
+DEFAULT_MAX_RETRIES = 5
+
+
+class SummaryJob:
+    """Progress of one batch of summary requests."""
+
+    def __init__(self, symbols: t.Sequence[str]):
+        self.id = uuid.uuid4().hex
+        self.symbols = list(symbols)
+        self.done: t.List[str] = []
+        self.failed: t.Dict[str, str] = {}
+        self.retries = 0
+        self.created_at = time.time()
+        self._lock = threading.Lock()
+
+    @property
+    def total(self) -> int:
+        return len(self.symbols)
+
+    @property
+    def finished(self) -> bool:
+        return len(self.done) + len(self.failed) >= self.total
+
+    @property
+    def progress(self) -> float:
+        return 1.0 if not self.total else (len(self.done) + len(self.failed)) / self.total
+
+
+def _retry_after(exc: BaseException) -> t.Optional[float]:
+    """Return the delay to wait before retrying `exc`, or None if it is not transient.
+
+    Rate limits (429), server errors and connection problems are transient;
+    a `Retry-After` header, when present, sets the delay.
+    """
+    err = exc.__cause__ or exc
+    response = getattr(err, "response", None)
+    status = getattr(err, "status_code", None) or getattr(response, "status_code", None)
+    name = type(err).__name__
+    if status == 429 or (status is not None and status >= 500) or name in ("APIConnectionError", "APITimeoutError"):
+        try:
+            return float(response.headers.get("retry-after"))
+        except Exception:
+            return 0.0
+    return None
+
+
+class SummaryWorker:
+    """Background generator for AI summaries.
+
+    `submit` queues a batch of tickers and returns immediately with a
+    `SummaryJob`; up to `concurrency` summaries are generated at once
+    through the shared OpenAI client. Rate-limited or failed-transiently
+    requests are retried with jittered exponential backoff. Results land in
+    the summary cache, so the UI only needs to poll `get_cached_summary`.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        base_delay: float = 1.0,
+        generate: t.Callable[..., dict] = generate_company_summary,
+    ):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self._generate = generate
+        self._pool = ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="pegy-ai")
+        self._jobs: t.Dict[str, SummaryJob] = {}
+        self._inflight: t.Dict[str, t.List[SummaryJob]] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, symbols: t.Iterable[str], names: t.Optional[t.Dict[str, str]] = None) -> SummaryJob:
+        """Queue summaries for `symbols`.
+
+        Repeated symbols are requested once. Already-cached symbols count as
+        done straight away; symbols another job is already generating are
+        not requested twice, the job just waits for that result.
+        """
+        names = names or {}
+        job = SummaryJob(dict.fromkeys(s.upper() for s in symbols))
+        # one cache read, before taking the worker lock
+        cached = get_cached_summaries(job.symbols) if job.symbols else {}
+        with self._lock:
+            # forget jobs nobody has looked at for an hour
+            cutoff = time.time() - 3600
+            for old_id in [k for k, j in self._jobs.items() if j.finished and j.created_at < cutoff]:
+                del self._jobs[old_id]
+            self._jobs[job.id] = job
+            for sym in job.symbols:
+                if sym in self._inflight:
+                    self._inflight[sym].append(job)
+                elif sym in cached:
+                    job.done.append(sym)
+                else:
+                    self._inflight[sym] = [job]
+                    self._pool.submit(self._run, sym, names.get(sym))
+        return job
+
+    def job(self, job_id: str) -> t.Optional[SummaryJob]:
+        return self._jobs.get(job_id)
+
+    def _run(self, symbol: str, name: t.Optional[str]):
+        error = None
+        retries = 0
+        for attempt in range(self.max_retries + 1):
+            try:
+                self._generate(symbol, name)
+                error = None
+                break
+            except Exception as e:
+                error = e
+                delay = _retry_after(e)
+                if delay is None or attempt == self.max_retries:
+                    break
+                retries += 1
+                # full jitter, but never sooner than the server asked for
+                time.sleep(max(delay, random.uniform(0, self.base_delay * 2 ** attempt)))
+
+        with self._lock:
+            waiting = self._inflight.pop(symbol, [])
+        for job in waiting:
+            with job._lock:
+                job.retries += retries
+                if error is None:
+                    job.done.append(symbol)
+                else:
+                    job.failed[symbol] = str(error)
+
+    def shutdown(self, wait: bool = False):
+        self._pool.shutdown(wait=wait, cancel_futures=not wait)
+
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def get_worker() -> SummaryWorker:
+    """Return the process-wide summary worker, starting it on first use."""
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = SummaryWorker()
+        return _worker
@@ -0,0 +1,34 @@
+"""Keep benchmark data out of the real caches.
+
+Call `isolate()` before importing `core`, `ai`, `tickers` or the app
+modules: they read their cache paths from the environment at import time.
+"""
+import os
+import tempfile
+from pathlib import Path
+
+
+def isolate(override: bool = False) -> Path:
+    """Point every on-disk cache at a fresh temp directory and return it.
+
+    Covers the fundamentals store, AI summaries, PEGY history, snapshots,
+    the universe cache and prefetch access counts, and turns off the
+    dashboard's background prefetcher. Variables already set are kept
+    unless `override`.
+    """
+    tmp = Path(tempfile.mkdtemp(prefix="pegy-bench-"))
+    env = {
+        "PEGY_FUNDAMENTALS_DB": tmp / "fundamentals.sqlite",
+        "PEGY_SUMMARY_DB": tmp / "summaries.sqlite",
+        "PEGY_HISTORY_DIR": tmp / "history",
+        "PEGY_SNAPSHOT_DIR": tmp / "snapshots",
+        "PEGY_UNIVERSE_CACHE": tmp / "universes.json",
+        "PEGY_ACCESS_FILE": tmp / "access.json",
+        "PEGY_PREFETCH": "0",
+    }
+    for name, value in env.items():
+        if override:
+            os.environ[name] = str(value)
+        else:
+            os.environ.setdefault(name, str(value))
+    return tmp
@@ -0,0 +1,67 @@
+"""The dashboard's original one-`st.columns`-per-row table layout.
+
+Kept only as the baseline for `bench_render.py`; the app renders
+`display.format_display`'s grid. The per-row AI checkbox still renders,
+but only shows cached summaries: nothing here calls the model.
+"""
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from ai import get_cached_summary
+from core.compute import DEFAULT_HORIZON, horizon_columns, numeric_columns
+from display import _label, _prepare, _safe_key, _ticker_of, pegy_css
+
+
+def rows_display(df, category, offset: int = 0, horizon: str = DEFAULT_HORIZON):
+    """Render `df` row by row, the way `format_display` used to."""
+    disp = _prepare(df)
+    st.subheader(f"{category}")
+
+    # PEGY colors for every row, looked up once
+    pegy_col = horizon_columns(horizon)[2]
+    row_css = pegy_css(disp[pegy_col]) if pegy_col in disp.columns else np.full(len(disp), "", dtype=object)
+
+    display_cols = ["", "Symbol", "Summary", *numeric_columns(horizon)]
+    widths = [0.5, 1.2, 2.0, 1, 1, 1, 1, 1]
+
+    header_cols = st.columns(widths)
+    for i, col_name in enumerate(display_cols):
+        header_cols[i].markdown(f"**{col_name}**")
+
+    for serial, (idx, row) in enumerate(disp.iterrows()):
+        cols = st.columns(widths)
+        style = row_css[serial]
+        if style:
+            html_serial = f"<div style=\"{style} padding:6px; border-radius:4px; text-align:center\">{offset + serial}</div>"
+            cols[0].markdown(html_serial, unsafe_allow_html=True)
+        else:
+            cols[0].markdown(f"**{offset + serial}**")
+
+        ticker = _ticker_of(row, idx)
+        cols[1].markdown(str(_label(row, ticker)).replace("\n", "<br />"), unsafe_allow_html=True)
+
+        for i, col_name in enumerate(display_cols[2:], start=2):
+            val = row.get(col_name, "")
+            if col_name == "Summary":
+                if isinstance(val, dict):
+                    for k, v in val.items():
+                        cols[i].markdown(f"- **{k}**: {v}")
+                elif val is None or pd.isna(val) or str(val).strip() == "":
+                    key = f"summary_{_safe_key(category)}_{_safe_key(ticker)}_{idx}"
+                    if cols[i].checkbox(f"Generate AI summary for {ticker}", key=key):
+                        cached = get_cached_summary(ticker)
+                        for k, v in (cached or {}).items():
+                            cols[i].markdown(f"- **{k}**: {v}")
+                else:
+                    cols[i].write(val)
+            elif pd.isna(val):
+                cols[i].write("")
+            elif isinstance(val, (int, float, np.floating)):
+                if col_name == pegy_col:
+                    html = f"<div style=\"{style} padding:6px; border-radius:4px; text-align:right\">{val:.2f}</div>"
+                    cols[i].markdown(html, unsafe_allow_html=True)
+                else:
+                    cols[i].write(f"{val:.2f}")
+            else:
+                cols[i].write(val)
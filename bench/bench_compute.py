@@ -0,0 +1,104 @@
+"""Micro-benchmark: vectorized `core.compute.compute_pegy` vs the old row loop.
+
+Usage: python bench/bench_compute.py [--rows 1000,10000,100000] [--repeat 3]
+
+Both sides start from the same list of raw per-ticker records. "row loop"
+is the scalar dict-per-ticker code `calculate_pegy` used before the
+fetch/compute split; "vectorized" builds the typed raw frame and computes
+the table; "recompute" only reruns `compute_pegy` on an existing raw frame,
+which is what an input change costs. "speedup" is row loop / vectorized;
+"recompute speedup" is row loop / recompute.
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pandas as pd
+
+from core.compute import Record, compute_pegy, raw_frame
+
+
+def synthetic_records(n, seed=0):
+    rng = random.Random(seed)
+    return [
+        {
+            "Ticker": f"T{i:05d}",
+            "Name": f"Company {i}",
+            "forwardPE": rng.choice([None, 0.0]) if rng.random() < 0.05 else rng.uniform(-10, 80),
+            "dividendYield": rng.uniform(0, 4) if rng.random() < 0.6 else None,
+            "growth_1y": rng.uniform(-0.2, 0.6),
+            "snp_growth_1y": rng.uniform(0.05, 0.15),
+        }
+        for i in range(n)
+    ]
+
+
+def as_records(records):
+    """The same inputs as the `Record`s the pipeline builds."""
+    return [
+        Record.from_fundamentals(r["Ticker"], {
+            "shortName": r["Name"],
+            "forwardPE": r["forwardPE"],
+            "dividendYield": r["dividendYield"],
+            "growth_estimates": {"stockTrend": {"+1y": r["growth_1y"]}, "indexTrend": {"+1y": r["snp_growth_1y"]}},
+        })
+        for r in records
+    ]
+
+
+def row_loop(records):
+    """The pre-vectorization per-ticker computation, kept for comparison."""
+    data = []
+    for r in records:
+        forward_pe = r["forwardPE"] or 0
+        dividend = r["dividendYield"] or 0
+        growth_1y = r["growth_1y"]
+        snp_growth_1y = r["snp_growth_1y"]
+        dividend_pct = dividend * 100 if dividend else 0
+        growth_1y_pct = growth_1y * 100 if growth_1y else None
+        snp_growth_1y_pct = snp_growth_1y * 100 if snp_growth_1y else None
+        pegy_1y = abs(forward_pe) / (growth_1y_pct + dividend) if forward_pe and growth_1y_pct else None
+        data.append({
+            "Symbol": r["Ticker"] + " - " + (r["Name"] or ""),
+            "Forward P/E": round(forward_pe, 2) if forward_pe else None,
+            "Growth 1Y %": round(growth_1y_pct, 4) if growth_1y_pct else None,
+            "Growth 1Y / S&P 500": round(growth_1y_pct / snp_growth_1y_pct, 4) if snp_growth_1y else None,
+            "Dividend %": round(dividend_pct, 2) if dividend_pct else None,
+            "PEGY-1Y": round(pegy_1y, 2) if pegy_1y else None,
+        })
+    return pd.DataFrame(data)
+
+
+def _best(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", default="1000,10000,100000")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    print(f"{'rows':>8} {'row loop ms':>12} {'vectorized ms':>14} {'speedup':>8} {'recompute ms':>13} {'recompute speedup':>18}")
+    for n in (int(r) for r in args.rows.split(",")):
+        records = synthetic_records(n)
+        typed = as_records(records)
+        raw = raw_frame(typed)
+        loop_ms = _best(lambda: row_loop(records), args.repeat)
+        vec_ms = _best(lambda: compute_pegy(raw_frame(typed)), args.repeat)
+        re_ms = _best(lambda: compute_pegy(raw), args.repeat)
+        print(f"{n:>8} {loop_ms:>12.1f} {vec_ms:>14.1f} {loop_ms / vec_ms:>7.1f}x {re_ms:>13.2f}"
+              f" {loop_ms / re_ms:>17.1f}x")
+
+
+if __name__ == "__main__":
+    main()
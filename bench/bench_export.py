@@ -0,0 +1,127 @@
+"""Benchmark `core.export` (chunked) against exporting the whole table at once.
+
+Usage: python bench/bench_export.py [--rows 5000,50000] [--chunk-rows 5000]
+
+For a synthetic table (fields from `FakeBackend`, an AI summary on every
+row), writes every format to a temp file twice:
+
+- whole: flatten every summary into the table, then one `to_csv` /
+  `to_parquet` / `to_json` call, as a one-off script over the table would;
+- chunked: `core.export.export_table` with `--chunk-rows`.
+
+Each run happens in a fresh process, which reports the wall time and its
+peak resident memory above what it used once the table was built
+(sampled from `/proc/self/statm`, so Linux only; Arrow's buffers are
+invisible to `tracemalloc`). The chunked peak should stay roughly flat as
+the table grows.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.backends import FakeBackend
+from core.compute import Record, compute_pegy, raw_frame
+from core.export import FORMATS, SUMMARY_FIELDS, export_table
+
+SUMMARY = {"Overview": "Makes things people buy, at scale.", "Core Products": ["a", "b", "c", "d", "e"],
+           "Vision": "More of the same.", "Accomplishment": "Shipped on time.", "Why": "Steady compounding."}
+
+
+def _table(n):
+    backend = FakeBackend()
+    tickers = [f"T{i:05d}" for i in range(n)]
+    quotes = backend.quotes(tickers)
+    df = compute_pegy(raw_frame([Record.from_fundamentals(tk, dict(quotes[tk], growth_estimates=backend.growth_estimates(tk)))
+                                 for tk in tickers]))
+    df.insert(2, "Summary", [dict(SUMMARY) for _ in range(n)])
+    df["Fetched At"] = time.time()
+    return df
+
+
+def _whole(df, path, fmt):
+    out = df.drop(columns="Summary")
+    for field in SUMMARY_FIELDS:
+        values = [doc.get(field) for doc in df["Summary"]]
+        out[f"Summary {field}"] = ["; ".join(v) if isinstance(v, list) else v for v in values]
+    if fmt == "csv":
+        out.to_csv(path, index=False)
+    elif fmt == "parquet":
+        out.to_parquet(path, index=False)
+    else:
+        out.to_json(path, orient="records", lines=True)
+
+
+def _rss() -> int:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def _measure(fn):
+    """`(seconds, peak RSS bytes above the RSS before)` of calling `fn`."""
+    base = peak = _rss()
+    done = threading.Event()
+
+    def _sample():
+        nonlocal peak
+        while not done.wait(0.002):
+            peak = max(peak, _rss())
+
+    sampler = threading.Thread(target=_sample)
+    sampler.start()
+    began = time.perf_counter()
+    try:
+        fn()
+    finally:
+        seconds = time.perf_counter() - began
+        done.set()
+        sampler.join()
+    return seconds, max(peak, _rss()) - base
+
+
+def _run(n, fmt, method, chunk_rows):
+    df = _table(n)
+    path = Path(tempfile.mkdtemp()) / f"export.{fmt}"
+    # warm-up: first-use imports (pyarrow.parquet, ...) aren't part of either run
+    export_table(df.iloc[:10], path, summaries=False)
+    if method == "whole":
+        seconds, peak = _measure(lambda: _whole(df, path, fmt))
+    else:
+        seconds, peak = _measure(lambda: export_table(df, path, chunk_rows=chunk_rows))
+    return {"seconds": seconds, "peak": peak, "size": os.path.getsize(path)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", default="5000,50000")
+    parser.add_argument("--chunk-rows", type=int, default=5000)
+    parser.add_argument("--child", nargs=3, metavar=("ROWS", "FORMAT", "METHOD"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        n, fmt, method = args.child
+        print(json.dumps(_run(int(n), fmt, method, args.chunk_rows)))
+        return
+
+    def _child(n, fmt, method):
+        out = subprocess.run([sys.executable, __file__, "--chunk-rows", str(args.chunk_rows), "--child", str(n), fmt, method],
+                             check=True, capture_output=True, text=True).stdout
+        return json.loads(out.strip().splitlines()[-1])
+
+    print(f"{'rows':>7} {'format':>8} {'whole s':>8} {'chunked s':>10} {'whole MB':>9} {'chunked MB':>11} {'file MB':>8}")
+    for n in (int(r) for r in args.rows.split(",")):
+        for fmt in FORMATS:
+            whole, chunked = _child(n, fmt, "whole"), _child(n, fmt, "chunked")
+            print(f"{n:>7} {fmt:>8} {whole['seconds']:>8.2f} {chunked['seconds']:>10.2f} {whole['peak'] / 1e6:>9.1f}"
+                  f" {chunked['peak'] / 1e6:>11.1f} {chunked['size'] / 1e6:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Benchmark `calculate_pegy` fetch concurrency and batching against a fake backend.
+
+Usage: python bench/bench_fetch.py [--tickers 40] [--latency 0.2] [--workers 1,2,4,8,16] [--batch-size 1,50]
+
+Installs `core.backends.FakeBackend` (every request sleeps `--latency`
+seconds) and times a full `calculate_pegy` run for every batch size and
+worker count, printing how many backend requests each run made. Wall time
+should fall roughly as tickers / workers, and quote requests as
+tickers / batch size.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from _env import isolate
+
+isolate()
+
+import calculate_pegy as cp
+from core.backends import FakeBackend, set_backend
+from core.store import get_store
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tickers", type=int, default=40)
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds per fake backend request")
+    parser.add_argument("--workers", default="1,2,4,8,16")
+    parser.add_argument("--batch-size", default="1,50", help="symbols per quote request")
+    args = parser.parse_args(argv)
+
+    # call the undecorated function so st.cache_data doesn't short-circuit runs
+    run = getattr(cp.calculate_pegy, "__wrapped__", cp.calculate_pegy)
+    tickers = tuple(f"T{i:04d}" for i in range(args.tickers))
+
+    print(f"{'batch':>6} {'workers':>8} {'wall s':>8} {'tickers/s':>10} {'speedup':>8} {'quote req':>10} {'growth req':>11}")
+    for batch_size in (int(b) for b in args.batch_size.split(",")):
+        base = None
+        for workers in (int(w) for w in args.workers.split(",")):
+            backend = FakeBackend(latency=args.latency, batch_size=batch_size)
+            set_backend(backend)
+            get_store().invalidate(tickers)
+            start = time.perf_counter()
+            df = run(tickers, max_workers=workers)
+            wall = time.perf_counter() - start
+            assert list(df["Ticker"]) == list(tickers), "rows out of order"
+            base = base or wall
+            print(
+                f"{batch_size:>6} {workers:>8} {wall:>8.2f} {len(tickers) / wall:>10.1f} {base / wall:>7.1f}x"
+                f" {backend.requests['quotes']:>10} {backend.requests['growth_estimates']:>11}"
+            )
+
+
+if __name__ == "__main__":
+    main()
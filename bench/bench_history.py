@@ -0,0 +1,82 @@
+"""Benchmark `core.history.HistoryStore` as the history grows.
+
+Usage: python bench/bench_history.py [--days 1095] [--symbols 3000] [--per-day 2] [--dir DIR]
+
+Appends `--per-day` synthetic snapshots of `--symbols` tickers for each of
+`--days` consecutive days (as a cron'd `precompute.py` would) and, at a few
+checkpoints, times an append, a one-year range query for one symbol, a
+90-day query for 50 symbols and 50 sparklines, with the bytes stored per
+row. All of these should stay flat as the history grows.
+"""
+import argparse
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+import pandas as pd
+
+from core.history import DAY, VALUE_COLUMNS, HistoryStore
+
+
+def _snapshot(symbols, ts, rng):
+    frame = pd.DataFrame({c: rng.uniform(-3, 8, len(symbols)) for c in VALUE_COLUMNS})
+    frame.insert(0, "Ticker", symbols)
+    frame["Error"] = None
+    frame["Fetched At"] = float(ts)
+    return frame
+
+
+def _ms(fn, repeat=5):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, default=1095)
+    parser.add_argument("--symbols", type=int, default=3000)
+    parser.add_argument("--per-day", type=int, default=2)
+    parser.add_argument("--dir", help="history directory (default: a temporary one, removed afterwards)")
+    args = parser.parse_args(argv)
+
+    path = Path(args.dir or tempfile.mkdtemp(prefix="pegy-history-"))
+    rng = np.random.default_rng(0)
+    symbols = [f"T{i:05d}" for i in range(args.symbols)]
+    sample = symbols[:: max(1, args.symbols // 50)][:50]
+    store = HistoryStore(path)
+    start_ts = time.time() - args.days * DAY
+    checkpoints = {d for d in (1, 30, 90, 365, 730, args.days) if d <= args.days}
+
+    print(f"{'days':>5} {'rows':>10} {'append ms':>10} {'1y/1 sym ms':>12} {'90d/50 sym ms':>14}"
+          f" {'sparklines ms':>14} {'bytes/row':>10}")
+    rows = 0
+    try:
+        for day in range(args.days):
+            for k in range(args.per_day):
+                ts = start_ts + day * DAY + k * DAY // args.per_day
+                frame = _snapshot(symbols, ts, rng)
+                began = time.perf_counter()
+                rows += store.append(frame, now=ts)
+                append_ms = (time.perf_counter() - began) * 1000
+            if day + 1 in checkpoints:
+                now = start_ts + (day + 1) * DAY
+                one = _ms(lambda: store.query([symbols[0]], start=now - 365 * DAY, end=now))
+                many = _ms(lambda: store.query(sample, start=now - 90 * DAY, end=now))
+                spark = _ms(lambda: store.sparklines(sample, now=now))
+                stats = store.stats()
+                print(f"{day + 1:>5} {rows:>10} {append_ms:>10.1f} {one:>12.1f} {many:>14.1f}"
+                      f" {spark:>14.1f} {stats['bytes'] / rows:>10.1f}")
+    finally:
+        if not args.dir:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
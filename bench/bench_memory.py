@@ -0,0 +1,86 @@
+"""Per-row memory of the fetch records and the PEGY table, before and after the compact row model.
+
+Usage: python bench/bench_memory.py [--rows 5000,20000]
+
+For synthetic universes (fields from `FakeBackend`), measures with
+`tracemalloc`:
+
+- records: the per-ticker objects held while a fetch runs. Before, one
+  dict per ticker with the raw fields; now a slotted `core.compute.Record`.
+- table: `memory_usage(deep=True)` of the final table. Before, a string
+  `Ticker` column plus a `Symbol` column concatenating ticker and name
+  (rebuilt here from the new table); now categorical `Ticker` and `Name`.
+- peak: the allocation peak of building the table from the records.
+"""
+import argparse
+import sys
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pandas as pd
+
+from core.backends import FakeBackend
+from core.compute import HORIZONS, RAW_COLUMNS, Record, compute_pegy, raw_frame
+
+
+def _fields(n):
+    backend = FakeBackend()
+    tickers = [f"T{i:05d}" for i in range(n)]
+    quotes = backend.quotes(tickers)
+    return [(tk, dict(quotes[tk], growth_estimates=backend.growth_estimates(tk))) for tk in tickers]
+
+
+def _old_record(ticker, info):
+    """The dict record `_raw_record` returned before `Record`."""
+    stock, index = info["growth_estimates"]["stockTrend"], info["growth_estimates"]["indexTrend"]
+    out = {"Ticker": ticker, "Name": info.get("shortName"), "forwardPE": info.get("forwardPE"),
+           "dividendYield": info.get("dividendYield")}
+    for period, label in HORIZONS.items():
+        out[f"growth_{label.lower()}"] = stock.get(period)
+        out[f"snp_growth_{label.lower()}"] = index.get(period)
+    return out
+
+
+def _old_table(records):
+    """Raw frame and table in the old layout (string columns, concatenated Symbol)."""
+    dtypes = dict(RAW_COLUMNS, Ticker="string", Name="string")
+    raw = pd.DataFrame.from_records(records, columns=list(dtypes)).astype(dtypes)
+    table = compute_pegy(raw.astype({"Ticker": "category", "Name": "category"}))
+    table["Ticker"] = raw["Ticker"]
+    table.insert(0, "Symbol", raw["Ticker"] + " - " + raw["Name"].fillna(""))
+    return table.drop(columns="Name")
+
+
+def _allocated(build):
+    """`(result, bytes still allocated, peak bytes)` of calling `build`."""
+    tracemalloc.start()
+    result = build()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, peak
+
+
+def _table_bytes(df):
+    return int(df.memory_usage(deep=True, index=False).sum())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", default="5000,20000")
+    args = parser.parse_args(argv)
+
+    print(f"{'rows':>7} {'layout':>7} {'records B/row':>14} {'table B/row':>12} {'build peak B/row':>17}")
+    for n in (int(r) for r in args.rows.split(",")):
+        fields = _fields(n)
+        old, old_bytes, _ = _allocated(lambda: [_old_record(tk, info) for tk, info in fields])
+        new, new_bytes, _ = _allocated(lambda: [Record.from_fundamentals(tk, info) for tk, info in fields])
+        old_table, _, old_peak = _allocated(lambda: _old_table(old))
+        new_table, _, new_peak = _allocated(lambda: compute_pegy(raw_frame(new)))
+        for layout, rec, table, peak in (("old", old_bytes, old_table, old_peak), ("new", new_bytes, new_table, new_peak)):
+            print(f"{n:>7} {layout:>7} {rec / n:>14.0f} {_table_bytes(table) / n:>12.0f} {peak / n:>17.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Benchmark interactive fetch latency with and without the background prefetcher.
+
+Usage: python bench/bench_prefetch.py [--tickers 300] [--users 4] [--duration 20] [--latency 0.05]
+                                      [--ttl 4]
+
+Runs on a time-compressed clock: every store TTL is scaled down so
+`forwardPE` expires after `--ttl` seconds (the others keep their ratios to
+it, capped at 4x). Simulated users then call the dashboard pipeline
+(`core.pipeline.calculate`) for a hot watchlist or a random slice of the
+universe every half second, against a `FakeBackend` with `--latency` per
+request. With the prefetcher (passes every 0.5 s, re-fetching fields within
+half a TTL of expiry), nearly every user call should find the store warm.
+"""
+import argparse
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from _env import isolate
+
+isolate()
+
+import numpy as np
+
+from core.backends import FakeBackend, set_backend
+from core.pipeline import calculate
+from core.prefetch import Prefetcher
+from core.store import DEFAULT_TTLS, get_store
+
+
+def _users(tickers, users, duration, prefetcher=None):
+    hot = tickers[:30]
+    store = get_store()
+    latencies, warm = [], []
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def _user(i):
+        rng = random.Random(i)
+        while time.monotonic() < deadline:
+            if rng.random() < 0.6:
+                wanted = hot
+            else:
+                start = rng.randrange(len(tickers) - 50)
+                wanted = tickers[start:start + 50]
+            if prefetcher is not None:
+                prefetcher.record_access(wanted)
+            # warm: every field was fresh in the store when the call started
+            hit = not store.missing(wanted)
+            began = time.perf_counter()
+            calculate(tuple(wanted), max_workers=8)
+            with lock:
+                latencies.append((time.perf_counter() - began) * 1000)
+                warm.append(hit)
+            time.sleep(0.5)
+
+    threads = [threading.Thread(target=_user, args=(i,)) for i in range(users)]
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join()
+    return np.array(latencies), np.array(warm)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tickers", type=int, default=300)
+    parser.add_argument("--users", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--ttl", type=float, default=4.0, help="forwardPE TTL on the compressed clock")
+    args = parser.parse_args(argv)
+
+    store = get_store()
+    scale = args.ttl / DEFAULT_TTLS["forwardPE"]
+    store.ttls = {f: min(ttl * scale, 4 * args.ttl) for f, ttl in DEFAULT_TTLS.items()}
+    tickers = [f"T{i:04d}" for i in range(args.tickers)]
+
+    print(f"{'prefetch':>9} {'calls':>6} {'warm %':>7} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} {'yahoo req':>10}")
+    for enabled in (False, True):
+        backend = FakeBackend(latency=args.latency)
+        set_backend(backend)
+        store.invalidate()
+        # start from a warm store, as a running dashboard would
+        calculate(tuple(tickers))
+        backend.requests.clear()
+
+        prefetcher = None
+        if enabled:
+            prefetcher = Prefetcher(lambda: tickers, interval=0.5, ahead=args.ttl / 2, budget=100,
+                                    max_workers=4, access_path=None)
+            prefetcher.start()
+        lat, warm = _users(tickers, args.users, args.duration, prefetcher)
+        if prefetcher is not None:
+            prefetcher.stop(wait=True)
+        print(f"{'on' if enabled else 'off':>9} {len(lat):>6} {100 * warm.mean():>7.1f}"
+              f" {np.percentile(lat, 50):>8.1f} {np.percentile(lat, 95):>8.1f} {lat.max():>8.1f}"
+              f" {sum(backend.requests.values()):>10}")
+    set_backend(None)
+
+
+if __name__ == "__main__":
+    main()
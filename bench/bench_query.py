@@ -0,0 +1,70 @@
+"""Benchmark `core.query.run_query` against the old copy-and-sort-everything path.
+
+Usage: python bench/bench_query.py [--rows 5000,20000,50000] [--repeat 20]
+
+For synthetic PEGY tables, times one rerun's worth of screening: the old
+path (copy the frame, add an `_abs_pegy` column, sort all rows) against
+`run_query` returning one 50-row page, for the default |PEGY| sort, a deep
+page, and a filtered screen.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+import pandas as pd
+
+from core.query import Query, run_query
+
+
+def _frame(rows):
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "Ticker": pd.Categorical([f"T{i:05d}" for i in range(rows)]),
+        "Name": pd.Categorical([f"Company {i}" for i in range(rows)]),
+        "Summary": [None] * rows,
+        "Forward P/E": rng.uniform(5, 60, rows),
+        "Growth 1Y %": rng.uniform(-20, 60, rows),
+        "Growth 1Y / S&P 500": rng.uniform(-2, 6, rows),
+        "Dividend %": np.where(rng.random(rows) < 0.4, np.nan, rng.uniform(0, 4, rows)),
+        "PEGY-1Y": np.where(rng.random(rows) < 0.05, np.nan, rng.uniform(-3, 8, rows)),
+    })
+
+
+def _old(df):
+    df_sorted = df.copy()
+    df_sorted["_abs_pegy"] = df_sorted["PEGY-1Y"].abs()
+    return df_sorted.sort_values(by=["_abs_pegy"], na_position="last").drop(columns=["_abs_pegy"]).reset_index(drop=True)
+
+
+def _ms(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", default="5000,20000,50000")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    cases = {
+        "first page": Query(),
+        "page 40": Query(page=40),
+        "screen": Query(pegy_min=0, pegy_max=1, min_dividend=1, sort="Growth 1Y %", ascending=False),
+    }
+    print(f"{'rows':>7} {'old sort ms':>12} " + " ".join(f"{name + ' ms':>14}" for name in cases))
+    for rows in (int(r) for r in args.rows.split(",")):
+        df = _frame(rows)
+        old = _ms(lambda: _old(df), args.repeat)
+        new = [_ms(lambda q=q: run_query(df, q), args.repeat) for q in cases.values()]
+        print(f"{rows:>7} {old:>12.2f} " + " ".join(f"{ms:>14.2f}" for ms in new))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Benchmark `format_display` render time and message size vs row count.
+
+Usage: python bench/bench_render.py [--rows 50,200,500] [--modes grid,rows]
+
+Runs `format_display` (`grid`) and the original per-row layout kept in
+`_rows_layout.py` (`rows`) headlessly through Streamlit's `AppTest` on
+synthetic PEGY tables and reports, per mode and row count, the script run
+time, the number of elements produced and the total serialized size of
+their protos (what the server would send to the browser).
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from _env import isolate
+
+isolate()
+
+import streamlit.logger
+from streamlit.testing.v1 import AppTest
+
+streamlit.logger.set_log_level("error")
+
+
+def _app(rows, mode, root):
+    import sys
+
+    sys.path.insert(0, root)
+    sys.path.insert(0, f"{root}/bench")
+    import numpy as np
+    import pandas as pd
+
+    from display import format_display
+
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "Ticker": pd.Categorical([f"T{i:04d}" for i in range(rows)]),
+        "Name": pd.Categorical([f"Company {i}" for i in range(rows)]),
+        "Summary": [None] * rows,
+        "Forward P/E": rng.uniform(5, 60, rows),
+        "Growth 1Y %": rng.uniform(-20, 60, rows),
+        "Growth 1Y / S&P 500": rng.uniform(-2, 6, rows),
+        "Dividend %": rng.uniform(0, 4, rows),
+        "PEGY-1Y": rng.uniform(-3, 8, rows),
+    })
+    if mode == "rows":
+        from _rows_layout import rows_display
+
+        rows_display(df, "Bench")
+    else:
+        format_display(df, "Bench")
+
+
+def _nodes(node):
+    yield node
+    for child in getattr(node, "children", {}).values():
+        yield from _nodes(child)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", default="50,200,500")
+    parser.add_argument("--modes", default="grid,rows")
+    args = parser.parse_args(argv)
+
+    # warm-up: pay the import cost outside the measurements
+    AppTest.from_function(_app, args=(1, "grid", str(ROOT)), default_timeout=600).run()
+
+    print(f"{'mode':>5} {'rows':>6} {'render s':>9} {'elements':>9} {'message KB':>11}")
+    for mode in args.modes.split(","):
+        for rows in (int(r) for r in args.rows.split(",")):
+            at = AppTest.from_function(_app, args=(rows, mode, str(ROOT)), default_timeout=600)
+            start = time.perf_counter()
+            at.run()
+            wall = time.perf_counter() - start
+            if at.exception:
+                raise RuntimeError(at.exception[0].message)
+            protos = [n.proto for n in _nodes(at._tree) if hasattr(getattr(n, "proto", None), "ByteSize")]
+            size = sum(p.ByteSize() for p in protos)
+            print(f"{mode:>5} {rows:>6} {wall:>9.2f} {len(protos):>9} {size / 1024:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Measure the cold first-render time of the dashboard against the fake backend.
+
+Usage: python bench/bench_startup.py [--latency 0.2] [--rev <git-rev> ...]
+
+Runs `pegy.py` once through Streamlit's `AppTest` with `PEGY_BACKEND=fake`
+(every backend request sleeps `--latency` seconds) and fresh, empty caches,
+and reports the wall time of that first run plus the backend requests it
+made. Each `--rev` is exported with `git archive` and measured the same way,
+for before/after comparisons (revisions older than the fake backend can't
+be measured).
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from _env import isolate
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def measure(app_dir, latency):
+    """Run one cold render of `app_dir/pegy.py` in this process and return stats."""
+    # fresh, empty caches: no snapshot, history or access counts from earlier runs
+    isolate(override=True)
+    os.environ.update({"PEGY_BACKEND": "fake", "PEGY_FAKE_LATENCY": str(latency)})
+    os.chdir(app_dir)
+    sys.path.insert(0, str(app_dir))
+
+    import streamlit.logger
+    from streamlit.testing.v1 import AppTest
+
+    streamlit.logger.set_log_level("error")
+    at = AppTest.from_file(str(Path(app_dir) / "pegy.py"), default_timeout=600)
+    start = time.perf_counter()
+    at.run()
+    wall = time.perf_counter() - start
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+
+    from core.backends import get_backend
+
+    return {"wall": wall, "requests": dict(get_backend().requests), "tables": len(at.dataframe)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds per fake backend request")
+    parser.add_argument("--rev", action="append", default=[], help="git revision to compare against")
+    parser.add_argument("--measure", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.measure:
+        print(json.dumps(measure(args.measure, args.latency)))
+        return
+
+    targets = [(rev, None) for rev in args.rev] + [("working tree", ROOT)]
+    print(f"{'tree':>14} {'first render s':>15} {'tables':>7} {'quote req':>10} {'growth req':>11}")
+    for name, app_dir in targets:
+        if app_dir is None:
+            app_dir = Path(tempfile.mkdtemp())
+            archive = subprocess.run(["git", "-C", str(ROOT), "archive", name], check=True, capture_output=True).stdout
+            subprocess.run(["tar", "-x", "-C", str(app_dir)], input=archive, check=True)
+        # fresh interpreter per tree: each has its own `core` package and cold imports
+        out = subprocess.run(
+            [sys.executable, __file__, "--measure", str(app_dir), "--latency", str(args.latency)],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        stats = json.loads(out.strip().splitlines()[-1])
+        req = stats["requests"]
+        print(f"{name:>14} {stats['wall']:>15.2f} {stats['tables']:>7} {req.get('quotes', 0):>10} {req.get('growth_estimates', 0):>11}")
+
+
+if __name__ == "__main__":
+    main()
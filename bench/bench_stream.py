@@ -0,0 +1,59 @@
+"""Benchmark time-to-first-row of `calculate_pegy_stream` vs the blocking `calculate_pegy`.
+
+Usage: python bench/bench_stream.py [--tickers 500] [--latency 0.2] [--workers 8] [--chunk-size 25]
+
+Both run against `core.backends.FakeBackend` with `--latency` seconds per
+request and an empty fundamentals store. The blocking call shows nothing
+until every ticker is done; the stream's first chunk should arrive after
+about one quote request plus one growth request.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from _env import isolate
+
+isolate()
+
+import calculate_pegy as cp
+from core.backends import FakeBackend, set_backend
+from core.store import get_store
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tickers", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--chunk-size", type=int, default=25)
+    args = parser.parse_args(argv)
+
+    set_backend(FakeBackend(latency=args.latency))
+    tickers = tuple(f"T{i:04d}" for i in range(args.tickers))
+
+    get_store().invalidate(tickers)
+    start = time.perf_counter()
+    getattr(cp.calculate_pegy, "__wrapped__", cp.calculate_pegy)(tickers, max_workers=args.workers)
+    blocking = time.perf_counter() - start
+
+    get_store().invalidate(tickers)
+    start = time.perf_counter()
+    first = None
+    rows = chunks = 0
+    for chunk in cp.calculate_pegy_stream(tickers, chunk_size=args.chunk_size, max_workers=args.workers):
+        first = first or time.perf_counter() - start
+        rows += len(chunk)
+        chunks += 1
+    streamed = time.perf_counter() - start
+    assert rows == len(tickers)
+
+    print(f"{'mode':>9} {'first row s':>12} {'all rows s':>11} {'chunks':>7}")
+    print(f"{'blocking':>9} {blocking:>12.2f} {blocking:>11.2f} {1:>7}")
+    print(f"{'stream':>9} {first:>12.2f} {streamed:>11.2f} {chunks:>7}")
+
+
+if __name__ == "__main__":
+    main()
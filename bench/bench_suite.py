@@ -0,0 +1,191 @@
+"""Offline benchmark suite for the fetch -> compute -> render hot path.
+
+Usage: python bench/bench_suite.py [--sizes 5000,20000,50000] [--render-rows 50000]
+                                   [--save-baseline] [--tolerance 0.3]
+
+Scenarios:
+
+* `snp` replays the recorded fixture `bench/fixtures/snp.json.gz` (see
+  `bench/record_fixtures.py`) for the `tickers/snp.py` list;
+* `synthetic-<n>` replays a generated universe of `n` symbols.
+
+Each scenario runs `calculate_pegy` against `core.backends.ReplayBackend`
+with an empty fundamentals store (cold) and again with the store filled
+(warm), measures the peak Python memory of a cold run with `tracemalloc`,
+and renders the resulting table through `format_display` headlessly with
+Streamlit's `AppTest`. Nothing touches the network.
+
+Results are compared against `bench/baseline.json`; a metric more than
+`--tolerance` worse than its baseline is reported and makes the exit status
+1. `--save-baseline` rewrites the baseline from this run. Timings depend on
+the machine, so record the baseline on the machine that runs the check.
+"""
+import argparse
+import json
+import os
+import pickle
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from _env import isolate
+
+isolate()
+
+import streamlit.logger
+from streamlit.testing.v1 import AppTest
+
+import calculate_pegy as cp
+from bench.record_fixtures import record
+from core.backends import FakeBackend, ReplayBackend, load_fixture, set_backend
+from core.compute import compute_pegy, raw_frame
+from core.store import get_store
+from tickers import snp
+
+streamlit.logger.set_log_level("error")
+
+FIXTURE = ROOT / "bench" / "fixtures" / "snp.json.gz"
+BASELINE = ROOT / "bench" / "baseline.json"
+# metric -> True when bigger is better
+METRICS = {
+    "cold_tickers_per_s": True,
+    "warm_tickers_per_s": True,
+    "peak_mb": False,
+    "render_s": False,
+}
+
+
+def synthetic_fixture(n: int) -> dict:
+    """Fixture for `n` generated symbols, as if recorded from `FakeBackend`."""
+    symbols = [f"S{i:05d}" for i in range(n)]
+    backend = record(symbols, FakeBackend(batch_size=1000), max_workers=1)
+    return {"source": "fake", "symbols": symbols, **backend.recorded}
+
+
+def _render_app(path, root):
+    import pickle
+    import sys
+
+    sys.path.insert(0, root)
+    from display import format_display
+
+    with open(path, "rb") as f:
+        df = pickle.load(f)
+    format_display(df, "Bench")
+
+
+def render_seconds(df) -> float:
+    """Wall time of one headless `format_display` script run for `df`."""
+    with tempfile.NamedTemporaryFile(suffix=".pkl", delete=False) as f:
+        pickle.dump(df, f)
+    try:
+        at = AppTest.from_function(_render_app, args=(f.name, str(ROOT)), default_timeout=600)
+        start = time.perf_counter()
+        at.run()
+        wall = time.perf_counter() - start
+        if at.exception:
+            raise RuntimeError(at.exception[0].message)
+        return wall
+    finally:
+        os.unlink(f.name)
+
+
+def run_scenario(fixture: dict, render_rows: int) -> dict:
+    # call the undecorated function so st.cache_data doesn't short-circuit runs
+    run = getattr(cp.calculate_pegy, "__wrapped__", cp.calculate_pegy)
+    tickers = tuple(fixture["symbols"])
+    set_backend(ReplayBackend(fixture))
+    store = get_store()
+
+    store.invalidate()
+    start = time.perf_counter()
+    df = run(tickers)
+    cold = time.perf_counter() - start
+    assert len(df) == len(tickers), "rows missing"
+
+    start = time.perf_counter()
+    run(tickers)
+    warm = time.perf_counter() - start
+
+    store.invalidate()
+    tracemalloc.start()
+    try:
+        run(tickers)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    result = {
+        "tickers": len(tickers),
+        "cold_tickers_per_s": round(len(tickers) / cold, 1),
+        "warm_tickers_per_s": round(len(tickers) / warm, 1),
+        "peak_mb": round(peak / 2**20, 1),
+    }
+    if len(df) <= render_rows:
+        result["render_s"] = round(render_seconds(df), 3)
+    return result
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Return one message per metric that regressed beyond `tolerance`."""
+    regressions = []
+    for name, result in results.items():
+        for metric, higher_is_better in METRICS.items():
+            old, new = baseline.get(name, {}).get(metric), result.get(metric)
+            if not old or new is None:
+                continue
+            change = (old - new) / old if higher_is_better else (new - old) / old
+            if change > tolerance:
+                regressions.append(f"{name}: {metric} {old} -> {new} ({change:+.0%} worse)")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="5000,20000,50000", help="synthetic universe sizes")
+    parser.add_argument("--render-rows", type=int, default=50000, help="skip rendering bigger tables")
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.3, help="allowed fractional regression")
+    args = parser.parse_args(argv)
+
+    fixture = load_fixture(FIXTURE)
+    if fixture.get("source") != "yahoo":
+        print(f"note: {FIXTURE.name} holds {fixture.get('source')} data; re-record with bench/record_fixtures.py")
+    fixture["symbols"] = list(snp.symbols)
+    scenarios = {"snp": lambda: fixture}
+    for n in (int(s) for s in args.sizes.split(",") if s):
+        scenarios[f"synthetic-{n}"] = lambda n=n: synthetic_fixture(n)
+
+    # warm-up: pay Streamlit's import cost outside the measurements
+    render_seconds(compute_pegy(raw_frame([])))
+
+    results = {}
+    print(f"{'scenario':>16} {'tickers':>8} {'cold/s':>9} {'warm/s':>9} {'peak MB':>8} {'render s':>9}")
+    for name, make in scenarios.items():
+        r = results[name] = run_scenario(make(), args.render_rows)
+        print(f"{name:>16} {r['tickers']:>8} {r['cold_tickers_per_s']:>9} {r['warm_tickers_per_s']:>9}"
+              f" {r['peak_mb']:>8} {r.get('render_s', '-'):>9}")
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"baseline written to {args.baseline}")
+        return
+    if not args.baseline.exists():
+        print("no baseline yet; run with --save-baseline")
+        return
+    regressions = compare(results, json.loads(args.baseline.read_text()), args.tolerance)
+    for msg in regressions:
+        print("REGRESSION", msg)
+    if regressions:
+        sys.exit(1)
+    print("no regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Benchmark the background AI summary worker against the local fake OpenAI server.
+
+Usage: python bench/bench_summaries.py [--tickers 24] [--latency 0.2] [--concurrency 1,2,4,8] [--server-limit 4]
+
+Starts `bench/fake_openai.py` in-process, points the OpenAI client at it and
+times a `SummaryWorker` batch for each concurrency level. Concurrency above
+`--server-limit` triggers 429s, which the worker should absorb with
+backoff (every job still completes).
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from _env import isolate
+from fake_openai import FakeOpenAIServer
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tickers", type=int, default=24)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--concurrency", default="1,2,4,8")
+    parser.add_argument("--server-limit", type=int, default=4)
+    args = parser.parse_args(argv)
+
+    srv = FakeOpenAIServer(latency=args.latency, max_concurrent=args.server_limit, retry_after=0.05).start()
+    os.environ["OPENAI_BASE_URL"] = srv.base_url
+    os.environ["OPENAI_API_KEY"] = "test"
+    isolate(override=True)
+
+    import ai
+    from ai.worker import SummaryWorker
+
+    tickers = [f"T{i:04d}" for i in range(args.tickers)]
+
+    print(f"{'workers':>8} {'wall s':>8} {'done':>5} {'failed':>7} {'retries':>8} {'requests':>9} {'429s':>5}")
+    for concurrency in (int(c) for c in args.concurrency.split(",")):
+        ai.clear_cache()
+        srv.requests = srv.rate_limited = 0
+        worker = SummaryWorker(concurrency=concurrency, base_delay=0.05)
+        start = time.perf_counter()
+        job = worker.submit(tickers)
+        while not job.finished:
+            time.sleep(0.01)
+        wall = time.perf_counter() - start
+        worker.shutdown()
+        print(f"{concurrency:>8} {wall:>8.2f} {len(job.done):>5} {len(job.failed):>7} {job.retries:>8} {srv.requests:>9} {srv.rate_limited:>5}")
+    srv.shutdown()
+
+
+if __name__ == "__main__":
+    main()
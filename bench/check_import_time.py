@@ -0,0 +1,78 @@
+"""Check import time and heavy dependencies of the app's entry modules.
+
+Usage: python bench/check_import_time.py [--repeat 3] [--scale 1.0]
+
+Imports every module in `BUDGETS` in a fresh interpreter (best of
+`--repeat`) and fails (exit status 1) when one takes longer than its
+budget, or pulls in a dependency it must only load on demand: the core
+pipeline and `precompute.py` never import Streamlit, and nothing imports
+openai or yfinance until a summary or a Yahoo request actually needs it.
+`--scale` multiplies every budget, for slow machines.
+"""
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+LAZY = ("openai", "yfinance", "dotenv")
+# module -> (budget in ms, modules it must not import)
+BUDGETS = {
+    "core.metrics": (50, ("numpy", "pandas", "streamlit") + LAZY),
+    "ai": (150, ("pandas", "streamlit") + LAZY),
+    "core.pipeline": (1000, ("streamlit",) + LAZY),
+    "precompute": (1000, ("streamlit",) + LAZY),
+    "calculate_pegy": (1500, LAZY),
+    "display": (1500, LAZY),
+}
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"ms": elapsed * 1000, "modules": sorted(m.split(".")[0] for m in sys.modules)}}))
+"""
+
+
+def measure(module: str, repeat: int = 3):
+    """Best-of-`repeat` import time (ms) of `module` and the top-level modules it loaded."""
+    best = None
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, "-c", _PROBE.format(module=module)],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        ).stdout
+        result = json.loads(out.strip().splitlines()[-1])
+        if best is None or result["ms"] < best["ms"]:
+            best = result
+    return best["ms"], set(best["modules"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply every budget")
+    args = parser.parse_args(argv)
+
+    failures = []
+    print(f"{'module':>16} {'ms':>8} {'budget':>8}  unexpected imports")
+    for module, (budget, forbidden) in BUDGETS.items():
+        ms, loaded = measure(module, args.repeat)
+        unexpected = sorted(loaded & set(forbidden))
+        budget *= args.scale
+        print(f"{module:>16} {ms:>8.0f} {budget:>8.0f}  {', '.join(unexpected) or '-'}")
+        if ms > budget:
+            failures.append(f"{module}: {ms:.0f} ms > {budget:.0f} ms budget")
+        if unexpected:
+            failures.append(f"{module}: imports {', '.join(unexpected)}")
+
+    for msg in failures:
+        print("FAIL", msg)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Local fake of the OpenAI chat-completions API for offline AI summary runs.
+
+Usage: python bench/fake_openai.py [--port 8765] [--latency 0.3] [--max-concurrent 4]
+
+Then point the app at it:
+    OPENAI_BASE_URL=http://127.0.0.1:8765/v1 OPENAI_API_KEY=test streamlit run pegy.py
+
+Each request sleeps `latency` seconds and answers with a canned summary.
+Requests beyond `max_concurrent` in flight get a 429 with `Retry-After`,
+like a real rate limit.
+"""
+import argparse
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeOpenAIServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port=0, latency=0.3, max_concurrent=4, retry_after=0.2):
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.latency = latency
+        self.max_concurrent = max_concurrent
+        self.retry_after = retry_after
+        self.requests = 0
+        self.rate_limited = 0
+        self._inflight = 0
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/v1"
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body, headers=()):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in headers:
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        srv = self.server
+        req = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        with srv._lock:
+            srv.requests += 1
+            limited = srv._inflight >= srv.max_concurrent
+            if limited:
+                srv.rate_limited += 1
+            else:
+                srv._inflight += 1
+        if limited:
+            self._send(429, {"error": {"message": "Rate limit reached", "type": "requests"}},
+                       headers=[("Retry-After", str(srv.retry_after))])
+            return
+        try:
+            time.sleep(srv.latency)
+            prompt = req.get("messages", [{}])[-1].get("content", "")
+            m = re.search(r"symbol `([^`]+)`", prompt)
+            symbol = m.group(1) if m else "?"
+            doc = {
+                "Overview": f"{symbol} is a fake company used for offline testing.",
+                "Core Products": ["p1", "p2", "p3", "p4", "p5"],
+                "Vision": "Be a reliable fixture.",
+                "Accomplishment": "Answered every request.",
+                "Why": "It is free and always available.",
+            }
+            self._send(200, {
+                "id": "chatcmpl-fake",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": req.get("model", "fake"),
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": json.dumps(doc)}}],
+                "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+            })
+        finally:
+            with srv._lock:
+                srv._inflight -= 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--max-concurrent", type=int, default=4)
+    args = parser.parse_args(argv)
+    srv = FakeOpenAIServer(args.port, args.latency, args.max_concurrent)
+    print(f"fake OpenAI API on {srv.base_url}")
+    srv.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Load test: N dashboard sessions fetching the same tickers at once, with and without coalescing.
+
+Usage: python bench/load_sessions.py [--sessions 1,4,16] [--tickers 200] [--latency 0.05]
+                                     [--summaries 20] [--ai-latency 0.05]
+
+Simulates the moment after a cache expiry: the fundamentals store and the
+summary cache are emptied, then every session starts together and runs the
+dashboard pipeline (`core.pipeline.calculate`) over the same tickers (in
+its own order), then asks for the first `--summaries` tickers' AI summaries. Yahoo
+is a `FakeBackend` and OpenAI is `bench/fake_openai.py`, both with fixed
+latency; the table shows the requests each of them received. With
+`core.singleflight` on, they should stay at one session's worth however
+many sessions run.
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from _env import isolate
+
+isolate()
+
+from fake_openai import FakeOpenAIServer
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", default="1,4,16")
+    parser.add_argument("--tickers", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per Yahoo request")
+    parser.add_argument("--summaries", type=int, default=20, help="AI summaries each session asks for")
+    parser.add_argument("--ai-latency", type=float, default=0.05, help="seconds per OpenAI request")
+    args = parser.parse_args(argv)
+
+    srv = FakeOpenAIServer(latency=args.ai_latency, max_concurrent=10_000).start()
+    os.environ["OPENAI_BASE_URL"] = srv.base_url
+    os.environ["OPENAI_API_KEY"] = "test"
+
+    import ai
+    from core.backends import FakeBackend, set_backend
+    from core.metrics import metrics
+    from core.pipeline import calculate
+    from core.singleflight import fundamentals_flight, quotes_flight, summaries_flight
+    from core.store import get_store
+
+    flights = (fundamentals_flight, quotes_flight, summaries_flight)
+    tickers = [f"T{i:04d}" for i in range(args.tickers)]
+    wanted = set(tickers[:args.summaries])
+
+    def _session(i, barrier, errors):
+        order = list(tickers)
+        random.Random(i).shuffle(order)
+        barrier.wait()
+        try:
+            calculate(tuple(order))
+            # the same summaries for every session, each asking in its own order
+            for tk in (tk for tk in order if tk in wanted):
+                ai.generate_company_summary(tk)
+        except Exception as e:
+            errors.append(e)
+
+    print(f"{'sessions':>8} {'coalesce':>9} {'wall s':>7} {'yahoo req':>10} {'openai req':>11}"
+          f" {'shared':>7} {'errors':>7}")
+    for n in (int(s) for s in args.sessions.split(",")):
+        for enabled in (False, True):
+            for flight in flights:
+                flight.enabled = enabled
+            backend = FakeBackend(latency=args.latency)
+            set_backend(backend)
+            get_store().invalidate()
+            ai.clear_cache()
+            srv.requests = 0
+            before = sum(metrics.counters.get(f"singleflight.{f.name}.coalesced", 0) for f in flights)
+
+            barrier = threading.Barrier(n)
+            errors: list = []
+            threads = [threading.Thread(target=_session, args=(i, barrier, errors)) for i in range(n)]
+            start = time.perf_counter()
+            for th in threads:
+                th.start()
+            for th in threads:
+                th.join()
+            wall = time.perf_counter() - start
+            shared = sum(metrics.counters.get(f"singleflight.{f.name}.coalesced", 0) for f in flights) - before
+            print(f"{n:>8} {'on' if enabled else 'off':>9} {wall:>7.2f} {sum(backend.requests.values()):>10}"
+                  f" {srv.requests:>11} {shared:>7} {len(errors):>7}")
+    set_backend(None)
+    srv.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Record Yahoo responses for a ticker list into a replayable fixture.
+
+Usage: python bench/record_fixtures.py [--universe snp] [--out bench/fixtures/snp.json.gz] [--synthetic]
+
+Fetches quotes (in batches) and growth estimates for every symbol of a
+`tickers.registry` universe through `core.backends.RecordingBackend` and saves
+them for `ReplayBackend` / `bench/bench_suite.py`. `--synthetic` records
+`FakeBackend` instead of Yahoo, for machines without network access; the
+fixture's `source` field says which one it is.
+"""
+import argparse
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from core.backends import FakeBackend, RecordingBackend, YahooBackend
+from core.fetch import fetch_all
+from tickers import get_registry
+
+
+def record(symbols, inner, max_workers=4):
+    """Return a `RecordingBackend` that has seen every response for `symbols`."""
+    backend = RecordingBackend(inner)
+    size = backend.batch_size
+    batches = [symbols[i:i + size] for i in range(0, len(symbols), size)]
+    fetch_all(batches, backend.quotes, max_workers=max_workers, on_error=lambda batch, exc: None)
+    fetch_all(symbols, backend.growth_estimates, max_workers=max_workers, on_error=lambda sym, exc: None)
+    return backend
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--universe", default="snp", help="universe name in tickers.registry")
+    parser.add_argument("--out", type=Path)
+    parser.add_argument("--synthetic", action="store_true", help="record FakeBackend instead of Yahoo")
+    args = parser.parse_args(argv)
+
+    symbols = get_registry().get(args.universe)
+    out = args.out or ROOT / "bench" / "fixtures" / f"{args.universe}.json.gz"
+    source = "fake" if args.synthetic else "yahoo"
+    backend = record(symbols, FakeBackend() if args.synthetic else YahooBackend())
+    if not backend.recorded["quotes"]:
+        sys.exit("nothing recorded (is Yahoo reachable?); use --synthetic to record offline data")
+    backend.save(out, source=source, universe=args.universe, symbols=symbols)
+    print(f"{out}: {len(backend.recorded['quotes'])} quotes, "
+          f"{len(backend.recorded['growth_estimates'])} growth estimates of {len(symbols)} symbols ({source})")
+
+
+if __name__ == "__main__":
+    main()
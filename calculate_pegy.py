@@ -1,84 +1,77 @@
-import yfinance as yf
-import pandas as pd
+import os
+import time
+
 import streamlit as st
+from core.fetch import DEFAULT_MAX_WORKERS, DEFAULT_TIMEOUT
+from core.metrics import metrics
+from core.pipeline import calculate, calculate_stream, refresh
+from core.prefetch import get_prefetcher
+from core.snapshot import latest_snapshot, read_snapshot
+from core.store import DEFAULT_TTLS
+
+# Not cached by Streamlit: callers keep the chunks / refreshed frames themselves
+calculate_pegy_stream = calculate_stream
+refresh_pegy = refresh
 
-# optionally use AI summary generation
-try:
-    from ai import generate_company_summary, get_cached_summary
-except Exception:
-    generate_company_summary = None
-    get_cached_summary = None
+# snapshots older than this (seconds) are ignored at startup. Their rows count
+# as loaded and aren't refetched until Refresh, so by default no snapshot
+# older than the shortest fundamentals TTL (forwardPE) is used
+SNAPSHOT_MAX_AGE = float(os.environ.get("PEGY_SNAPSHOT_MAX_AGE", min(DEFAULT_TTLS.values())))
 
 
 @st.cache_data(ttl=60 * 30)
-def calculate_pegy(tickers, generate_summaries: bool = False):
+def calculate_pegy(tickers, generate_summaries: bool = False, max_workers: int = DEFAULT_MAX_WORKERS, timeout: float = DEFAULT_TIMEOUT):
     """Calculate PEGY table for given tickers.
 
+    Tickers are fetched concurrently, at most `max_workers` at a time; a ticker
+    that takes longer than `timeout` seconds becomes an error row. Rows are
+    returned in the order of `tickers`. Fetching only collects raw fields; the
+    table itself is computed in one vectorized pass by `core.compute`.
+
+    Fundamentals are read from the shared on-disk store first, so only
+    missing or stale symbols hit Yahoo. Quote fields are requested in bulk
+    (many symbols per request); only `growth_estimates` is fetched per symbol.
+
     If `generate_summaries` is True and the `ai` package is available, this will
     attempt to populate a `Summary` column using cached summaries or by calling
     `generate_company_summary` (may be slow / costly). Default is False.
     """
-    data = []
-
-    for ticker in tickers:
-        try:
-            stock = yf.Ticker(ticker)
-            info = stock.info
-
-            # Extract stock and S&P trend for 1Y
-            analysis = stock.growth_estimates
-            stock_trend = analysis.get("stockTrend")
-            snp_trend = analysis.get("indexTrend")
-            growth_1y = stock_trend.get("+1y", 0)
-            snp_growth_1y = snp_trend.get("+1y", 0)
-
-            forward_pe = info.get("forwardPE", 0)
-            dividend = info.get("dividendYield", 0)
-
-            # Convert decimals → %
-            dividend_pct = dividend * 100 if dividend else 0
-            growth_1y_pct = growth_1y * 100 if growth_1y else None
-            snp_growth_1y_pct = snp_growth_1y * 100 if snp_growth_1y else None
-
-            pegy_1y = (
-                abs(forward_pe) / (growth_1y_pct + dividend)
-                if forward_pe and growth_1y_pct
-                else None
-            )
-
-            # Symbol formatted as 'TICKER - Company Name' (compat with UI expectations)
-            symbol_display = ticker + " - " + (info.get("shortName") or "")
-            
-            # Populate summary from cache if available (non-blocking)
-            summary = ""
-            if get_cached_summary is not None:
-                try:
-                    cached = get_cached_summary(ticker)
-                    if cached:
-                        summary = cached
-                    elif generate_summaries and generate_company_summary is not None:
-                        # generate and cache via ai client
-                        try:
-                            summary = generate_company_summary(ticker, info.get("shortName"))
-                        except Exception:
-                            summary = None
-                except Exception:
-                    # do not fail the whole run if AI fails
-                    summary = None
-
-            row = {
-                "Symbol": symbol_display,
-                "Summary": summary if summary else None,
-                "Forward P/E": round(forward_pe, 2) if forward_pe else None,
-                "Growth 1Y %": round(growth_1y_pct, 4) if growth_1y_pct else None,
-                "Growth 1Y / S&P 500": round(growth_1y_pct / snp_growth_1y_pct, 4) if snp_growth_1y else None,
-                "Dividend %": round(dividend_pct, 2) if dividend_pct else None,
-                "PEGY-1Y": round(pegy_1y, 2) if pegy_1y else None,
-            }
-
-            data.append(row)
-
-        except Exception as e:
-            data.append({"Ticker": ticker, "Error": str(e)})
-
-    return pd.DataFrame(data)
+    metrics.incr("cache.st_cache_data.miss")
+    return calculate(tickers, generate_summaries, max_workers, timeout)
+
+
+@st.cache_resource
+def start_prefetcher():
+    """Return the process-wide `core.prefetch` scheduler, started once per process.
+
+    Set `PEGY_PREFETCH=0` to leave it stopped (e.g. when `prefetch.py` runs
+    as a sidecar); access counts are still recorded for it.
+    """
+    prefetcher = get_prefetcher()
+    if os.environ.get("PEGY_PREFETCH", "1") != "0":
+        prefetcher.start()
+    return prefetcher
+
+
+@st.cache_resource(max_entries=2)
+def _read_snapshot(path: str, mtime: float):
+    return read_snapshot(path)
+
+
+def load_latest_snapshot():
+    """Return the newest snapshot written by `precompute.py` as `(table, created_at)`, or None.
+
+    The file is memory-mapped once per process and shared by all sessions;
+    each caller gets its own copy. Missing, unreadable or too old snapshots
+    (`PEGY_SNAPSHOT_MAX_AGE`) yield None, and the dashboard fetches live.
+    """
+    path = latest_snapshot()
+    if path is None:
+        return None
+    try:
+        df, meta = _read_snapshot(str(path), path.stat().st_mtime)
+    except (OSError, ValueError):
+        return None
+    if time.time() - meta["created_at"] > SNAPSHOT_MAX_AGE:
+        return None
+    return df.copy(), meta["created_at"]
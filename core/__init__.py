@@ -0,0 +1,52 @@
+"""Core data layer for pegy: fetching and caching market data for many tickers.
+
+Names are imported from their submodules on first use, so `import core` (or
+any one submodule) doesn't pay for the others.
+"""
+import importlib
+
+# imported eagerly (and cheaply): the `metrics` instance shadows the submodule of the same name
+from .metrics import Metrics, metrics
+
+_EXPORTS = {
+    "QuoteBackend": "backends",
+    "YahooBackend": "backends",
+    "FakeBackend": "backends",
+    "RecordingBackend": "backends",
+    "ReplayBackend": "backends",
+    "load_fixture": "backends",
+    "get_backend": "backends",
+    "set_backend": "backends",
+    "fetch_all": "fetch",
+    "fetch_iter": "fetch",
+    "FetchTimeout": "fetch",
+    "ResilientBackend": "resilience",
+    "TokenBucket": "resilience",
+    "CircuitBreaker": "resilience",
+    "CircuitOpen": "resilience",
+    "export_table": "export",
+    "iter_export": "export",
+    "HistoryStore": "history",
+    "get_history": "history",
+    "Prefetcher": "prefetch",
+    "get_prefetcher": "prefetch",
+    "Query": "query",
+    "QueryResult": "query",
+    "run_query": "query",
+    "latest_snapshot": "snapshot",
+    "read_snapshot": "snapshot",
+    "write_snapshot": "snapshot",
+    "SingleFlight": "singleflight",
+    "FundamentalsStore": "store",
+    "get_store": "store",
+}
+
+__all__ = ["Metrics", "metrics", *_EXPORTS]
+
+
+def __getattr__(name):
+    try:
+        module = _EXPORTS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    return getattr(importlib.import_module(f".{module}", __name__), name)
@@ -0,0 +1,242 @@
+import gzip
+import json
+import os
+import random
+import threading
+import time
+import typing as t
+import zlib
+from collections import Counter
+
+# Fields taken from Yahoo's quote data; everything else in `.info` is ignored.
+QUOTE_FIELDS = ("shortName", "forwardPE", "dividendYield")
+
+
+class QuoteBackend:
+    """Source of market data for `calculate_pegy`.
+
+    `quotes` returns the `QUOTE_FIELDS` for up to `batch_size` symbols per
+    call; `growth_estimates` returns one symbol's estimates as
+    `{trend: {period: growth}}` (the shape of `Ticker.growth_estimates.to_dict()`).
+    """
+
+    batch_size = 1
+
+    def quotes(self, symbols: t.Sequence[str]) -> t.Dict[str, dict]:
+        raise NotImplementedError
+
+    def quote(self, symbol: str) -> dict:
+        return self.quotes([symbol]).get(symbol.upper(), {})
+
+    def growth_estimates(self, symbol: str) -> dict:
+        raise NotImplementedError
+
+
+class YahooBackend(QuoteBackend):
+    """yfinance-backed source using the multi-symbol v7 quote endpoint.
+
+    Batches go through yfinance's authenticated session (cookie + crumb) so
+    one request covers `batch_size` symbols. Single symbols use `Ticker.info`,
+    which is what callers fall back to when a batch request fails.
+    """
+
+    batch_size = 100
+
+    def quotes(self, symbols):
+        symbols = list(symbols)
+        if len(symbols) == 1:
+            return {symbols[0].upper(): self.quote(symbols[0])}
+
+        from yfinance.const import _QUERY1_URL_
+        from yfinance.data import YfData
+
+        resp = YfData().get_raw_json(
+            f"{_QUERY1_URL_}/v7/finance/quote",
+            params={"symbols": ",".join(symbols), "formatted": "false"},
+        )
+        results = (resp.get("quoteResponse") or {}).get("result") or []
+        return {r["symbol"].upper(): {f: r.get(f) for f in QUOTE_FIELDS} for r in results if r.get("symbol")}
+
+    def quote(self, symbol):
+        import yfinance as yf
+
+        info = yf.Ticker(symbol).info
+        return {f: info.get(f) for f in QUOTE_FIELDS}
+
+    def growth_estimates(self, symbol):
+        import yfinance as yf
+
+        return yf.Ticker(symbol).growth_estimates.to_dict()
+
+
+class FakeBackend(QuoteBackend):
+    """Deterministic in-process backend for offline benchmarks and tests.
+
+    Every call sleeps `latency` seconds (one "request", whatever the batch
+    size) and is counted in `requests`, keyed by method name. Symbols in
+    `fail` have no data; `error_rate` injects transient failures.
+    """
+
+    PERIODS = ("0q", "+1q", "0y", "+1y", "+5y")
+
+    def __init__(self, latency: float = 0.0, batch_size: int = 100, fail: t.Iterable[str] = (),
+                 error_rate: float = 0.0, seed: int = 0):
+        self.latency = latency
+        self.batch_size = batch_size
+        self.fail = {s.upper() for s in fail}
+        # fraction of requests failing with ConnectionError, like a throttled
+        # or flaky connection; 1.0 simulates an outage
+        self.error_rate = error_rate
+        self.requests: Counter = Counter()
+        self._errors = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _request(self, kind):
+        with self._lock:
+            self.requests[kind] += 1
+            failed = self.error_rate and self._errors.random() < self.error_rate
+        if self.latency:
+            time.sleep(self.latency)
+        if failed:
+            raise ConnectionError(f"fake {kind} request failed")
+
+    @staticmethod
+    def _rng(symbol):
+        return random.Random(zlib.crc32(symbol.upper().encode()))
+
+    def quotes(self, symbols):
+        self._request("quotes")
+        out = {}
+        for s in symbols:
+            if s.upper() in self.fail:
+                continue
+            rng = self._rng(s)
+            out[s.upper()] = {
+                "shortName": f"{s.upper()} Inc.",
+                "forwardPE": round(rng.uniform(-10, 80), 2),
+                "dividendYield": round(rng.uniform(0, 4), 2) if rng.random() < 0.6 else None,
+            }
+        return out
+
+    def growth_estimates(self, symbol):
+        self._request("growth_estimates")
+        if symbol.upper() in self.fail:
+            raise RuntimeError(f"{symbol}: no data")
+        rng = self._rng(symbol)
+        rng.random()  # decouple from the quote draws
+        return {
+            "stockTrend": {p: round(rng.uniform(-0.2, 0.6), 4) for p in self.PERIODS},
+            "indexTrend": {p: round(rng.uniform(0.05, 0.15), 4) for p in self.PERIODS},
+        }
+
+
+class RecordingBackend(QuoteBackend):
+    """Pass-through backend that keeps every response from `inner`.
+
+    `save` writes them as a fixture `ReplayBackend` can serve offline.
+    """
+
+    def __init__(self, inner: QuoteBackend):
+        self.inner = inner
+        self.batch_size = inner.batch_size
+        self.recorded = {"quotes": {}, "growth_estimates": {}}
+        self._lock = threading.Lock()
+
+    def quotes(self, symbols):
+        out = self.inner.quotes(symbols)
+        with self._lock:
+            self.recorded["quotes"].update(out)
+        return out
+
+    def growth_estimates(self, symbol):
+        out = self.inner.growth_estimates(symbol)
+        with self._lock:
+            self.recorded["growth_estimates"][symbol.upper()] = out
+        return out
+
+    def save(self, path: t.Union[str, os.PathLike], **meta):
+        """Write the recorded responses (gzip-compressed for a `.gz` path)."""
+        with self._lock:
+            doc = {**meta, "recorded_at": time.time(), **self.recorded}
+        data = json.dumps(doc, sort_keys=True, default=str).encode()
+        with open(path, "wb") as f:
+            f.write(gzip.compress(data, mtime=0) if str(path).endswith(".gz") else data)
+
+
+class ReplayBackend(QuoteBackend):
+    """Serve responses captured by `RecordingBackend`, without the network.
+
+    `fixture` is a fixture path or an already loaded fixture dict. Symbols
+    that were not recorded behave like Yahoo symbols without data: missing
+    from `quotes`, and `growth_estimates` raises.
+    """
+
+    def __init__(self, fixture, latency: float = 0.0, batch_size: int = 100):
+        if not isinstance(fixture, dict):
+            fixture = load_fixture(fixture)
+        self.fixture = fixture
+        self.latency = latency
+        self.batch_size = batch_size
+        self.requests: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def _request(self, kind):
+        with self._lock:
+            self.requests[kind] += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def quotes(self, symbols):
+        self._request("quotes")
+        recorded = self.fixture["quotes"]
+        return {s.upper(): recorded[s.upper()] for s in symbols if s.upper() in recorded}
+
+    def growth_estimates(self, symbol):
+        self._request("growth_estimates")
+        try:
+            return self.fixture["growth_estimates"][symbol.upper()]
+        except KeyError:
+            raise RuntimeError(f"{symbol}: no recorded growth estimates") from None
+
+
+def load_fixture(path: t.Union[str, os.PathLike]) -> dict:
+    """Read a fixture written by `RecordingBackend.save`."""
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[:2] == b"\x1f\x8b":
+        data = gzip.decompress(data)
+    return json.loads(data)
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend() -> QuoteBackend:
+    """Return the process-wide backend, wrapped in `ResilientBackend`.
+
+    `PEGY_BACKEND=fake` selects `FakeBackend`, with `PEGY_FAKE_LATENCY`
+    seconds per request (default 0); `PEGY_BACKEND=replay` serves the
+    fixture at `PEGY_REPLAY_FILE` through `ReplayBackend`.
+    """
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            name = os.environ.get("PEGY_BACKEND", "yahoo").lower()
+            from .resilience import ResilientBackend
+
+            if name == "fake":
+                inner = FakeBackend(latency=float(os.environ.get("PEGY_FAKE_LATENCY", 0)))
+            elif name == "replay":
+                inner = ReplayBackend(os.environ["PEGY_REPLAY_FILE"])
+            else:
+                inner = YahooBackend()
+            _backend = ResilientBackend(inner)
+        return _backend
+
+
+def set_backend(backend: t.Optional[QuoteBackend]):
+    """Install `backend` for this process (None resets to the default)."""
+    global _backend
+    with _backend_lock:
+        _backend = backend
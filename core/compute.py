@@ -0,0 +1,168 @@
+import typing as t
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+# Yahoo `growth_estimates` periods -> column label. One fetch returns all of
+# them; PEGY is computed for each so the UI can switch horizon for free.
+HORIZONS = {"0q": "0Q", "+1q": "1Q", "0y": "0Y", "+1y": "1Y", "+5y": "5Y"}
+DEFAULT_HORIZON = "+1y"
+
+# Raw per-ticker inputs, one typed column each. Tickers and names are
+# categoricals: the tables are rebuilt, merged and sliced into views a lot,
+# and a categorical slice copies 2-byte codes instead of string objects.
+RAW_COLUMNS = {
+    "Ticker": "category",
+    "Name": "category",
+    "forwardPE": "float64",
+    "dividendYield": "float64",
+    **{f"growth_{label.lower()}": "float64" for label in HORIZONS.values()},
+    **{f"snp_growth_{label.lower()}": "float64" for label in HORIZONS.values()},
+    "Error": "string",
+}
+
+
+def horizon_columns(horizon: str = DEFAULT_HORIZON) -> t.Tuple[str, str, str]:
+    """`(growth %, growth vs S&P 500, PEGY)` column names for `horizon`."""
+    label = HORIZONS[horizon]
+    return f"Growth {label} %", f"Growth {label} / S&P 500", f"PEGY-{label}"
+
+
+def numeric_columns(horizon: str = DEFAULT_HORIZON) -> t.List[str]:
+    """The numeric columns shown for `horizon`, in display order."""
+    growth, vs_snp, pegy = horizon_columns(horizon)
+    return ["Forward P/E", growth, vs_snp, "Dividend %", pegy]
+
+
+NUMERIC_COLUMNS = numeric_columns()
+ALL_NUMERIC_COLUMNS = ["Forward P/E", "Dividend %"] + [c for h in HORIZONS for c in horizon_columns(h)]
+
+
+def _float(value) -> float:
+    try:
+        return float(value) if value is not None else np.nan
+    except (TypeError, ValueError):
+        return np.nan
+
+
+@dataclass
+class Record:
+    """Raw PEGY inputs for one ticker: only the fields the table needs.
+
+    Built from the fetched payloads as soon as they arrive, so the payloads
+    themselves can be dropped; with `__slots__` and plain floats it is a
+    few hundred bytes per ticker. `growth` and `snp_growth` hold one value
+    per horizon, in `HORIZONS` order. Failed fetches only carry `error`.
+    """
+
+    __slots__ = ("ticker", "name", "forward_pe", "dividend_yield", "growth", "snp_growth", "error")
+    ticker: str
+    name: t.Optional[str]
+    forward_pe: float
+    dividend_yield: float
+    growth: t.Tuple[float, ...]
+    snp_growth: t.Tuple[float, ...]
+    error: t.Optional[str]
+
+    @classmethod
+    def from_fundamentals(cls, ticker: str, fields: dict) -> "Record":
+        """Record from a quote/`growth_estimates` field dict (see `core.pipeline`)."""
+        analysis = fields.get("growth_estimates") or {}
+        stock, index = analysis.get("stockTrend") or {}, analysis.get("indexTrend") or {}
+        return cls(
+            ticker,
+            fields.get("shortName"),
+            _float(fields.get("forwardPE")),
+            _float(fields.get("dividendYield")),
+            tuple(_float(stock.get(p)) for p in HORIZONS),
+            tuple(_float(index.get(p)) for p in HORIZONS),
+            None,
+        )
+
+    @classmethod
+    def failed(cls, ticker: str, error: str) -> "Record":
+        nan = (np.nan,) * len(HORIZONS)
+        return cls(ticker, None, np.nan, np.nan, nan, nan, error)
+
+
+# the numeric part of a record, for building the raw frame in one pass
+_RECORD_DTYPE = np.dtype([
+    ("forward_pe", "f8"),
+    ("dividend_yield", "f8"),
+    ("growth", "f8", (len(HORIZONS),)),
+    ("snp_growth", "f8", (len(HORIZONS),)),
+])
+
+
+def raw_frame(records: t.Sequence[Record]) -> pd.DataFrame:
+    """Build the typed raw input frame (`RAW_COLUMNS`) from per-ticker records."""
+    records = list(records)
+    values = np.fromiter(((r.forward_pe, r.dividend_yield, r.growth, r.snp_growth) for r in records),
+                         dtype=_RECORD_DTYPE, count=len(records))
+    columns = {
+        "Ticker": pd.Categorical([r.ticker for r in records]),
+        "Name": pd.Categorical([r.name for r in records]),
+        "forwardPE": values["forward_pe"],
+        "dividendYield": values["dividend_yield"],
+    }
+    for i, label in enumerate(l.lower() for l in HORIZONS.values()):
+        columns[f"growth_{label}"] = values["growth"][:, i]
+    for i, label in enumerate(l.lower() for l in HORIZONS.values()):
+        columns[f"snp_growth_{label}"] = values["snp_growth"][:, i]
+    columns["Error"] = pd.array([r.error for r in records], dtype="string")
+    return pd.DataFrame(columns, columns=list(RAW_COLUMNS))
+
+
+def compute_pegy(raw: pd.DataFrame, dividend_units: str = "percent") -> pd.DataFrame:
+    """Compute the PEGY table from a raw frame in one vectorized pass.
+
+    PEGY-<H> = |forward P/E| / (<H> EPS growth % + dividend yield %), for
+    every horizon H in `HORIZONS` at once (one (rows x horizons) array).
+    Value columns are float32: they're shown with 2 decimals, and the
+    computation itself runs in float64.
+
+    `dividend_units` says how the source reports `dividendYield`: Yahoo now
+    returns it already in percent (0.41 means 0.41%), older data used a
+    fraction (0.0041). The row-by-row version added the raw yield to the
+    growth *percentage* and multiplied it by 100 for display, which is only
+    right for one of the two conventions; here both terms are converted to
+    percent explicitly before they are combined.
+
+    NaN semantics follow the old table: a zero or missing P/E, growth or
+    index growth yields NaN rather than 0, a missing dividend counts as 0 in
+    the denominator and shows as NaN, and a zero denominator gives NaN.
+    """
+    if dividend_units not in ("percent", "fraction"):
+        raise ValueError(f"dividend_units must be 'percent' or 'fraction', not {dividend_units!r}")
+
+    def _nonzero(cols):
+        a = raw[cols].to_numpy(dtype="float64", na_value=np.nan)
+        return np.where(a == 0, np.nan, a)
+
+    labels = [label.lower() for label in HORIZONS.values()]
+    forward_pe = _nonzero("forwardPE")
+    growth_pct = _nonzero([f"growth_{l}" for l in labels]) * 100
+    snp_growth_pct = _nonzero([f"snp_growth_{l}" for l in labels]) * 100
+    dividend_pct = np.nan_to_num(_nonzero("dividendYield"), nan=0.0)
+    if dividend_units == "fraction":
+        dividend_pct = dividend_pct * 100
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pegy = np.abs(forward_pe)[:, None] / (growth_pct + dividend_pct[:, None])
+        vs_snp = growth_pct / snp_growth_pct
+    pegy[~np.isfinite(pegy)] = np.nan
+    vs_snp[~np.isfinite(vs_snp)] = np.nan
+
+    columns = {"Ticker": raw["Ticker"], "Name": raw["Name"], "Forward P/E": forward_pe.astype("float32")}
+    order = [DEFAULT_HORIZON] + [h for h in HORIZONS if h != DEFAULT_HORIZON]
+    for h in order:
+        i = list(HORIZONS).index(h)
+        growth, vs, pegy_col = horizon_columns(h)
+        columns[growth] = growth_pct[:, i].astype("float32")
+        columns[vs] = vs_snp[:, i].astype("float32")
+        if h == DEFAULT_HORIZON:
+            columns["Dividend %"] = np.where(dividend_pct == 0, np.nan, dividend_pct).astype("float32")
+        columns[pegy_col] = pegy[:, i].astype("float32")
+    columns["Error"] = raw["Error"]
+    return pd.DataFrame(columns, index=raw.index)
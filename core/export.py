@@ -0,0 +1,187 @@
+"""Bulk export of PEGY tables to CSV, Parquet or newline-delimited JSON.
+
+`export_table` writes every match of a `core.query.Query` (all pages, in
+the query's order) without rendering anything: rows are taken from the
+table `chunk_rows` at a time, their AI summaries (from the table, else the
+summary cache) are flattened to one column per field, and each chunk is
+written before the next is built, so memory stays bounded by the chunk
+rather than the table. CSV and Parquet go through Arrow's writers (Parquet
+files get one row group per chunk); NDJSON through pandas.
+"""
+import io
+import os
+import typing as t
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .metrics import metrics
+from .query import Query, ordered_index
+
+# optionally fill summaries the table doesn't carry from the AI summary cache
+try:
+    from ai import get_cached_summaries
+except Exception:
+    get_cached_summaries = None
+
+# format -> (file extension, MIME type)
+FORMATS = {
+    "csv": ("csv", "text/csv"),
+    "parquet": ("parquet", "application/vnd.apache.parquet"),
+    "ndjson": ("ndjson", "application/x-ndjson"),
+}
+# fields of an AI summary (see `ai.client`), exported as `Summary <field>` columns
+SUMMARY_FIELDS = ["Overview", "Core Products", "Vision", "Accomplishment", "Why"]
+DEFAULT_CHUNK_ROWS = 5000
+# display-only columns; `Summary` is replaced by its flattened fields
+_SKIP = ("Summary", "Trend")
+
+
+def _text(v) -> t.Optional[str]:
+    if isinstance(v, (list, tuple)):
+        return "; ".join(str(x) for x in v)
+    return None if v is None or v == "" else str(v)
+
+
+def _summary_columns(chunk: pd.DataFrame, summaries: bool) -> t.List[t.List[t.Optional[str]]]:
+    """One list per `SUMMARY_FIELDS` of `chunk`'s flattened summaries; missing ones come from one cache read."""
+    docs = list(chunk["Summary"]) if "Summary" in chunk.columns else [None] * len(chunk)
+    if not summaries:
+        return [[None] * len(chunk) for _ in SUMMARY_FIELDS]
+    todo = [str(tk) for tk, doc in zip(chunk["Ticker"], docs) if not isinstance(doc, dict)]
+    if todo and get_cached_summaries is not None:
+        try:
+            cached = get_cached_summaries(todo)
+        except Exception:
+            cached = {}
+        docs = [doc if isinstance(doc, dict) else cached.get(str(tk).upper())
+                for tk, doc in zip(chunk["Ticker"], docs)]
+    docs = [doc if isinstance(doc, dict) else {} for doc in docs]
+    # column by column, with plain non-empty strings passed through as they are
+    return [[v if type(v) is str and v else _text(v) for v in (doc.get(field) for doc in docs)]
+            for field in SUMMARY_FIELDS]
+
+
+def iter_export(df: pd.DataFrame, query: t.Optional[Query] = None, chunk_rows: int = DEFAULT_CHUNK_ROWS,
+                summaries: bool = True) -> t.Iterator[pd.DataFrame]:
+    """Yield `df`'s export rows in chunks of at most `chunk_rows` (at least one chunk, maybe empty).
+
+    With `query`, only its matches are exported, in its order (its page
+    and page size are ignored); otherwise every row in table order. Every
+    chunk has the same columns and dtypes: the table's columns (Ticker,
+    Name and Error as strings, `Fetched At` as UTC timestamps, no
+    `Summary`/`Trend`) plus one `Summary <field>` column per
+    `SUMMARY_FIELDS`.
+    """
+    order = np.arange(len(df)) if query is None else ordered_index(df, query)
+    columns = [c for c in df.columns if c not in _SKIP]
+    summary_columns = [f"Summary {f}" for f in SUMMARY_FIELDS]
+    step = max(1, chunk_rows)
+    for start in range(0, max(len(order), 1), step):
+        chunk = df.iloc[order[start:start + step]]
+        out = chunk[columns].reset_index(drop=True)
+        # fixed types, so an all-empty first chunk can't give the Parquet schema a null column
+        for c in ("Ticker", "Name", "Error"):
+            if c in out.columns:
+                out[c] = out[c].astype("string")
+        if "Fetched At" in out.columns:
+            out["Fetched At"] = pd.to_datetime(out["Fetched At"].round(), unit="s", utc=True)
+        at = columns.index("Name") + 1 if "Name" in columns else len(columns)
+        for i, (c, values) in enumerate(zip(summary_columns, _summary_columns(chunk, summaries))):
+            out.insert(at + i, c, pd.array(values, dtype="string"))
+        yield out
+
+
+def _write_chunks(chunks: t.Iterable[pd.DataFrame], f: t.BinaryIO, fmt: str) -> int:
+    rows = 0
+    if fmt in ("csv", "parquet"):
+        # Arrow's writers: C++ formatting, and float32 printed at float32 precision
+        import pyarrow as pa
+
+        schema = writer = None
+        try:
+            for chunk in chunks:
+                table = pa.Table.from_pandas(chunk, schema=schema, preserve_index=False)
+                if writer is None:
+                    schema = table.schema
+                    writer = _arrow_writer(f, fmt, schema)
+                writer.write_table(table)
+                rows += len(chunk)
+        finally:
+            if writer is not None:
+                writer.close()
+        return rows
+
+    text = io.TextIOWrapper(f, encoding="utf-8", newline="")
+    try:
+        for chunk in chunks:
+            if len(chunk):
+                if "Fetched At" in chunk.columns:
+                    # formatted here: `to_json` spends half its time on a tz-aware column
+                    chunk = chunk.assign(**{"Fetched At": _iso(chunk["Fetched At"])})
+                text.write(chunk.to_json(orient="records", lines=True, force_ascii=False,
+                                         double_precision=6).rstrip("\n") + "\n")
+            rows += len(chunk)
+        text.flush()
+    finally:
+        # leave `f` open for the caller
+        text.detach()
+    return rows
+
+
+def _iso(ts: pd.Series) -> pd.Series:
+    """UTC timestamps as `YYYY-MM-DDTHH:MM:SSZ` strings (missing stay missing)."""
+    text = np.datetime_as_string(ts.dt.tz_localize(None).to_numpy(dtype="datetime64[s]"), unit="s").astype(object) + "Z"
+    return pd.Series(pd.array(np.where(ts.isna().to_numpy(), None, text), dtype="string"), index=ts.index)
+
+
+def _arrow_writer(f: t.BinaryIO, fmt: str, schema):
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        return pq.ParquetWriter(f, schema)
+    import pyarrow.csv as pacsv
+
+    return pacsv.CSVWriter(f, schema, write_options=pacsv.WriteOptions(quoting_style="needed"))
+
+
+def export_table(df: pd.DataFrame, dest: t.Union[str, os.PathLike, t.BinaryIO], fmt: t.Optional[str] = None,
+                 query: t.Optional[Query] = None, chunk_rows: int = DEFAULT_CHUNK_ROWS,
+                 summaries: bool = True) -> int:
+    """Write `df` (or `query`'s matches) to `dest` as `fmt`; return the number of rows written.
+
+    `dest` is a path (written atomically; `fmt` defaults to its suffix) or
+    a binary file object. `fmt` is one of `FORMATS`. Rows stream through
+    `iter_export` in chunks of `chunk_rows`.
+    """
+    if fmt is None:
+        if not isinstance(dest, (str, os.PathLike)):
+            raise ValueError("fmt is required when exporting to a file object")
+        fmt = Path(dest).suffix.lstrip(".").lower()
+    if fmt not in FORMATS:
+        raise ValueError(f"unknown export format {fmt!r} (expected one of {', '.join(FORMATS)})")
+
+    chunks = iter_export(df, query, chunk_rows, summaries)
+    with metrics.timer("export", key=fmt):
+        if not isinstance(dest, (str, os.PathLike)):
+            rows = _write_chunks(chunks, dest, fmt)
+        else:
+            path = Path(dest)
+            tmp = path.with_name(path.name + ".tmp")
+            try:
+                with open(tmp, "wb") as f:
+                    rows = _write_chunks(chunks, f, fmt)
+                os.replace(tmp, path)
+            finally:
+                tmp.unlink(missing_ok=True)
+    metrics.incr("export.rows", rows)
+    return rows
+
+
+def export_bytes(df: pd.DataFrame, fmt: str, query: t.Optional[Query] = None,
+                 chunk_rows: int = DEFAULT_CHUNK_ROWS, summaries: bool = True) -> bytes:
+    """`export_table` into memory, e.g. for a download button."""
+    buf = io.BytesIO()
+    export_table(df, buf, fmt, query, chunk_rows, summaries)
+    return buf.getvalue()
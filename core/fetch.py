@@ -0,0 +1,93 @@
+import time
+import typing as t
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+# Yahoo tolerates a handful of parallel connections per client; more than this
+# mostly buys throttling.
+DEFAULT_MAX_WORKERS = 8
+# Seconds a single ticker may take before it is abandoned.
+DEFAULT_TIMEOUT = 20.0
+
+
+class FetchTimeout(Exception):
+    """Raised (passed to `on_error`) when a single fetch exceeds its timeout."""
+
+
+def fetch_iter(
+    tickers: t.Sequence[str],
+    fetch_one: t.Callable[[str], t.Any],
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    timeout: t.Optional[float] = DEFAULT_TIMEOUT,
+    on_error: t.Optional[t.Callable[[str, BaseException], t.Any]] = None,
+) -> t.Iterator[t.Tuple[int, t.Any]]:
+    """Like `fetch_all`, but yield `(index, result)` pairs as fetches complete.
+
+    Results arrive in completion order; `index` is the ticker's position in
+    `tickers`. Closing the generator early cancels fetches that haven't
+    started yet.
+    """
+    tickers = list(tickers)
+    if not tickers:
+        return
+
+    started: dict = {}
+
+    def _run(i, ticker):
+        started[i] = time.monotonic()
+        return fetch_one(ticker)
+
+    def _fail(i, exc):
+        return i, (on_error(tickers[i], exc) if on_error is not None else exc)
+
+    executor = ThreadPoolExecutor(max_workers=max(1, int(max_workers)), thread_name_prefix="pegy-fetch")
+    try:
+        futures = {executor.submit(_run, i, tk): i for i, tk in enumerate(tickers)}
+        pending = set(futures)
+        while pending:
+            wait_for = None
+            if timeout is not None:
+                # sleep until the oldest running fetch would hit its deadline
+                now = time.monotonic()
+                running = [started[futures[f]] for f in pending if futures[f] in started]
+                wait_for = max(0.01, min((s + timeout - now for s in running), default=timeout))
+            done, pending = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+
+            for fut in done:
+                i = futures[fut]
+                exc = fut.exception()
+                yield _fail(i, exc) if exc is not None else (i, fut.result())
+
+            if timeout is not None:
+                now = time.monotonic()
+                expired = {f for f in pending if futures[f] in started and now - started[futures[f]] >= timeout}
+                pending -= expired
+                for fut in expired:
+                    fut.cancel()
+                    yield _fail(futures[fut], FetchTimeout(f"{tickers[futures[fut]]}: no response after {timeout:g}s"))
+    finally:
+        # don't block on abandoned (timed out) fetches
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def fetch_all(
+    tickers: t.Sequence[str],
+    fetch_one: t.Callable[[str], t.Any],
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    timeout: t.Optional[float] = DEFAULT_TIMEOUT,
+    on_error: t.Optional[t.Callable[[str, BaseException], t.Any]] = None,
+) -> list:
+    """Call `fetch_one(ticker)` for every ticker on a bounded thread pool.
+
+    Results are returned in the same order as `tickers`. At most `max_workers`
+    fetches run at once. A fetch that has been running for longer than
+    `timeout` seconds is abandoned (its thread is left to finish in the
+    background) and treated as failed with `FetchTimeout`.
+
+    Failed fetches are turned into results by `on_error(ticker, exc)`; without
+    `on_error` the exception instance itself is placed in the result list.
+    """
+    tickers = list(tickers)
+    results: list = [None] * len(tickers)
+    for i, result in fetch_iter(tickers, fetch_one, max_workers=max_workers, timeout=timeout, on_error=on_error):
+        results[i] = result
+    return results
@@ -0,0 +1,324 @@
+"""Append-only PEGY history, partitioned by day, read through memory maps.
+
+Layout under `DEFAULT_DIR`::
+
+    symbols.json                      global symbol dictionary (code = position)
+    date=2026-10-18/part-<ns>.arrow   one file per append while the day is open
+                                      (merged into one part past `MAX_PARTS`)
+    date=2026-10-17/data.arrow        closed days are compacted into one file
+
+Rows are `(code uint32, ts int64, <value columns> float32)` sorted by
+`(code, ts)` within each file, so one symbol's rows are found with a binary
+search over the memory-mapped code column. Files are uncompressed Arrow IPC
+so reads are zero-copy. A query touches only the partitions in its date
+range, so its cost doesn't grow with the total history; closed days are
+immutable and their mapped tables are cached.
+"""
+import json
+import os
+import threading
+import time
+import typing as t
+from collections import OrderedDict
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .compute import HORIZONS, horizon_columns
+
+DEFAULT_DIR = Path(os.environ.get("PEGY_HISTORY_DIR") or Path(__file__).resolve().parent.parent / "cache" / "history")
+VALUE_COLUMNS = ["Forward P/E", "Dividend %"] + [c for h in HORIZONS for c in horizon_columns(h)[::2]]
+DAY = 86400
+_EMPTY = {"code": np.array([], dtype=np.uint32), "ts": np.array([], dtype=np.int64),
+          "value": np.array([], dtype=np.float32)}
+# part files an open day may collect before they are merged: every append
+# reads the open day, so its cost must not grow with the number of appends
+MAX_PARTS = 16
+
+
+def _day(ts: float) -> str:
+    return time.strftime("%Y-%m-%d", time.gmtime(ts))
+
+
+@contextmanager
+def _file_lock(path: Path):
+    """Exclusive lock across processes (no-op where `fcntl` is unavailable)."""
+    try:
+        import fcntl
+    except ImportError:
+        yield
+        return
+    with open(path, "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class HistoryStore:
+    """Daily-partitioned PEGY history; see the module docstring for the layout."""
+
+    def __init__(self, path: t.Union[str, os.PathLike] = DEFAULT_DIR, cache_size: int = 512):
+        self.path = Path(path)
+        self.cache_size = cache_size
+        self._codes: t.Dict[str, int] = {}
+        self._symbols: t.List[str] = []
+        self._tables: "OrderedDict[Path, tuple]" = OrderedDict()
+        # closed days already compacted by this process; not checked again
+        self._compacted: t.Set[str] = set()
+        # re-entrant: appending reads partitions through `_read`
+        self._lock = threading.RLock()
+
+    # -- symbol dictionary -------------------------------------------------
+
+    def _load_symbols(self):
+        try:
+            self._symbols = json.loads((self.path / "symbols.json").read_text())
+        except (OSError, ValueError):
+            self._symbols = []
+        self._codes = {s: i for i, s in enumerate(self._symbols)}
+
+    def _encode(self, symbols: t.Iterable[str]) -> np.ndarray:
+        """Codes for `symbols`, adding new ones to the dictionary (call under the file lock)."""
+        self._load_symbols()
+        new = [s for s in dict.fromkeys(symbols) if s not in self._codes]
+        if new:
+            self._symbols.extend(new)
+            self._codes.update((s, len(self._codes)) for s in new)
+            tmp = self.path / "symbols.json.tmp"
+            tmp.write_text(json.dumps(self._symbols))
+            os.replace(tmp, self.path / "symbols.json")
+        return np.fromiter((self._codes[s] for s in symbols), dtype=np.uint32)
+
+    def _code(self, symbol: str) -> t.Optional[int]:
+        if symbol.upper() not in self._codes:
+            self._load_symbols()
+        return self._codes.get(symbol.upper())
+
+    # -- writing -----------------------------------------------------------
+
+    def append(self, df: pd.DataFrame, now: t.Optional[float] = None) -> int:
+        """Append `df`'s rows (a PEGY table) as observations; return how many were new.
+
+        An observation's time is the row's `Fetched At` (when its data came
+        from Yahoo), so recomputing an unchanged table appends nothing.
+        Error rows and rows without a fetch time are skipped.
+        """
+        import pyarrow as pa
+
+        if df is None or df.empty or "Fetched At" not in df.columns:
+            return 0
+        ok = df["Error"].isna().to_numpy() if "Error" in df.columns else np.ones(len(df), dtype=bool)
+        ts = df["Fetched At"].to_numpy(dtype="float64", na_value=np.nan)
+        ok = ok & ~np.isnan(ts)
+        if not ok.any():
+            return 0
+        rows = df[ok]
+        ts = ts[ok].astype(np.int64)
+        symbols = [s.upper() for s in rows["Ticker"]]
+
+        self.path.mkdir(parents=True, exist_ok=True)
+        with self._lock, _file_lock(self.path / ".lock"):
+            codes = self._encode(symbols)
+            days = np.array([_day(v) for v in ts.tolist()])
+            keep = self._new(codes, ts, days)
+            if not keep.any():
+                return 0
+            codes, ts, days = codes[keep], ts[keep], days[keep]
+            values = {c: rows[c].to_numpy(dtype="float32", na_value=np.nan)[keep] if c in rows.columns
+                      else np.full(len(codes), np.nan, dtype="float32") for c in VALUE_COLUMNS}
+
+            # one part file per day the new observations fall on
+            for day in np.unique(days):
+                sel = days == day
+                order = np.lexsort((ts[sel], codes[sel]))
+                table = pa.table({
+                    "code": codes[sel][order],
+                    "ts": ts[sel][order],
+                    **{c: v[sel][order] for c, v in values.items()},
+                })
+                part = self.path / f"date={day}"
+                part.mkdir(exist_ok=True)
+                self._write(table, part / f"part-{time.time_ns()}.arrow")
+                # a late row for a closed day: merge it in again below
+                self._compacted.discard(part.name)
+                files = sorted(part.glob("part-*.arrow"))
+                if len(files) > MAX_PARTS:
+                    self._merge(part, files, part / f"part-{time.time_ns()}.arrow")
+            self.compact(before=_day(time.time() if now is None else now), locked=True)
+        return int(keep.sum())
+
+    @staticmethod
+    def _write(table, path: Path):
+        import pyarrow as pa
+
+        tmp = path.with_suffix(".tmp")
+        with pa.OSFile(str(tmp), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        os.replace(tmp, path)
+
+    def _new(self, codes: np.ndarray, ts: np.ndarray, days: np.ndarray) -> np.ndarray:
+        """Mask of the `(code, ts)` observations not yet recorded (nor repeated in the batch).
+
+        Each is looked up in the partition of its own day, however old: a
+        stale row served again (e.g. while the circuit breaker is open)
+        must not be appended to, and reopen, a closed day. Partitions are
+        read again every time (cheap: mapped tables are cached), so rows
+        appended by other processes are seen too.
+        """
+        # ts are epoch seconds (< 2**32): one int64 key per observation
+        key = (codes.astype(np.int64) << 32) | ts
+        keep = np.zeros(len(key), dtype=bool)
+        keep[np.unique(key, return_index=True)[1]] = True
+        for day in np.unique(days).tolist():
+            part = self.path / f"date={day}"
+            if not part.is_dir():
+                continue
+            sel = np.flatnonzero(keep & (days == day))
+            code, seen = self._read(part, ["code", "ts"])
+            keep[sel[np.isin(key[sel], (code.astype(np.int64) << 32) | seen)]] = False
+        return keep
+
+    def compact(self, before: t.Optional[str] = None, locked: bool = False):
+        """Merge the part files of every day before `before` (YYYY-MM-DD) into `data.arrow`."""
+        before = before or _day(time.time())
+        for part in self._partitions():
+            if part.name[5:] >= before or part.name in self._compacted:
+                continue
+            files = sorted(part.glob("*.arrow"))
+            self._compacted.add(part.name)
+            if len(files) == 1 and files[0].name == "data.arrow":
+                continue
+            with (nullcontext() if locked else _file_lock(self.path / ".lock")):
+                self._merge(part, files, part / "data.arrow")
+
+    def _merge(self, part: Path, files: t.List[Path], out: Path):
+        """Rewrite `files` of `part` as one sorted file `out` (call under the file lock)."""
+        import pyarrow as pa
+
+        table = pa.concat_tables([self._map(f) for f in files])
+        order = np.lexsort((table["ts"].to_numpy(), table["code"].to_numpy()))
+        self._write(table.take(pa.array(order)), out)
+        for f in files:
+            if f != out:
+                f.unlink(missing_ok=True)
+        self._tables.pop(part, None)
+
+    # -- reading -----------------------------------------------------------
+
+    def _partitions(self, start: t.Optional[str] = None, end: t.Optional[str] = None) -> t.List[Path]:
+        try:
+            names = sorted(n for n in os.listdir(self.path) if n.startswith("date="))
+        except FileNotFoundError:
+            return []
+        return [self.path / n for n in names if (start is None or n[5:] >= start) and (end is None or n[5:] <= end)]
+
+    @staticmethod
+    def _map(path: Path):
+        import pyarrow as pa
+
+        return pa.ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+
+    def _read(self, part: Path, columns: t.Sequence[str]) -> t.List[np.ndarray]:
+        """`columns` of a partition as arrays (zero-copy for compacted days)."""
+        import pyarrow as pa
+
+        files = sorted(part / n for n in os.listdir(part) if n.endswith(".arrow"))
+        if not files:
+            return [_EMPTY.get(c, _EMPTY["value"]).copy() for c in columns]
+        key = part
+        with self._lock:
+            cached = self._tables.get(key)
+            if cached is not None and cached[0] == files:
+                self._tables.move_to_end(key)
+                table = cached[1]
+            else:
+                table = self._map(files[0]) if len(files) == 1 else pa.concat_tables([self._map(f) for f in files])
+                if len(files) > 1:
+                    order = np.lexsort((table["ts"].to_numpy(), table["code"].to_numpy()))
+                    table = table.take(pa.array(order))
+                self._tables[key] = (files, table)
+                while len(self._tables) > self.cache_size:
+                    self._tables.popitem(last=False)
+        return [table[c].to_numpy() for c in columns]
+
+    def query(self, symbols: t.Optional[t.Iterable[str]] = None, start: t.Optional[float] = None,
+              end: t.Optional[float] = None, columns: t.Sequence[str] = ("PEGY-1Y",)) -> pd.DataFrame:
+        """Observations in `[start, end]` (epoch seconds) as `Ticker, ts, <columns>` rows."""
+        with self._lock:
+            self._load_symbols()
+            symbols_list = list(self._symbols)
+        codes = None if symbols is None else np.array(
+            sorted(c for c in (self._codes.get(s.upper()) for s in symbols) if c is not None), dtype=np.uint32)
+        parts = self._partitions(None if start is None else _day(start), None if end is None else _day(end))
+        chunks: t.List[t.List[np.ndarray]] = []
+        for part in parts:
+            code, ts, *vals = self._read(part, ["code", "ts", *columns])
+            if codes is None:
+                sel = np.ones(len(code), dtype=bool)
+            else:
+                lo, hi = np.searchsorted(code, codes, "left"), np.searchsorted(code, codes, "right")
+                sel = np.zeros(len(code), dtype=bool)
+                for a, b in zip(lo.tolist(), hi.tolist()):
+                    sel[a:b] = True
+            if start is not None:
+                sel &= ts >= start
+            if end is not None:
+                sel &= ts <= end
+            chunks.append([code[sel], ts[sel], *(v[sel] for v in vals)])
+        # concatenated once: one DataFrame however many days the range spans
+        arrays = [np.concatenate(c) for c in zip(*chunks)] if chunks else [
+            np.array([], dtype=np.uint32), np.array([], dtype=np.int64), *(np.array([], dtype="float32") for _ in columns)]
+        out = pd.DataFrame(dict(zip(["code", "ts", *columns], arrays)))
+        names = np.array(symbols_list + [""], dtype=object)
+        out.insert(0, "Ticker", pd.Categorical(names[out.pop("code").to_numpy(dtype=np.int64)]))
+        return out.sort_values(["Ticker", "ts"], kind="stable").reset_index(drop=True)
+
+    def sparklines(self, symbols: t.Sequence[str], column: str = "PEGY-1Y", days: int = 90,
+                   now: t.Optional[float] = None) -> t.Dict[str, t.List[float]]:
+        """Last value per day over the last `days` days for each of `symbols` (NaN days dropped)."""
+        now = time.time() if now is None else now
+        wanted = {s.upper(): self._code(s) for s in symbols}
+        found = {s: c for s, c in wanted.items() if c is not None}
+        out: t.Dict[str, t.List[float]] = {s: [] for s in wanted}
+        if not found:
+            return out
+        codes = np.array(list(found.values()), dtype=np.uint32)
+        for part in self._partitions(_day(now - days * DAY), _day(now)):
+            code, value = self._read(part, ["code", column])
+            hi = np.searchsorted(code, codes, "right")
+            lo = np.searchsorted(code, codes, "left")
+            for symbol, a, b in zip(found, lo.tolist(), hi.tolist()):
+                # rows are sorted by ts within a code, so the day's last value is at b - 1
+                if b > a and not np.isnan(value[b - 1]):
+                    out[symbol].append(float(value[b - 1]))
+        return out
+
+    def stats(self) -> dict:
+        parts = self._partitions()
+        files = [f for p in parts for f in p.glob("*.arrow")]
+        with self._lock:
+            self._load_symbols()
+            symbols = len(self._symbols)
+        return {
+            "days": len(parts),
+            "files": len(files),
+            "symbols": symbols,
+            "bytes": sum(f.stat().st_size for f in files),
+        }
+
+
+_default_store = None
+_default_lock = threading.Lock()
+
+
+def get_history() -> HistoryStore:
+    """Return the process-wide history store at `DEFAULT_DIR`."""
+    global _default_store
+    with _default_lock:
+        if _default_store is None:
+            _default_store = HistoryStore()
+        return _default_store
@@ -0,0 +1,112 @@
+import json
+import re
+import threading
+import time
+import typing as t
+from collections import Counter, deque
+from contextlib import contextmanager
+from pathlib import Path
+
+
+# Samples kept per timer; percentiles cover the most recent ones.
+MAX_SAMPLES = 4096
+PERCENTILES = (50, 90, 99)
+
+
+class Metrics:
+    """Thread-safe counters and timers for the fetch/compute/render/AI paths.
+
+    Timers keep the last `MAX_SAMPLES` durations (seconds) per name, plus the
+    latest duration per key (e.g. per ticker) so slow symbols can be listed.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters: Counter = Counter()
+        self._samples: t.Dict[str, deque] = {}
+        self._totals: Counter = Counter()
+        self._by_key: t.Dict[str, t.Dict[str, float]] = {}
+
+    def incr(self, name: str, n: int = 1):
+        with self._lock:
+            self.counters[name] += n
+
+    def observe(self, name: str, seconds: float, key: t.Optional[str] = None):
+        with self._lock:
+            self._samples.setdefault(name, deque(maxlen=MAX_SAMPLES)).append(seconds)
+            self._totals[name] += 1
+            if key is not None:
+                self._by_key.setdefault(name, {})[key] = seconds
+
+    @contextmanager
+    def timer(self, name: str, key: t.Optional[str] = None):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, key)
+
+    def slowest(self, name: str, n: int = 10) -> t.List[t.Tuple[str, float]]:
+        """The `n` keys with the longest latest duration for timer `name`."""
+        with self._lock:
+            items = list(self._by_key.get(name, {}).items())
+        return sorted(items, key=lambda kv: kv[1], reverse=True)[:n]
+
+    def snapshot(self) -> dict:
+        """Counters plus count/mean/percentiles/max per timer, as plain data."""
+        import numpy as np
+
+        with self._lock:
+            counters = dict(self.counters)
+            samples = {k: np.fromiter(v, dtype="float64") for k, v in self._samples.items()}
+            totals = dict(self._totals)
+        timers = {}
+        for name, arr in samples.items():
+            if not len(arr):
+                continue
+            stats = {"count": totals[name], "mean": float(arr.mean()), "max": float(arr.max())}
+            for p, v in zip(PERCENTILES, np.percentile(arr, PERCENTILES)):
+                stats[f"p{p}"] = float(v)
+            timers[name] = stats
+        return {"counters": counters, "timers": timers, "generated_at": time.time()}
+
+    def to_prometheus(self) -> str:
+        """Render the snapshot in the Prometheus text exposition format."""
+        snap = self.snapshot()
+        lines = []
+        for name, value in sorted(snap["counters"].items()):
+            metric = f"pegy_{_metric_name(name)}_total"
+            lines += [f"# TYPE {metric} counter", f"{metric} {value}"]
+        for name, stats in sorted(snap["timers"].items()):
+            metric = f"pegy_{_metric_name(name)}_seconds"
+            lines.append(f"# TYPE {metric} summary")
+            for p in PERCENTILES:
+                lines.append(f'{metric}{{quantile="{p / 100:g}"}} {stats[f"p{p}"]:.6f}')
+            lines.append(f"{metric}_count {stats['count']}")
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path: t.Union[str, Path]):
+        """Write the metrics to `path`: Prometheus text for `.prom`, JSON otherwise.
+
+        The file is replaced atomically, so scrapers never read a partial dump.
+        """
+        path = Path(path)
+        text = self.to_prometheus() if path.suffix == ".prom" else json.dumps(self.snapshot(), indent=2)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(text, encoding="utf-8")
+        tmp.replace(path)
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self._samples.clear()
+            self._totals.clear()
+            self._by_key.clear()
+
+
+def _metric_name(name: str) -> str:
+    return re.sub(r"[^0-9A-Za-z_]", "_", name)
+
+
+# Process-wide registry used by the app.
+metrics = Metrics()
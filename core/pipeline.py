@@ -0,0 +1,229 @@
+"""Streamlit-free PEGY pipeline: fetch fundamentals, compute the table, refresh it.
+
+`calculate_pegy` wraps this for the dashboard; `precompute.py` runs it from
+the command line.
+"""
+import time
+import typing as t
+
+import pandas as pd
+
+from .backends import QUOTE_FIELDS, get_backend
+from .compute import Record, compute_pegy, raw_frame
+from .fetch import fetch_all, fetch_iter, DEFAULT_MAX_WORKERS, DEFAULT_TIMEOUT
+from .history import get_history
+from .metrics import metrics
+from .refresh import changed_symbols, merge_rows
+from .resilience import CircuitOpen, is_transient
+from .singleflight import fundamentals_flight, quotes_flight
+from .store import get_store
+
+# optionally use AI summary generation
+try:
+    from ai import generate_company_summary, get_cached_summaries
+except Exception:
+    generate_company_summary = None
+    get_cached_summaries = None
+
+
+def _load_quotes(tickers, max_workers, timeout, now=None):
+    """Bulk-fetch quote fields for tickers whose cached quote is missing or stale.
+
+    Symbols are grouped into `batch_size` requests; a failed batch is ignored
+    here and its symbols are retried one by one in `_fundamentals`. Symbols
+    another session is already bulk-fetching are waited for, not requested
+    again (`core.singleflight`).
+    """
+    store = get_store()
+    backend = get_backend()
+    need = list(store.missing(tickers, QUOTE_FIELDS, now=now))
+    metrics.incr("cache.fundamentals.quote.hit", len({tk.upper() for tk in tickers}) - len(need))
+    metrics.incr("cache.fundamentals.quote.miss", len(need))
+    size = max(1, backend.batch_size)
+
+    def _fetch_batch(batch):
+        with metrics.timer("yahoo.quotes_batch"):
+            quotes = backend.quotes(batch)
+        for symbol, quote in quotes.items():
+            store.put(symbol, {f: quote.get(f) for f in QUOTE_FIELDS})
+
+    def _batch_error(batch, exc):
+        # its symbols are retried one by one in `_fundamentals`; counted so an
+        # outage of the bulk quote endpoint shows up in diagnostics
+        metrics.incr("fetch.quotes_batch_error")
+
+    def _fetch(symbols):
+        batches = [tuple(symbols[i:i + size]) for i in range(0, len(symbols), size)]
+        fetch_all(batches, _fetch_batch, max_workers=max_workers, timeout=timeout, on_error=_batch_error)
+
+    quotes_flight.do_many(need, _fetch)
+
+
+def _fundamentals(ticker, now=None) -> dict:
+    """Return the fields PEGY needs for `ticker`, fetching only what is stale.
+
+    Fresh fields come from the shared on-disk store. Quote fields missing
+    after the bulk pass are fetched for this symbol alone; `growth_estimates`
+    is always per symbol. Fetched values are written back to the store.
+    `now` (default: the current time) decides what counts as stale.
+
+    While the backend's circuit breaker is open (or a request still fails
+    transiently after its retries), expired last-known-good values from the
+    store are used instead; they are not written back, so they stay stale
+    and are re-fetched once Yahoo recovers.
+    """
+    store = get_store()
+    backend = get_backend()
+    fields = store.get([ticker], now=now)[ticker.upper()]
+
+    try:
+        if any(f not in fields for f in QUOTE_FIELDS):
+            with metrics.timer("yahoo.quote", key=ticker):
+                quote = backend.quote(ticker)
+            fetched = {f: quote.get(f) for f in QUOTE_FIELDS}
+            store.put(ticker, fetched)
+            fields.update(fetched)
+
+        if "growth_estimates" not in fields:
+            metrics.incr("cache.fundamentals.growth.miss")
+            with metrics.timer("yahoo.growth_estimates", key=ticker):
+                fetched = {"growth_estimates": backend.growth_estimates(ticker)}
+            store.put(ticker, fetched)
+            fields.update(fetched)
+        else:
+            metrics.incr("cache.fundamentals.growth.hit")
+    except Exception as e:
+        if not (isinstance(e, CircuitOpen) or is_transient(e)):
+            raise
+        last_known = store.get([ticker], stale_ok=True)[ticker.upper()]
+        if "growth_estimates" not in last_known or any(f not in last_known for f in QUOTE_FIELDS):
+            raise
+        metrics.incr("fetch.served_stale")
+        fields = dict(last_known, **fields)
+
+    return fields
+
+
+def _raw_record(ticker) -> Record:
+    """Fetch the raw PEGY inputs for one ticker."""
+    with metrics.timer("fetch.ticker", key=ticker):
+        # sessions asking for the same ticker at once share one fetch
+        info = fundamentals_flight.do(ticker, _fundamentals, ticker)
+
+    # only the needed fields are kept; the payloads are dropped here. The one
+    # growth_estimates response holds the stock and S&P trends of every horizon
+    return Record.from_fundamentals(ticker, info)
+
+
+def _error_record(ticker, exc) -> Record:
+    metrics.incr("fetch.error")
+    return Record.failed(ticker, str(exc))
+
+
+def _summaries(df, generate_summaries: bool = False) -> list:
+    """Return the `Summary` column: cached AI summaries, optionally generating missing ones."""
+    out = [None] * len(df)
+    if get_cached_summaries is None:
+        return out
+    try:
+        cached = get_cached_summaries([tk for tk, err in zip(df["Ticker"], df["Error"]) if pd.isna(err)])
+    except Exception:
+        # do not fail the whole run if AI fails
+        return out
+    for i, (ticker, name, error) in enumerate(zip(df["Ticker"], df["Name"], df["Error"])):
+        if not pd.isna(error):
+            continue
+        summary = cached.get(ticker.upper())
+        if not summary and generate_summaries and generate_company_summary is not None:
+            # generate and cache via ai client
+            try:
+                summary = generate_company_summary(ticker, name if isinstance(name, str) and name else None)
+            except Exception:
+                summary = None
+        out[i] = summary or None
+    return out
+
+
+def calculate(tickers, generate_summaries: bool = False, max_workers: int = DEFAULT_MAX_WORKERS, timeout: float = DEFAULT_TIMEOUT):
+    """Compute the PEGY table for `tickers` (see `calculate_pegy.calculate_pegy`)."""
+    with metrics.timer("fetch.table"):
+        _load_quotes(tickers, max_workers, timeout)
+        records = fetch_all(tickers, _raw_record, max_workers=max_workers, timeout=timeout, on_error=_error_record)
+    return _table(records, generate_summaries)
+
+
+def _table(records, generate_summaries: bool = False):
+    """Turn raw records into the PEGY table (computed columns, summaries, fetch times)."""
+    with metrics.timer("compute"):
+        df = compute_pegy(raw_frame(records))
+    df.insert(2, "Summary", _summaries(df, generate_summaries))
+    stored_at = get_store().fetched_at(df["Ticker"])
+    df["Fetched At"] = [stored_at.get(tk.upper(), float("nan")) for tk in df["Ticker"]]
+    try:
+        # rows whose data was already recorded (same fetch time) are skipped
+        with metrics.timer("history"):
+            metrics.incr("history.rows", get_history().append(df))
+    except Exception:
+        metrics.incr("history.errors")
+    return df
+
+
+def calculate_stream(tickers, chunk_size: int = 25, max_wait: float = 1.0,
+                          max_workers: int = DEFAULT_MAX_WORKERS, timeout: float = DEFAULT_TIMEOUT):
+    """Yield the PEGY table for `tickers` in chunks, as tickers finish fetching.
+
+    A chunk is emitted once `chunk_size` rows are ready or `max_wait` seconds
+    after the previous chunk, whichever comes first, so the first rows show
+    up after roughly one fetch latency. Chunks are in completion order; every
+    ticker appears in exactly one chunk. Not cached by Streamlit: callers keep
+    the chunks they have received, so an interrupted run keeps its progress.
+    """
+    _load_quotes(tickers, max_workers, timeout)
+    buf = []
+    last = time.monotonic()
+    for _, record in fetch_iter(tickers, _raw_record, max_workers=max_workers, timeout=timeout, on_error=_error_record):
+        buf.append(record)
+        if len(buf) >= chunk_size or time.monotonic() - last >= max_wait:
+            yield _table(buf)
+            buf = []
+            last = time.monotonic()
+    if buf:
+        yield _table(buf)
+
+
+def warm(tickers, ahead: float = 0.0, max_workers: int = 2, timeout: float = DEFAULT_TIMEOUT) -> t.List[str]:
+    """Re-fetch the fundamentals of `tickers` that are missing or expire within `ahead` seconds.
+
+    Only writes the shared store (no table is built); the next `calculate`
+    for these tickers then finds everything fresh. Returns the symbols that
+    were due.
+    """
+    now = time.time() + ahead
+    store = get_store()
+    due = list(store.missing(tickers, now=now))
+    if not due:
+        return due
+    _load_quotes(due, max_workers, timeout, now=now)
+    # growth estimates, and quotes the bulk requests didn't return
+    fetch_all(list(store.missing(due, now=now)), lambda tk: fundamentals_flight.do(tk, _fundamentals, tk, now),
+              max_workers=max_workers, timeout=timeout, on_error=lambda tk, e: metrics.incr("prefetch.error"))
+    return due
+
+
+def refresh(df, invalidated=(), max_workers: int = DEFAULT_MAX_WORKERS, timeout: float = DEFAULT_TIMEOUT):
+    """Incrementally refresh a table returned by `calculate`.
+
+    Only tickers that are stale in the fundamentals store, errored, listed in
+    `invalidated`, or newer in the store than in `df` are recomputed (and
+    only their stale fields re-fetched); their rows are merged back into
+    `df` in place of the old ones. Returns `df` unchanged when nothing is out
+    of date.
+    """
+    store = get_store()
+    invalidated = [s for s in invalidated if s]
+    if invalidated:
+        store.invalidate(invalidated)
+    changed = changed_symbols(df, store, invalidated)
+    if not changed:
+        return df
+    return merge_rows(df, calculate(tuple(changed), max_workers=max_workers, timeout=timeout))
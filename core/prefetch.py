@@ -0,0 +1,220 @@
+"""Background warm-up of the fundamentals store ahead of TTL expiry.
+
+A `Prefetcher` wakes every `interval` seconds, finds the symbols of its
+universes (plus recently viewed ones) whose store fields are missing or
+expire within `ahead` seconds, and re-fetches at most `budget` of them,
+hottest first (`core.pipeline.warm`). Interactive requests then read fresh
+fields from the shared store instead of waiting on Yahoo.
+
+It runs as a daemon thread inside the dashboard process, or in its own
+process (`prefetch.py`); both share the on-disk store. Access counts decay
+exponentially (`half_life`) and are written to `ACCESS_PATH`, so a
+separate prefetch process can prioritise what the dashboard's users view.
+"""
+import json
+import os
+import threading
+import time
+import typing as t
+from pathlib import Path
+
+from .metrics import metrics
+
+DEFAULT_UNIVERSES = ("watchlist", "mags", "snp")
+# seconds between passes, and how far ahead of expiry fields are re-fetched;
+# `ahead` has to leave time for `budget`-sized passes to cover the universes.
+# 100 symbols per 30 s averages ~3 requests/s, under half of the
+# `ResilientBackend` rate limit that prefetching shares with interactive use
+DEFAULT_INTERVAL = 30.0
+DEFAULT_AHEAD = 10 * 60
+DEFAULT_BUDGET = 100
+# fetch threads per pass: well below the interactive pool, so users keep most of the rate limit
+DEFAULT_MAX_WORKERS = 2
+DEFAULT_HALF_LIFE = 3600.0
+ACCESS_PATH = Path(os.environ.get("PEGY_ACCESS_FILE") or Path(__file__).resolve().parent.parent / "cache" / "access.json")
+# access counts are written at most this often (seconds)
+SAVE_EVERY = 30.0
+
+
+class Prefetcher:
+    """Periodic, prioritised warm-up of `symbols()` (see the module docstring).
+
+    `symbols` returns the configured universes' tickers in their priority
+    order (e.g. watchlist first). Viewed symbols rank above it by their
+    decayed access count; viewed symbols outside the universes are warmed
+    too while their count is at least `min_score`.
+    """
+
+    def __init__(self, symbols: t.Callable[[], t.Sequence[str]], interval: float = DEFAULT_INTERVAL,
+                 ahead: float = DEFAULT_AHEAD, budget: int = DEFAULT_BUDGET,
+                 max_workers: int = DEFAULT_MAX_WORKERS, half_life: float = DEFAULT_HALF_LIFE,
+                 min_score: float = 0.5, access_path: t.Optional[t.Union[str, os.PathLike]] = ACCESS_PATH,
+                 warm: t.Optional[t.Callable[..., t.List[str]]] = None):
+        self.symbols = symbols
+        self.interval = interval
+        self.ahead = ahead
+        self.budget = budget
+        self.max_workers = max_workers
+        self.half_life = half_life
+        self.min_score = min_score
+        self.access_path = Path(access_path) if access_path else None
+        self._warm = warm
+        # symbol -> (score, time of the score)
+        self._access: t.Dict[str, t.Tuple[float, float]] = {}
+        self._saved_at = 0.0
+        self._loaded_mtime = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: t.Optional[threading.Thread] = None
+        self.last_run: t.Optional[dict] = None
+
+    # -- access frequency --------------------------------------------------
+
+    def _decayed(self, score: float, at: float, now: float) -> float:
+        return score * 0.5 ** ((now - at) / self.half_life)
+
+    def record_access(self, tickers: t.Iterable[str], now: t.Optional[float] = None):
+        """Count one view of each of `tickers`."""
+        now = time.time() if now is None else now
+        with self._lock:
+            for tk in {tk.strip().upper() for tk in tickers} - {""}:
+                score, at = self._access.get(tk, (0.0, now))
+                self._access[tk] = (self._decayed(score, at, now) + 1.0, now)
+            due = self.access_path is not None and now - self._saved_at >= SAVE_EVERY
+            if due:
+                self._saved_at = now
+                doc = dict(self._access)
+        if due:
+            self._save(doc)
+
+    def _save(self, doc):
+        try:
+            self.access_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.access_path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(doc))
+            os.replace(tmp, self.access_path)
+        except OSError:
+            pass
+
+    def _load(self):
+        """Merge in access counts written by another process (when the file changed)."""
+        if self.access_path is None:
+            return
+        try:
+            mtime = self.access_path.stat().st_mtime
+            if mtime == self._loaded_mtime:
+                return
+            doc = json.loads(self.access_path.read_text())
+        except (OSError, ValueError):
+            return
+        with self._lock:
+            self._loaded_mtime = mtime
+            for tk, (score, at) in doc.items():
+                mine = self._access.get(tk)
+                if mine is None or mine[1] < at:
+                    self._access[tk] = (float(score), float(at))
+
+    def scores(self, now: t.Optional[float] = None) -> t.Dict[str, float]:
+        """Current decayed access count per viewed symbol."""
+        now = time.time() if now is None else now
+        self._load()
+        with self._lock:
+            return {tk: self._decayed(score, at, now) for tk, (score, at) in self._access.items()}
+
+    # -- scheduling ----------------------------------------------------------
+
+    def plan(self, now: t.Optional[float] = None) -> t.List[str]:
+        """Every candidate symbol, hottest first: viewed by access count, then universe order."""
+        scores = self.scores(now)
+        configured = list(dict.fromkeys(tk.upper() for tk in self.symbols()))
+        rank = {tk: i for i, tk in enumerate(configured)}
+        viewed = [tk for tk, s in scores.items() if s >= self.min_score]
+        candidates = list(dict.fromkeys(viewed + configured))
+        return sorted(candidates, key=lambda tk: (-scores.get(tk, 0.0), rank.get(tk, len(rank))))
+
+    def run_once(self, now: t.Optional[float] = None) -> t.List[str]:
+        """One pass: warm up to `budget` of the hottest symbols that are due."""
+        from .store import get_store
+
+        warm = self._warm
+        if warm is None:
+            from .pipeline import warm
+
+        started = time.perf_counter()
+        candidates = self.plan(now)
+        due = list(get_store().missing(candidates, now=(time.time() if now is None else now) + self.ahead))
+        order = {tk: i for i, tk in enumerate(candidates)}
+        batch = sorted(due, key=order.get)[:self.budget]
+        if batch:
+            with metrics.timer("prefetch.run"):
+                warm(batch, ahead=self.ahead, max_workers=self.max_workers)
+        metrics.incr("prefetch.runs")
+        metrics.incr("prefetch.symbols", len(batch))
+        self.last_run = {"at": time.time(), "candidates": len(candidates), "due": len(due),
+                         "warmed": len(batch), "seconds": time.perf_counter() - started}
+        return batch
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            if _circuit_open():
+                metrics.incr("prefetch.skipped")
+                continue
+            try:
+                self.run_once()
+            except Exception:
+                metrics.incr("prefetch.error")
+
+    def start(self):
+        """Run passes every `interval` seconds on a daemon thread (no-op if running)."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return self
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="pegy-prefetch", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, wait: bool = False):
+        self._stop.set()
+        if wait and self._thread is not None:
+            self._thread.join()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+
+def _circuit_open() -> bool:
+    """Whether Yahoo requests are currently short-circuited; passes are skipped meanwhile."""
+    from .backends import get_backend
+
+    breaker = getattr(get_backend(), "breaker", None)
+    return breaker is not None and breaker.state == "open"
+
+
+def registry_symbols(names: t.Sequence[str] = DEFAULT_UNIVERSES) -> t.Callable[[], t.List[str]]:
+    """A `symbols` callable over universes of `tickers.registry`, in `names` order."""
+
+    def _symbols():
+        from tickers import get_registry
+
+        from .universe import union
+
+        registry = get_registry()
+        return union(*(registry.get(n) for n in names if n in registry.universes))
+
+    return _symbols
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def get_prefetcher() -> Prefetcher:
+    """Return the process-wide prefetcher over `PEGY_PREFETCH_UNIVERSES` (not started)."""
+    global _default
+    with _default_lock:
+        if _default is None:
+            names = os.environ.get("PEGY_PREFETCH_UNIVERSES")
+            _default = Prefetcher(registry_symbols(names.split(",") if names else DEFAULT_UNIVERSES))
+        return _default
@@ -0,0 +1,127 @@
+"""Screening and top-N queries over a PEGY table.
+
+`run_query` filters with vectorized masks and orders only as much of the
+table as the requested page needs: `np.partition` finds the sort key at the
+end of the page in O(n), and only the rows up to it are sorted; only the
+page itself is materialized.
+"""
+import math
+import typing as t
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from .compute import DEFAULT_HORIZON, horizon_columns
+
+# sort key meaning "closest to zero first": |PEGY| for the query's horizon
+SORT_ABS_PEGY = "PEGY (abs)"
+
+
+@dataclass
+class Query:
+    """Filters, ordering and the page to return.
+
+    PEGY and growth filters (and the |PEGY| sort) use `horizon`'s columns.
+    Range filters are inclusive and drop rows whose value is NaN;
+    `min_dividend` keeps dividends strictly above it. `top_n` caps the
+    number of matches before paging.
+    """
+
+    horizon: str = DEFAULT_HORIZON
+
+    pegy_min: t.Optional[float] = None
+    pegy_max: t.Optional[float] = None
+    min_growth: t.Optional[float] = None
+    min_dividend: t.Optional[float] = None
+    sort: str = SORT_ABS_PEGY
+    ascending: bool = True
+    top_n: t.Optional[int] = None
+    page: int = 0
+    page_size: int = 50
+
+
+@dataclass
+class QueryResult:
+    frame: pd.DataFrame
+    # matching rows (after top_n) and the 0-based position of `frame`'s first row among them
+    total: int
+    start: int
+    page: int
+    pages: int
+
+
+def _values(df: pd.DataFrame, column: str) -> np.ndarray:
+    return df[column].to_numpy(dtype="float64", na_value=np.nan)
+
+
+def screen_mask(df: pd.DataFrame, q: Query) -> np.ndarray:
+    """Boolean mask of the rows passing `q`'s filters."""
+    growth, _, pegy = horizon_columns(q.horizon)
+    mask = np.ones(len(df), dtype=bool)
+    filters = [
+        (pegy, q.pegy_min, np.greater_equal),
+        (pegy, q.pegy_max, np.less_equal),
+        (growth, q.min_growth, np.greater_equal),
+        ("Dividend %", q.min_dividend, np.greater),
+    ]
+    for column, bound, op in filters:
+        if bound is not None and column in df.columns:
+            with np.errstate(invalid="ignore"):
+                mask &= op(_values(df, column), bound)
+    return mask
+
+
+def sort_key(df: pd.DataFrame, sort: str, ascending: bool = True, horizon: str = DEFAULT_HORIZON) -> np.ndarray:
+    """Float key that orders rows ascending as requested, with NaN (or blanks) last."""
+    if sort == SORT_ABS_PEGY:
+        key = np.abs(_values(df, horizon_columns(horizon)[2]))
+    elif pd.api.types.is_numeric_dtype(df[sort]):
+        key = _values(df, sort)
+    else:
+        # text columns: rank the distinct values, blanks last
+        values = df[sort].astype("string").str.upper()
+        codes, _ = pd.factorize(values, sort=True)
+        key = np.where(codes < 0, np.nan, codes).astype("float64")
+    if not ascending:
+        key = -key
+    return np.where(np.isnan(key), np.inf, key)
+
+
+def _ordered(df: pd.DataFrame, q: Query, idx: np.ndarray, end: int) -> np.ndarray:
+    """Positions in `idx` of the first `end` matches in `q`'s order."""
+    key = sort_key(df, q.sort, q.ascending, q.horizon)[idx] if q.sort == SORT_ABS_PEGY or q.sort in df.columns else None
+    if key is None:
+        return np.arange(end)
+    if end < len(idx):
+        # everything up to the page's last key (ties included), found in O(n)
+        threshold = np.partition(key, end - 1)[end - 1]
+        candidates = np.flatnonzero(key <= threshold)
+    else:
+        candidates = np.arange(len(idx))
+    return candidates[np.lexsort((candidates, key[candidates]))][:end]
+
+
+def ordered_index(df: pd.DataFrame, q: Query) -> np.ndarray:
+    """Row positions of every match of `q` (all pages, capped at `top_n`), in order."""
+    idx = np.flatnonzero(screen_mask(df, q))
+    total = len(idx) if q.top_n is None else min(len(idx), max(0, q.top_n))
+    return idx[_ordered(df, q, idx, total)] if total else idx[:0]
+
+
+def run_query(df: pd.DataFrame, q: Query) -> QueryResult:
+    """Return the requested page of `df` filtered and ordered by `q`.
+
+    Ties keep table order, so pages never overlap or skip rows.
+    """
+    idx = np.flatnonzero(screen_mask(df, q))
+    total = len(idx) if q.top_n is None else min(len(idx), max(0, q.top_n))
+    size = max(1, q.page_size)
+    pages = max(1, math.ceil(total / size))
+    page = min(max(0, q.page), pages - 1)
+    start, end = page * size, min((page + 1) * size, total)
+    if end <= start:
+        return QueryResult(df.iloc[:0], total, start, page, pages)
+
+    order = _ordered(df, q, idx, end)
+    return QueryResult(df.iloc[idx[order[start:end]]].reset_index(drop=True), total, start, page, pages)
@@ -0,0 +1,67 @@
+import typing as t
+
+import numpy as np
+import pandas as pd
+
+from .store import FundamentalsStore
+
+
+def changed_symbols(
+    df: pd.DataFrame,
+    store: FundamentalsStore,
+    invalidated: t.Iterable[str] = (),
+) -> t.List[str]:
+    """Return the tickers of `df` whose rows need rebuilding.
+
+    A row is out of date when any of its fields is missing or past its TTL
+    in `store`, when it is an error row, when it was explicitly
+    `invalidated`, or when the store holds a newer fetch than the row's
+    `Fetched At` (another session or process refreshed it).
+    """
+    if df is None or df.empty or "Ticker" not in df.columns:
+        return []
+    tickers = list(df["Ticker"])
+    invalidated = {s.upper() for s in invalidated}
+    missing = store.missing(tickers)
+    stored_at = store.fetched_at(tickers)
+    fetched = df["Fetched At"] if "Fetched At" in df.columns else pd.Series(0.0, index=df.index)
+    errors = df["Error"] if "Error" in df.columns else pd.Series(None, index=df.index)
+
+    out = []
+    for ticker, at, error in zip(tickers, fetched, errors):
+        sym = ticker.upper()
+        if sym in invalidated or sym in missing or not pd.isna(error) or stored_at.get(sym, 0) > (0 if pd.isna(at) else at):
+            out.append(ticker)
+    return out
+
+
+def merge_rows(df: pd.DataFrame, fresh: pd.DataFrame) -> pd.DataFrame:
+    """Replace rows of `df` with the rows of `fresh` that have the same `Ticker`.
+
+    Row order of `df` is kept; tickers only in `fresh` are appended.
+    Categorical columns stay categorical (with the union of both sides'
+    categories, minus those no row uses any more).
+    """
+    if fresh is None or fresh.empty:
+        return df
+    if df is None or df.empty:
+        return fresh.reset_index(drop=True)
+    fresh = fresh.drop_duplicates("Ticker", keep="last").reset_index(drop=True)
+    df = df.reset_index(drop=True)
+    keys = fresh["Ticker"].astype(str).to_numpy()
+    pos = pd.Index(keys).get_indexer(df["Ticker"].astype(str))
+    categorical = [c for c in df.columns if isinstance(df[c].dtype, pd.CategoricalDtype)
+                   and c in fresh.columns and isinstance(fresh[c].dtype, pd.CategoricalDtype)]
+    if categorical:
+        # concat would fall back to object columns for differing categories
+        for c in categorical:
+            categories = df[c].cat.categories.union(fresh[c].cat.categories)
+            df[c] = df[c].cat.set_categories(categories)
+            fresh[c] = fresh[c].cat.set_categories(categories)
+    combined = pd.concat([df, fresh], ignore_index=True)
+    take = np.where(pos >= 0, len(df) + pos, np.arange(len(df)))
+    extra = len(df) + np.flatnonzero(~np.isin(keys, df["Ticker"].astype(str).to_numpy()))
+    out = combined.iloc[np.concatenate([take, extra])].reset_index(drop=True)
+    for c in categorical:
+        out[c] = out[c].cat.remove_unused_categories()
+    return out
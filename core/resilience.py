@@ -0,0 +1,183 @@
+import random
+import threading
+import time
+import typing as t
+from collections import Counter
+
+from .backends import QuoteBackend
+
+# Yahoo starts throttling a single client somewhere above this.
+DEFAULT_RATE = 8.0
+DEFAULT_BURST = 16
+DEFAULT_RETRIES = 3
+DEFAULT_BASE_DELAY = 0.5
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_RESET_TIMEOUT = 30.0
+
+
+class CircuitOpen(Exception):
+    """Raised instead of calling the backend while its circuit breaker is open."""
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, at most `burst` banked."""
+
+    def __init__(self, rate: float = DEFAULT_RATE, burst: int = DEFAULT_BURST,
+                 clock: t.Callable[[], float] = time.monotonic, sleep: t.Callable[[float], None] = time.sleep):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._clock = clock
+        self._sleep = sleep
+        self._last = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take one token, sleeping until one is available; return the seconds waited."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            self._sleep(delay)
+            waited += delay
+
+
+class CircuitBreaker:
+    """Opens after `failure_threshold` consecutive failures.
+
+    While open, `allow()` is False for `reset_timeout` seconds. After that
+    one trial call is let through (half-open): success closes the circuit,
+    failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int = DEFAULT_FAILURE_THRESHOLD, reset_timeout: float = DEFAULT_RESET_TIMEOUT,
+                 clock: t.Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._failures = 0
+        self._opened_at: t.Optional[float] = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            return "half-open" if self._clock() - self._opened_at >= self.reset_timeout else "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._clock() - self._opened_at >= self.reset_timeout and not self._trial:
+                self._trial = True
+                return True
+            return False
+
+    def success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial = False
+
+    def failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial or self._failures >= self.failure_threshold:
+                self._opened_at = self._clock()
+            self._trial = False
+
+
+def is_transient(exc: BaseException) -> bool:
+    """Whether `exc` looks like throttling or a passing network problem."""
+    response = getattr(exc, "response", None)
+    status = getattr(response, "status_code", None) or getattr(exc, "status_code", None)
+    if status is not None:
+        return status == 429 or status >= 500
+    if isinstance(exc, (ConnectionError, TimeoutError)):
+        return True
+    name = type(exc).__name__
+    return any(k in name for k in ("RateLimit", "Timeout", "Connection"))
+
+
+class ResilientBackend(QuoteBackend):
+    """Wrap a backend with rate limiting, retries and a circuit breaker.
+
+    Every request first takes a token from `bucket`. Transient errors (see
+    `is_transient`) are retried up to `retries` times with full-jitter
+    exponential backoff; other errors fail at once. Failures that survive
+    the retries feed `breaker` (other errors count as the service being
+    up); while it is open, calls raise `CircuitOpen`
+    without touching the inner backend, and callers serve last-known-good
+    cached values instead.
+
+    `stats` counts outcomes: ok, retry, failed, short_circuited and
+    throttled (requests that had to wait for a token). Unknown attributes
+    are looked up on the inner backend.
+    """
+
+    def __init__(self, inner: QuoteBackend, bucket: t.Optional[TokenBucket] = None,
+                 breaker: t.Optional[CircuitBreaker] = None, retries: int = DEFAULT_RETRIES,
+                 base_delay: float = DEFAULT_BASE_DELAY, sleep: t.Callable[[float], None] = time.sleep):
+        self.inner = inner
+        self.bucket = bucket or TokenBucket()
+        self.breaker = breaker or CircuitBreaker()
+        self.retries = retries
+        self.base_delay = base_delay
+        self._sleep = sleep
+        self.stats: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        return getattr(self.inner, name)
+
+    @property
+    def batch_size(self):
+        return self.inner.batch_size
+
+    def _count(self, outcome):
+        with self._lock:
+            self.stats[outcome] += 1
+
+    def _call(self, fn, *args):
+        if not self.breaker.allow():
+            self._count("short_circuited")
+            raise CircuitOpen("Yahoo requests paused after repeated failures")
+        for attempt in range(self.retries + 1):
+            if self.bucket.acquire() > 0:
+                self._count("throttled")
+            try:
+                result = fn(*args)
+            except Exception as e:
+                transient = is_transient(e)
+                if transient and attempt < self.retries:
+                    self._count("retry")
+                    self._sleep(random.uniform(0, self.base_delay * 2 ** attempt))
+                    continue
+                self._count("failed")
+                # a definite answer (e.g. unknown symbol) means the service is up
+                if transient:
+                    self.breaker.failure()
+                else:
+                    self.breaker.success()
+                raise
+            self._count("ok")
+            self.breaker.success()
+            return result
+
+    def quotes(self, symbols):
+        return self._call(self.inner.quotes, symbols)
+
+    def quote(self, symbol):
+        return self._call(self.inner.quote, symbol)
+
+    def growth_estimates(self, symbol):
+        return self._call(self.inner.growth_estimates, symbol)
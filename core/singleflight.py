@@ -0,0 +1,128 @@
+"""Process-wide single-flight: concurrent requests for one key share one call.
+
+Every Streamlit session runs in its own thread of the same process. When
+several sessions need the same ticker (or AI summary) at once, the first
+becomes the leader and makes the request; the others wait for its result
+(or exception) instead of repeating it. Nothing is cached once the call
+finishes; that's the fundamentals and summary stores' job.
+
+Counters (in `core.metrics`): `singleflight.<name>.leader` for calls that
+ran, `singleflight.<name>.coalesced` for callers that shared one.
+"""
+import threading
+import typing as t
+
+from .metrics import metrics
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: t.Optional[BaseException] = None
+
+    def get(self):
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class SingleFlight:
+    """Collapse concurrent calls with equal keys into one.
+
+    Keys are compared case-insensitively when they are strings (tickers).
+    Set `enabled = False` to run every call (for load-test comparisons).
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.enabled = True
+        self._calls: t.Dict[t.Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(key):
+        return key.upper() if isinstance(key, str) else key
+
+    def _claim(self, keys) -> t.Tuple[t.Dict[t.Hashable, _Call], t.Dict[t.Hashable, _Call]]:
+        """Split `keys` into calls this thread now leads and calls already in flight."""
+        led, joined = {}, {}
+        with self._lock:
+            for key in keys:
+                call = self._calls.get(key)
+                if call is None:
+                    call = led[key] = self._calls[key] = _Call()
+                else:
+                    joined[key] = call
+        metrics.incr(f"singleflight.{self.name}.leader", len(led))
+        metrics.incr(f"singleflight.{self.name}.coalesced", len(joined))
+        return led, joined
+
+    def _finish(self, led: t.Dict[t.Hashable, _Call], results: t.Optional[dict] = None,
+                error: t.Optional[BaseException] = None):
+        with self._lock:
+            for key in led:
+                self._calls.pop(key, None)
+        for key, call in led.items():
+            call.result = results.get(key) if results is not None else None
+            call.error = error
+            call.done.set()
+
+    def do(self, key, fn: t.Callable[..., t.Any], *args, **kwargs):
+        """Return `fn(*args, **kwargs)`, or the result of the identical call already running."""
+        if not self.enabled:
+            return fn(*args, **kwargs)
+        key = self._key(key)
+        led, joined = self._claim([key])
+        if joined:
+            return joined[key].get()
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            self._finish(led, error=e)
+            raise
+        self._finish(led, {key: result})
+        return result
+
+    def do_many(self, keys: t.Iterable, fn: t.Callable[[list], dict]) -> dict:
+        """Batch form of `do`: `fn(keys)` returns `{key: result}` for the keys it was given.
+
+        `fn` is called once with only the keys nobody else is fetching; then
+        the results of the other callers' in-flight keys are awaited. Keys
+        missing from `fn`'s result map to None; a key whose leader failed
+        maps to its exception instead of raising, so one bad batch doesn't
+        fail the others.
+        """
+        keys = list(dict.fromkeys(self._key(k) for k in keys))
+        if not self.enabled:
+            return fn(keys) if keys else {}
+        led, joined = self._claim(keys)
+        out = {}
+        if led:
+            try:
+                results = {self._key(k): v for k, v in (fn(list(led)) or {}).items()}
+            except BaseException as e:
+                self._finish(led, error=e)
+                raise
+            self._finish(led, results)
+            out.update((k, results.get(k)) for k in led)
+        # only wait once our own keys are released, so leaders never wait on each other in a cycle
+        for key, call in joined.items():
+            try:
+                out[key] = call.get()
+            except Exception as e:
+                out[key] = e
+        return out
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+
+# Yahoo quote fields and growth estimates (per ticker), and AI summaries (per ticker)
+fundamentals_flight = SingleFlight("fundamentals")
+quotes_flight = SingleFlight("quotes")
+summaries_flight = SingleFlight("summaries")
@@ -0,0 +1,109 @@
+"""Versioned on-disk snapshots of computed PEGY tables.
+
+`precompute.py` writes one snapshot per run; the dashboard memory-maps the
+latest one at startup instead of fetching everything from Yahoo. Snapshots
+are Arrow IPC files (uncompressed, so reads are zero-copy memory maps),
+optionally with a Parquet copy for other tools.
+"""
+import json
+import os
+import time
+import typing as t
+from pathlib import Path
+
+import pandas as pd
+
+DEFAULT_DIR = Path(os.environ.get("PEGY_SNAPSHOT_DIR") or Path(__file__).resolve().parent.parent / "cache" / "snapshots")
+# bump when the table's columns change incompatibly; older snapshots are ignored
+SCHEMA_VERSION = 3
+PREFIX = "pegy-"
+
+
+def _encode(df: pd.DataFrame) -> pd.DataFrame:
+    """Summaries are dicts; store them as JSON text so every column is flat."""
+    df = df.copy()
+    if "Summary" in df.columns:
+        df["Summary"] = [None if v is None or v != v else json.dumps(v) for v in df["Summary"]]
+    return df
+
+
+def _decode(df: pd.DataFrame) -> pd.DataFrame:
+    if "Summary" in df.columns:
+        df["Summary"] = [json.loads(v) if isinstance(v, str) else None for v in df["Summary"]]
+    return df
+
+
+def write_snapshot(
+    df: pd.DataFrame,
+    directory: t.Union[str, os.PathLike] = None,
+    universes: t.Optional[t.Dict[str, t.Sequence[str]]] = None,
+    formats: t.Iterable[str] = ("arrow",),
+    keep: int = 10,
+) -> Path:
+    """Write `df` as a new snapshot and return the Arrow file's path.
+
+    Files are named `pegy-<UTC timestamp>.<format>` and written atomically,
+    so readers never see a partial snapshot. `universes` (name -> tickers)
+    is stored in the metadata. Only the newest `keep` snapshots are kept.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    directory = Path(directory or DEFAULT_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    created_at = time.time()
+    table = pa.Table.from_pandas(_encode(df), preserve_index=False)
+    table = table.replace_schema_metadata({
+        **(table.schema.metadata or {}),
+        b"pegy.schema_version": str(SCHEMA_VERSION).encode(),
+        b"pegy.created_at": repr(created_at).encode(),
+        b"pegy.universes": json.dumps(universes or {}).encode(),
+    })
+
+    stem = PREFIX + time.strftime("%Y%m%dT%H%M%SZ", time.gmtime(created_at))
+    formats = set(formats) | {"arrow"}
+    for fmt in sorted(formats):
+        path = directory / f"{stem}.{fmt}"
+        tmp = path.with_suffix(f".{fmt}.tmp")
+        if fmt == "arrow":
+            with pa.OSFile(str(tmp), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        elif fmt == "parquet":
+            pq.write_table(table, tmp)
+        else:
+            raise ValueError(f"unknown snapshot format {fmt!r}")
+        os.replace(tmp, path)
+
+    for old in sorted(directory.glob(f"{PREFIX}*.arrow"))[:-keep] if keep else []:
+        for fmt in ("arrow", "parquet"):
+            old.with_suffix(f".{fmt}").unlink(missing_ok=True)
+    return directory / f"{stem}.arrow"
+
+
+def latest_snapshot(directory: t.Union[str, os.PathLike] = None) -> t.Optional[Path]:
+    """Return the newest snapshot's Arrow file, or None if there is none."""
+    directory = Path(directory or DEFAULT_DIR)
+    paths = sorted(directory.glob(f"{PREFIX}*.arrow"))
+    return paths[-1] if paths else None
+
+
+def read_snapshot(path: t.Union[str, os.PathLike]) -> t.Tuple[pd.DataFrame, dict]:
+    """Memory-map the snapshot at `path`; return `(table, metadata)`.
+
+    Metadata holds `schema_version`, `created_at` and `universes`. Raises
+    `ValueError` for a snapshot written with a different schema version.
+    """
+    import pyarrow as pa
+
+    with pa.memory_map(str(path), "r") as source:
+        table = pa.ipc.open_file(source).read_all()
+        df = table.to_pandas()
+    raw = table.schema.metadata or {}
+    meta = {
+        "schema_version": int(raw.get(b"pegy.schema_version", b"0")),
+        "created_at": float(raw.get(b"pegy.created_at", b"nan")),
+        "universes": json.loads(raw.get(b"pegy.universes", b"{}")),
+    }
+    if meta["schema_version"] != SCHEMA_VERSION:
+        raise ValueError(f"{path}: snapshot schema {meta['schema_version']}, expected {SCHEMA_VERSION}")
+    return _decode(df), meta
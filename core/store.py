@@ -0,0 +1,131 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import typing as t
+from pathlib import Path
+
+DEFAULT_PATH = Path(os.environ.get(
+    "PEGY_FUNDAMENTALS_DB",
+    Path(__file__).resolve().parent.parent / "cache" / "fundamentals.sqlite",
+))
+
+# Seconds each field stays fresh. Names rarely change, estimates move slowly,
+# the forward P/E moves with the price.
+DEFAULT_TTLS = {
+    "shortName": 7 * 24 * 3600,
+    "forwardPE": 30 * 60,
+    "dividendYield": 6 * 3600,
+    "growth_estimates": 6 * 3600,
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS fundamentals (
+    symbol TEXT NOT NULL,
+    field TEXT NOT NULL,
+    value TEXT,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (symbol, field)
+) WITHOUT ROWID
+"""
+
+
+class FundamentalsStore:
+    """Per-ticker, per-field fundamentals cache backed by SQLite.
+
+    Values are stored as JSON with their fetch time; each field expires after
+    its own TTL. The database runs in WAL mode so several Streamlit processes
+    (and the fetch threads inside each of them) can read and write it at once.
+    """
+
+    def __init__(self, path: t.Union[str, Path] = DEFAULT_PATH, ttls: t.Optional[dict] = None):
+        self.path = Path(path)
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self._local = threading.local()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._conn() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 connections must not be shared across threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, symbols: t.Iterable[str], now: t.Optional[float] = None, stale_ok: bool = False) -> t.Dict[str, dict]:
+        """Return `{symbol: {field: value}}` holding only fields still within TTL.
+
+        With `stale_ok`, expired fields are returned too (last known values).
+        """
+        symbols = [s.upper() for s in symbols]
+        now = time.time() if now is None else now
+        out: t.Dict[str, dict] = {s: {} for s in symbols}
+        conn = self._conn()
+        # stay well below SQLite's bound-parameter limit
+        for i in range(0, len(symbols), 500):
+            chunk = symbols[i:i + 500]
+            rows = conn.execute(
+                f"SELECT symbol, field, value, fetched_at FROM fundamentals WHERE symbol IN ({','.join('?' * len(chunk))})",
+                chunk,
+            ).fetchall()
+            for symbol, field, value, fetched_at in rows:
+                ttl = self.ttls.get(field)
+                if not stale_ok and ttl is not None and now - fetched_at > ttl:
+                    continue
+                out[symbol][field] = json.loads(value)
+        return out
+
+    def missing(self, symbols: t.Iterable[str], fields: t.Iterable[str] = None, now: t.Optional[float] = None) -> t.Dict[str, set]:
+        """Return `{symbol: {field, ...}}` for symbols with missing or stale fields."""
+        fields = set(self.ttls if fields is None else fields)
+        fresh = self.get(symbols, now=now)
+        return {s: fields - set(v) for s, v in fresh.items() if fields - set(v)}
+
+    def fetched_at(self, symbols: t.Iterable[str]) -> t.Dict[str, float]:
+        """Return `{symbol: time of its most recent write}` for symbols in the store."""
+        symbols = [s.upper() for s in symbols]
+        out: t.Dict[str, float] = {}
+        conn = self._conn()
+        for i in range(0, len(symbols), 500):
+            chunk = symbols[i:i + 500]
+            out.update(conn.execute(
+                f"SELECT symbol, MAX(fetched_at) FROM fundamentals WHERE symbol IN ({','.join('?' * len(chunk))}) GROUP BY symbol",
+                chunk,
+            ).fetchall())
+        return out
+
+    def put(self, symbol: str, values: dict, fetched_at: t.Optional[float] = None):
+        """Store `values` (`{field: value}`) for `symbol` in a single transaction."""
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        with self._conn() as conn:
+            conn.executemany(
+                "INSERT INTO fundamentals (symbol, field, value, fetched_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(symbol, field) DO UPDATE SET value=excluded.value, fetched_at=excluded.fetched_at",
+                [(symbol.upper(), k, json.dumps(v, default=float), fetched_at) for k, v in values.items()],
+            )
+
+    def invalidate(self, symbols: t.Optional[t.Iterable[str]] = None):
+        """Drop cached fields for `symbols`, or everything when `symbols` is None."""
+        with self._conn() as conn:
+            if symbols is None:
+                conn.execute("DELETE FROM fundamentals")
+            else:
+                conn.executemany("DELETE FROM fundamentals WHERE symbol = ?", [(s.upper(),) for s in symbols])
+
+
+_default_store = None
+_default_lock = threading.Lock()
+
+
+def get_store() -> FundamentalsStore:
+    """Return the process-wide store at `DEFAULT_PATH`, opening it on first use."""
+    global _default_store
+    with _default_lock:
+        if _default_store is None:
+            _default_store = FundamentalsStore()
+        return _default_store
@@ -0,0 +1,46 @@
+import typing as t
+
+import pandas as pd
+
+from .refresh import merge_rows
+
+
+def union(*lists: t.Iterable[str]) -> t.List[str]:
+    """Merge ticker lists into one, upper-cased, without duplicates, first-seen order."""
+    seen = {}
+    for tickers in lists:
+        for tk in tickers:
+            seen.setdefault(tk.strip().upper(), None)
+    seen.pop("", None)
+    return list(seen)
+
+
+def missing(master: t.Optional[pd.DataFrame], tickers: t.Iterable[str]) -> t.List[str]:
+    """Return the tickers (deduplicated) that have no row in `master` yet."""
+    have = set() if master is None or master.empty else set(master["Ticker"].str.upper())
+    return [tk for tk in union(tickers) if tk not in have]
+
+
+def ensure(
+    master: t.Optional[pd.DataFrame],
+    tickers: t.Iterable[str],
+    fetch: t.Callable[[tuple], pd.DataFrame],
+) -> pd.DataFrame:
+    """Return `master` extended with rows for any of `tickers` it lacks.
+
+    `fetch(tuple_of_tickers)` is called once, for the missing tickers only.
+    """
+    need = missing(master, tickers)
+    if not need:
+        return master
+    fresh = fetch(tuple(need))
+    return fresh if master is None else merge_rows(master, fresh)
+
+
+def view(master: t.Optional[pd.DataFrame], tickers: t.Iterable[str]) -> pd.DataFrame:
+    """Rows of `master` for `tickers`, in `tickers` order; absent tickers are skipped."""
+    if master is None or master.empty:
+        return pd.DataFrame(columns=[] if master is None else master.columns)
+    index = pd.Index(master["Ticker"].str.upper())
+    pos = index.get_indexer(union(tickers))
+    return master.iloc[pos[pos >= 0]].reset_index(drop=True)
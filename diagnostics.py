@@ -0,0 +1,99 @@
+import json
+import os
+
+import pandas as pd
+import streamlit as st
+
+from core.backends import get_backend
+from core.metrics import metrics
+from core.prefetch import get_prefetcher
+
+HIT_RATES = {
+    "Fundamentals store (quotes)": "cache.fundamentals.quote",
+    "Fundamentals store (growth)": "cache.fundamentals.growth",
+    "AI summary cache": "cache.summary",
+}
+# requests shared between concurrent sessions (`core.singleflight`)
+COALESCING = {
+    "Yahoo quote batches (symbols)": "singleflight.quotes",
+    "Yahoo fundamentals": "singleflight.fundamentals",
+    "AI summaries": "singleflight.summaries",
+}
+
+
+def diagnostics_enabled() -> bool:
+    """The panel is hidden unless `?diagnostics=1` is in the URL or `PEGY_DIAGNOSTICS=1` is set."""
+    return os.environ.get("PEGY_DIAGNOSTICS") == "1" or st.query_params.get("diagnostics") == "1"
+
+
+def _hit_rates(counters):
+    rows = []
+    for label, prefix in HIT_RATES.items():
+        hit, miss = counters.get(f"{prefix}.hit", 0), counters.get(f"{prefix}.miss", 0)
+        rows.append({"Cache": label, "Hits": hit, "Misses": miss,
+                     "Hit rate %": round(100 * hit / (hit + miss), 1) if hit + miss else None})
+    calls, misses = counters.get("cache.st_cache_data.calls", 0), counters.get("cache.st_cache_data.miss", 0)
+    rows.append({"Cache": "st.cache_data (calculate_pegy)", "Hits": max(calls - misses, 0), "Misses": misses,
+                 "Hit rate %": round(100 * max(calls - misses, 0) / calls, 1) if calls else None})
+    return pd.DataFrame(rows)
+
+
+def _coalescing(counters):
+    rows = []
+    for label, prefix in COALESCING.items():
+        made, shared = counters.get(f"{prefix}.leader", 0), counters.get(f"{prefix}.coalesced", 0)
+        rows.append({"Requests": label, "Made": made, "Shared": shared,
+                     "Shared %": round(100 * shared / (made + shared), 1) if made + shared else None})
+    return pd.DataFrame(rows)
+
+
+def add_diagnostics():
+    """Write the optional metrics dump and render the hidden diagnostics panel.
+
+    Set `PEGY_METRICS_FILE` to dump the process metrics after every script
+    run (Prometheus text for a `.prom` path, JSON otherwise).
+    """
+    path = os.environ.get("PEGY_METRICS_FILE")
+    if path:
+        try:
+            metrics.dump(path)
+        except OSError:
+            pass
+
+    if not diagnostics_enabled():
+        return
+
+    snap = metrics.snapshot()
+    with st.sidebar.expander("🩺 Diagnostics", expanded=True):
+        st.markdown("**Timings (ms)**")
+        timers = pd.DataFrame([
+            {"Path": name, "Count": s["count"], **{k: round(s[k] * 1000, 1) for k in ("p50", "p90", "p99", "max")}}
+            for name, s in sorted(snap["timers"].items())
+        ])
+        st.dataframe(timers, hide_index=True)
+
+        st.markdown("**Cache hit rates**")
+        st.dataframe(_hit_rates(snap["counters"]), hide_index=True)
+
+        st.markdown("**In-flight request sharing**")
+        st.dataframe(_coalescing(snap["counters"]), hide_index=True)
+
+        slow = metrics.slowest("fetch.ticker")
+        if slow:
+            st.markdown("**Slowest symbols (last fetch)**")
+            st.dataframe(pd.DataFrame(slow, columns=["Ticker", "Seconds"]).round(3), hide_index=True)
+
+        backend = get_backend()
+        if hasattr(backend, "stats"):
+            st.markdown(f"**Yahoo requests** (circuit {backend.breaker.state})")
+            st.json(dict(backend.stats), expanded=False)
+
+        prefetcher = get_prefetcher()
+        st.markdown(f"**Prefetch** ({'running' if prefetcher.running else 'stopped'})")
+        st.json(prefetcher.last_run or {}, expanded=False)
+
+        st.markdown("**Counters**")
+        st.json(snap["counters"], expanded=False)
+
+        st.download_button("Metrics (JSON)", data=json.dumps(snap, indent=2), file_name="pegy-metrics.json")
+        st.download_button("Metrics (Prometheus)", data=metrics.to_prometheus(), file_name="pegy-metrics.prom")
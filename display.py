@@ -1,177 +1,282 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
 import re
-from ai import generate_company_summary, get_cached_summary
+import time
+import typing as t
+from streamlit.errors import StreamlitAPIException
+from ai import get_cached_summary, get_worker
+from core.compute import ALL_NUMERIC_COLUMNS, DEFAULT_HORIZON, horizon_columns, numeric_columns
+from core.export import FORMATS, export_bytes
 
 
-def format_display(df, category):
-    # Ensure numeric types
-    numeric_cols = ["Forward P/E", "Growth 1Y %", "Growth 1Y / S&P 500", "Dividend %", "PEGY-1Y"]
-    for col in numeric_cols:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors="coerce")
+GRID_COLUMN_CONFIG = {
+    "#": st.column_config.NumberColumn("#", width="small"),
+    "Ticker": st.column_config.TextColumn("Ticker", width="small"),
+    "Name": st.column_config.TextColumn("Name", width="medium"),
+    "Summary": st.column_config.TextColumn("Summary", width="large"),
+    "Trend": st.column_config.LineChartColumn("PEGY trend (90d)", width="small"),
+}
 
-    # Round numeric display values to 2 decimals
-    disp = df.copy()
-    for col in numeric_cols:
-        if col in disp.columns:
-            disp[col] = disp[col].round(2)
-
-    # Color helpers (same as before)
-    def _hex_to_rgb(h):
-        h = h.lstrip('#')
-        return tuple(int(h[i:i+2], 16) for i in (0, 2, 4))
-
-    def _rgb_to_hex(rgb):
-        return '#%02x%02x%02x' % (int(rgb[0]), int(rgb[1]), int(rgb[2]))
-
-    def _lerp_color(a, b, t):
-        ra, ga, ba = _hex_to_rgb(a)
-        rb, gb, bb = _hex_to_rgb(b)
-        return _rgb_to_hex((ra + (rb - ra) * t, ga + (gb - ga) * t, ba + (bb - ba) * t))
-
-    def _text_color_for_bg(hexcol):
-        r, g, b = _hex_to_rgb(hexcol)
-        lum = 0.299 * r + 0.587 * g + 0.114 * b
-        return 'black' if lum > 160 else 'white'
-
-    green_dark, green_light = '#0b6623', '#9ae6a4'
-    amber_dark, amber_light = '#8a5a00', '#ffd27a'
-    red_dark, red_light = '#7a1414', '#f4a6a6'
-
-    def _color_pegy_css(val):
-        if pd.isna(val):
-            return ""
-        try:
-            v = float(val)
-        except Exception:
-            return ""
-
-        if 0 <= v < 1:
-            t = (v - 0) / 1.0
-            bg = _lerp_color(green_dark, green_light, t)
-            text = _text_color_for_bg(bg)
-            return f"background-color: {bg}; color: {text};"
-        if 1 <= v < 2:
-            t = (v - 1) / 1.0
-            bg = _lerp_color(amber_light, amber_dark, t)
-            text = _text_color_for_bg(bg)
-            return f"background-color: {bg}; color: {text};"
-        if v < 0:
-            dist = abs(v - 0)
-            cap = 6.0
-            t = min(dist / cap, 1.0)
-            bg = _lerp_color(red_dark, red_light, t)
-            text = _text_color_for_bg(bg)
-            return f"background-color: {bg}; color: {text};"
-        dist = v - 2
-        cap = 6.0
-        t = min(dist / cap, 1.0)
-        bg = _lerp_color(red_light, red_dark, t)
-        text = _text_color_for_bg(bg)
-        return f"background-color: {bg}; color: {text};"
-
-    # Columns to display and column widths      
-    display_cols = [
-        "", # for serial number
-        "Symbol",
-        "Summary",
-        "Forward P/E",
-        "Growth 1Y %",
-        "Growth 1Y / S&P 500",
-        "Dividend %",
-        "PEGY-1Y",
+# PEGY color stops: green 0–1, amber 1–2, red outside; distances are capped
+_PEGY_CAP = 6.0
+_GREEN = ((0x0b, 0x66, 0x23), (0x9a, 0xe6, 0xa4))
+_AMBER = ((0xff, 0xd2, 0x7a), (0x8a, 0x5a, 0x00))
+_RED_NEG = ((0x7a, 0x14, 0x14), (0xf4, 0xa6, 0xa6))
+_RED_POS = ((0xf4, 0xa6, 0xa6), (0x7a, 0x14, 0x14))
+_HEX = np.array([f"{i:02x}" for i in range(256)])
+
+
+def _pegy_css_exact(v: np.ndarray) -> np.ndarray:
+    """Interpolate the PEGY colors for `v` exactly (used to build the LUT)."""
+    bands = [
+        ((v >= 0) & (v < 1), v, _GREEN),
+        ((v >= 1) & (v < 2), v - 1, _AMBER),
+        (v < 0, np.minimum(np.abs(v) / _PEGY_CAP, 1.0), _RED_NEG),
+        (v >= 2, np.minimum((v - 2) / _PEGY_CAP, 1.0), _RED_POS),
     ]
-    widths = [0.5, 1.2, 2.0, 1, 1, 1, 1, 1]
+    rgb = np.zeros(v.shape + (3,))
+    for mask, frac, (a, b) in bands:
+        a, b = np.array(a, dtype="float64"), np.array(b, dtype="float64")
+        rgb[mask] = a + (b - a) * frac[mask, None]
+    rgb = rgb.astype(int)
+    lum = rgb @ np.array([0.299, 0.587, 0.114])
+    hexes = np.char.add(np.char.add(np.char.add("#", _HEX[rgb[:, 0]]), _HEX[rgb[:, 1]]), _HEX[rgb[:, 2]])
+    css = np.char.add(np.char.add("background-color: ", hexes), "; color: ")
+    return np.char.add(css, np.where(lum > 160, "black;", "white;")).astype(object)
 
-    st.subheader(f"{category}")
 
-    # Header
-    header_cols = st.columns(widths)
-    for i, col_name in enumerate(display_cols):
-        header_cols[i].markdown(f"**{col_name}**")
-
-    # Rows
-    for serial, (idx, row) in enumerate(disp.iterrows()):
-        cols = st.columns(widths)
-        # Serial number column (0-based) — color it using the same PEGY-1Y coloring
-        pegy_val = row.get("PEGY-1Y") if "PEGY-1Y" in disp.columns else None
-        if pegy_val is not None and not pd.isna(pegy_val):
-            try:
-                style = _color_pegy_css(pegy_val)
-                html_serial = f"<div style=\"{style} padding:6px; border-radius:4px; text-align:center\">{serial}</div>"
-                cols[0].markdown(html_serial, unsafe_allow_html=True)
-            except Exception:
-                cols[0].markdown(f"**{serial}**")
-        else:
-            cols[0].markdown(f"**{serial}**")
-
-        # Symbol (prefer 'Symbol' column, fall back to index)
-        if "Symbol" in disp.columns:
-            sym = row.get("Symbol", "")
-        else:
-            sym = idx
-
-        safe_sym_html = str(sym).replace("\n", "<br />")
-        cols[1].markdown(f"{safe_sym_html}", unsafe_allow_html=True)
-
-        # Other columns (start at index 2 since 0=No., 1=Symbol)
-        for i, col_name in enumerate(display_cols[2:], start=2):
-            val = row.get(col_name, "")
-            if col_name == "Summary":
-                # Summary may be a dict (from AI) or a string; if missing, show checkbox in this cell
-                if isinstance(val, dict):
-                    for k, v in val.items():
-                        cols[i].markdown(f"- **{k}**: {v}")
-                elif pd.isna(val) or val is None or str(val).strip() == "":
-                    # show checkbox to generate in-place
-                    # Determine ticker-only identifier for label/key/cache
-                    if "Ticker" in disp.columns and pd.notna(row.get("Ticker")):
-                        ticker_only = str(row.get("Ticker")).strip()
-                    else:
-                        # fallback: try to parse ticker from Symbol like 'TICKER - Company Name'
-                        sym_full = row.get("Symbol") if "Symbol" in disp.columns else ""
-                        if isinstance(sym_full, str) and " - " in sym_full:
-                            ticker_only = sym_full.split(" - ", 1)[0].strip()
-                        elif sym_full:
-                            ticker_only = str(sym_full).split()[0]
-                        else:
-                            ticker_only = f"row{idx}"
-
-                    ai_symbol = ticker_only
-                    safe_sym = re.sub(r"[^0-9A-Za-z_-]", "", ticker_only.replace(' ', '_'))
-                    safe_cat = re.sub(r"[^0-9A-Za-z_-]", "", category.replace(' ', '_'))
-                    key = f"summary_{safe_cat}_{safe_sym}_{idx}"
-                    label = f"Generate AI summary for {ticker_only}"
-                    checked = cols[i].checkbox(label, key=key)
-                    if checked:
-                        # Check cache first
-                        cached = get_cached_summary(ai_symbol)
-                        if cached:
-                            for k, v in cached.items():
-                                cols[i].markdown(f"- **{k}**: {v}")
-                        else:
-                            try:
-                                with st.spinner("Generating summary..."):
-                                    doc = generate_company_summary(ai_symbol)
-                                for k, v in doc.items():
-                                    cols[i].markdown(f"- **{k}**: {v}")
-                            except Exception as e:
-                                cols[i].error(str(e))
-                else:
-                    cols[i].write(val)
-                continue
-
-            if pd.isna(val):
-                cols[i].write("")
-            else:
-                # Right align numeric values
-                if isinstance(val, (int, float)):
-                    if col_name == "PEGY-1Y":
-                        style = _color_pegy_css(val)
-                        html = f"<div style=\"{style} padding:6px; border-radius:4px; text-align:right\">{val:.2f}</div>"
-                        cols[i].markdown(html, unsafe_allow_html=True)
-                    else:
-                        cols[i].write(f"{val:.2f}")
+# Colors stop changing outside [-cap, 2 + cap], so one CSS string per 0.01
+# bucket of that range covers every PEGY value. Built once at import.
+_LUT_STEP = 0.01
+_LUT_MIN, _LUT_MAX = -_PEGY_CAP, 2 + _PEGY_CAP
+_PEGY_LUT = _pegy_css_exact(np.round(_LUT_MIN + np.arange(int(round((_LUT_MAX - _LUT_MIN) / _LUT_STEP)) + 1) * _LUT_STEP, 2))
+
+
+def pegy_css(values) -> np.ndarray:
+    """Map PEGY values to cell CSS strings via the color LUT ('' for NaN).
+
+    Values are floored to their 0.01 bucket (so band edges like 1.0 and 2.0
+    stay exact) and clipped to the LUT range; no color math runs per cell.
+    """
+    v = np.asarray(values, dtype="float64")
+    ok = ~np.isnan(v)
+    idx = np.zeros(v.shape, dtype=np.intp)
+    # the epsilon absorbs float error, e.g. (0.37 + 6) / 0.01 == 636.999...
+    idx[ok] = np.floor((np.clip(v[ok], _LUT_MIN, _LUT_MAX) - _LUT_MIN) / _LUT_STEP + 1e-6)
+    return np.where(ok, _PEGY_LUT[idx], "").astype(object)
+
+
+def _ticker_of(row, idx) -> str:
+    """Ticker-only identifier for a row, for labels, widget keys and the AI cache."""
+    if "Ticker" in row.index and pd.notna(row.get("Ticker")):
+        return str(row.get("Ticker")).strip()
+    return f"row{idx}"
+
+
+def _name_of(row) -> t.Optional[str]:
+    name = row.get("Name")
+    return name if isinstance(name, str) and name else None
+
+
+def _label(row, ticker) -> str:
+    """'TICKER - Company Name' (just the ticker when the name is unknown)."""
+    name = _name_of(row)
+    return f"{ticker} - {name}" if name else ticker
+
+
+def _summary_text(val) -> str:
+    if isinstance(val, dict):
+        return str(val.get("Overview") or next(iter(val.values()), ""))
+    if val is None or pd.isna(val):
+        return ""
+    return str(val)
+
+
+def _grid_styler(disp, offset: int = 0, horizon: str = DEFAULT_HORIZON):
+    """Build the styled grid frame: serial column (from `offset`), flattened summaries, `horizon`'s PEGY colors."""
+    pegy_col = horizon_columns(horizon)[2]
+    cols = [c for c in ["Ticker", "Name", "Summary"] + numeric_columns(horizon) + ["Trend"] if c in disp.columns]
+    grid = disp[cols].reset_index(drop=True)
+    grid.insert(0, "#", np.arange(offset, offset + len(grid)))
+    if "Summary" in grid.columns:
+        grid["Summary"] = [_summary_text(v) for v in grid["Summary"]]
+
+    # Styler refuses tables above this many cells (~32k rows here); Streamlit
+    # renders the styles later, so the limit has to be raised process-wide
+    if grid.size > pd.get_option("styler.render.max_elements"):
+        pd.set_option("styler.render.max_elements", grid.size)
+
+    numeric_cols = [c for c in ALL_NUMERIC_COLUMNS if c in grid.columns]
+    styler = grid.style.format("{:.2f}", subset=numeric_cols, na_rep="")
+    if pegy_col in grid.columns:
+        css = pegy_css(grid[pegy_col])
+        styler = styler.apply(lambda _: css, subset=["#", pegy_col], axis=0)
+    return styler
+
+
+def _render_grid(disp, category, offset: int = 0, horizon: str = DEFAULT_HORIZON):
+    """Render the table as one `st.dataframe` with styled PEGY cells.
+
+    Selecting rows shows (or generates) their AI summaries below the grid.
+    """
+    styler = _grid_styler(disp, offset, horizon)
+    event = st.dataframe(
+        styler,
+        hide_index=True,
+        column_config=GRID_COLUMN_CONFIG,
+        on_select="rerun",
+        selection_mode="multi-row",
+        key=f"grid_{_safe_key(category)}",
+    )
+
+    rows = event.selection.rows if event is not None else []
+    if not rows:
+        st.caption("Select rows to see their AI summaries.")
+        return
+    _render_selection(disp, rows, category)
+
+
+def _render_selection(disp, rows, category):
+    """Show AI summaries for the selected rows, generating missing ones in the background.
+
+    Generation is handed to the shared `ai.worker` and this panel re-polls the
+    summary cache every couple of seconds (as a fragment, so only the panel
+    reruns) until the job finishes.
+    """
+    job_key = f"summary_job_{_safe_key(category)}"
+    job = get_worker().job(st.session_state.get(job_key, ""))
+    polling = job is not None and not job.finished
+
+    @st.fragment(run_every=2 if polling else None)
+    def _panel():
+        job = get_worker().job(st.session_state.get(job_key, ""))
+        missing = {}
+        for pos in rows:
+            row = disp.iloc[pos]
+            ticker = _ticker_of(row, disp.index[pos])
+            with st.expander(f"🤖 {_label(row, ticker)}", expanded=True):
+                summary = row.get("Summary")
+                if not isinstance(summary, dict):
+                    summary = get_cached_summary(ticker)
+                if summary:
+                    _render_summary(st, summary)
+                elif job is not None and ticker.upper() in job.failed:
+                    st.error(job.failed[ticker.upper()])
+                elif job is not None and not job.finished and ticker.upper() in job.symbols:
+                    st.caption("⏳ Generating summary...")
                 else:
-                    cols[i].write(val)
\ No newline at end of file
+                    st.caption("No summary yet.")
+                    missing[ticker] = _name_of(row)
+
+        if job is not None and not job.finished:
+            st.progress(job.progress, text=f"Generating AI summaries: {len(job.done) + len(job.failed)}/{job.total}")
+        elif polling:
+            # job finished since the last full run: rerun once more to stop polling
+            st.rerun()
+
+        if missing and st.button(f"Generate AI summaries for {len(missing)} selected", key=f"gen_{_safe_key(category)}"):
+            job = get_worker().submit(missing, {k.upper(): v for k, v in missing.items() if v})
+            st.session_state[job_key] = job.id
+            st.rerun()
+
+    _panel()
+
+
+def _render_summary(container, doc):
+    for k, v in doc.items():
+        container.markdown(f"- **{k}**: {v}")
+
+
+def _safe_key(label: str) -> str:
+    return re.sub(r"[^0-9A-Za-z_-]", "", label.replace(" ", "_"))
+
+
+_EXPORT_LABELS = {"csv": "CSV", "parquet": "Parquet", "ndjson": "NDJSON"}
+
+
+def export_buttons(df, query, category):
+    """Download buttons exporting `query`'s matches in `df` (every page) as CSV, Parquet or NDJSON.
+
+    Files are built by `core.export` only when a button is clicked, and the
+    click doesn't rerun the page. Streamlit without deferred downloads
+    builds the file behind a "Prepare" button instead.
+    """
+    key = _safe_key(category)
+    for col, fmt in zip(st.columns(len(FORMATS)), FORMATS):
+        ext, mime = FORMATS[fmt]
+        label, file_name = f"⬇️ {_EXPORT_LABELS[fmt]}", f"pegy-{key.strip('_') or 'table'}.{ext}"
+        try:
+            col.download_button(label, data=lambda fmt=fmt: export_bytes(df, fmt, query), file_name=file_name,
+                                mime=mime, on_click="ignore", key=f"export_{fmt}_{key}")
+        except (TypeError, StreamlitAPIException):
+            # no callable `data` / `on_click="ignore"` in this Streamlit version
+            if col.button(f"Prepare {_EXPORT_LABELS[fmt]}", key=f"prepare_{fmt}_{key}"):
+                col.download_button(label, data=export_bytes(df, fmt, query), file_name=file_name, mime=mime,
+                                    key=f"export_{fmt}_{key}")
+
+
+def _prepare(df):
+    """Copy of `df` with numeric columns coerced (when needed) and rounded to 2 decimals."""
+    numeric_cols = [c for c in ALL_NUMERIC_COLUMNS if c in df.columns]
+    disp = df.copy()
+    for col in numeric_cols:
+        if not pd.api.types.is_float_dtype(disp[col]):
+            disp[col] = pd.to_numeric(disp[col], errors="coerce")
+    disp[numeric_cols] = disp[numeric_cols].round(2)
+    return disp
+
+
+# While streaming, the live table is re-sent when a second has passed since
+# the last render or it has at least doubled (and grown by STREAM_RENDER_ROWS),
+# not on every chunk: each render re-sends everything received so far.
+STREAM_RENDER_SECONDS = 1.0
+STREAM_RENDER_ROWS = 100
+
+
+def stream_display(chunks, category, total, on_chunk=None):
+    """Render PEGY table chunks progressively as they arrive and return the full frame.
+
+    Each chunk from `chunks` (e.g. `calculate_pegy_stream`) is passed to
+    `on_chunk` first (so callers can persist partial results), then added
+    to a live table under a progress bar. The first chunk shows at once;
+    later ones are batched (see `STREAM_RENDER_SECONDS`). Everything is
+    cleared once the stream ends, leaving the caller to render the final
+    table.
+    """
+    box = st.empty()
+    with box.container():
+        st.subheader(f"{category}")
+        progress = st.progress(0.0, text=f"Fetching market data: 0/{total}")
+        placeholder = st.empty()
+    parts, prepared = [], []
+    done = shown = 0
+    last = 0.0
+    for chunk in chunks:
+        if on_chunk is not None:
+            on_chunk(chunk)
+        parts.append(chunk)
+        prepared.append(_prepare(chunk))
+        done += len(chunk)
+        progress.progress(min(done / max(total, 1), 1.0), text=f"Fetching market data: {done}/{total}")
+        now = time.monotonic()
+        if not shown or now - last >= STREAM_RENDER_SECONDS or done - shown >= max(STREAM_RENDER_ROWS, shown):
+            placeholder.dataframe(_grid_styler(pd.concat(prepared, ignore_index=True)),
+                                  hide_index=True, column_config=GRID_COLUMN_CONFIG)
+            shown, last = done, now
+    box.empty()
+    return pd.concat(parts, ignore_index=True) if parts else pd.DataFrame()
+
+
+def format_display(df, category, offset: int = 0, horizon: str = DEFAULT_HORIZON):
+    """Render the PEGY table for `category` as one styled `st.dataframe`.
+
+    Selecting rows shows their AI summaries, generated in the background
+    when missing. `df` may be one page of a larger table; `offset` is its
+    first row's position there (for the # column). Growth and PEGY columns
+    are those of `horizon` (see `core.compute.HORIZONS`).
+    """
+    disp = _prepare(df)
+
+    st.subheader(f"{category}")
+    _render_grid(disp, category, offset, horizon)
@@ -1,4 +1,13 @@
 import streamlit as st
+from core.compute import DEFAULT_HORIZON, HORIZONS
+
+HORIZON_NAMES = {
+    "0q": "Current quarter",
+    "+1q": "Next quarter",
+    "0y": "Current year",
+    "+1y": "Next year",
+    "+5y": "Next 5 years (per annum)",
+}
 
 def add_header():
     st.set_page_config(
@@ -16,5 +25,22 @@ def add_header():
         value="MSFT"
     )
 
+    force_input = st.sidebar.text_input(
+        "Force re-fetch symbols (comma separated)",
+        value="",
+        help="Refresh only re-fetches stale symbols; list symbols here to re-fetch them anyway.",
+    )
     refresh = st.sidebar.button("🔄 Refresh Data")
-    return tickers_input, refresh
\ No newline at end of file
+    refresh_universes = st.sidebar.button(
+        "🔁 Refresh index lists",
+        help="Re-download S&P 500 / Nasdaq-100 constituents (otherwise refreshed weekly).",
+    )
+    # every horizon is already computed; switching only changes the columns shown
+    horizon = st.sidebar.radio(
+        "Growth horizon",
+        list(HORIZONS),
+        index=list(HORIZONS).index(DEFAULT_HORIZON),
+        format_func=lambda h: f"{HORIZONS[h]} · {HORIZON_NAMES[h]}",
+        key="horizon",
+    )
+    return tickers_input, refresh, force_input, refresh_universes, horizon
\ No newline at end of file
@@ -1,129 +1,217 @@
-from numpy import sort
 import re
+import time
 import streamlit as st
 from header import add_header
 from insights import add_insights
-from calculate_pegy import calculate_pegy
-from display import format_display
-from tickers.snp import symbols as snp_tickers
-
-# AI summary generators
-from ai import generate_company_summary, get_cached_summary
-
-
-tickers_input, refresh = add_header()
+from diagnostics import add_diagnostics
+from calculate_pegy import calculate_pegy, calculate_pegy_stream, refresh_pegy, load_latest_snapshot, start_prefetcher
+from display import export_buttons, format_display, stream_display
+from tickers import get_registry
+from core.compute import HORIZONS, horizon_columns, numeric_columns
+from core.history import get_history
+from core.metrics import metrics
+from core.query import SORT_ABS_PEGY, Query, run_query
+from core.refresh import merge_rows
+from core.universe import ensure, missing, view
+
+tickers_input, refresh, force_input, refresh_universes, horizon = add_header()
+
+MASTER_KEY = "pegy_master"
+# creation time of the snapshot the master frame was seeded from (until the next refresh)
+SNAPSHOT_KEY = "pegy_snapshot_at"
+# Tabs needing more new tickers than this stream their rows in as they arrive
+STREAM_THRESHOLD = 25
+# Only one page of a tab's table is built and sent to the browser
+PAGE_SIZES = [25, 50, 100, 250]
+
+# Background warm-up of the universes users look at (see core.prefetch)
+prefetcher = start_prefetcher()
 
 
 def _safe_key(label: str) -> str:
     return re.sub(r"[^0-9A-Za-z_]+", "_", label)
 
 
-def calculate_and_display_pegy(tickers, category):
-    """Lazy-load and display PEGY data for `category`.
+def fetch_tickers(tickers):
+    """`calculate_pegy`, counting calls so the diagnostics panel can show its cache hit rate."""
+    metrics.incr("cache.st_cache_data.calls")
+    return calculate_pegy(tickers)
 
-    Data is computed only when the user clicks the per-tab Load button and is
-    cached in `st.session_state` under `df_<safe_category>`.
-    """
-    key = f"df_{_safe_key(category)}"
-    load_key = f"load_{_safe_key(category)}"
 
-    # If data already computed for this category, display immediately
-    if key in st.session_state and st.session_state.get(key) is not None:
-        format_display(st.session_state[key], category)
-        return
+def calculate_and_display_pegy(tickers, category):
+    """Display PEGY data for `category` as a view over the session's master frame.
 
-    # When this function runs, the tab is active — compute now and cache result.
-    with st.spinner("Fetching market data..."):
-        st.session_state[key] = calculate_pegy(tuple(tickers))
-    
-    # Sorting controls: allow selecting column and order (restore previous behavior)
-    df = st.session_state[key]
-    cols = list(df.columns) if hasattr(df, 'columns') else []
-    sort_key = f"sortcol_{_safe_key(category)}"
-    sort_dir_key = f"sortdir_{_safe_key(category)}"
-
-    options = ["PEGY-1Y (abs)"] + cols
-    sel = st.selectbox("Sort by", options, index=0, key=sort_key)
-    order = st.radio("Order", ("Ascending", "Descending"), index=0, horizontal=True, key=sort_dir_key)
-
-    # Apply sorting
+    Only called for the tab the user has open (see `lazy_tabs`). All tabs
+    share one frame in `st.session_state["pegy_master"]`, keyed by ticker;
+    tickers the master doesn't have yet are fetched once and merged in, so
+    symbols shared between tabs are never fetched twice. Only the requested
+    page of the screened table is built and rendered (`core.query`).
+    """
+    prefetcher.record_access(tickers)
+    need = missing(st.session_state.get(MASTER_KEY), tickers)
+    if len(need) > STREAM_THRESHOLD:
+        # large lists: show rows as they arrive; every chunk is merged into the
+        # master right away so an interrupted run keeps what it fetched
+        def _keep(chunk):
+            st.session_state[MASTER_KEY] = merge_rows(st.session_state.get(MASTER_KEY), chunk)
+
+        stream_display(calculate_pegy_stream(tuple(need)), category, len(need), on_chunk=_keep)
+    elif need:
+        with st.spinner("Fetching market data..."):
+            st.session_state[MASTER_KEY] = ensure(st.session_state.get(MASTER_KEY), tickers, fetch_tickers)
+    df = view(st.session_state[MASTER_KEY], tickers)
+
+    query = screen_controls(df, category, horizon)
+    with metrics.timer("query", key=category):
+        result = run_query(df, query)
+    if result.total:
+        st.caption(f"Rows {result.start + 1}–{result.start + len(result.frame)} of {result.total} matching"
+                   f" ({len(df)} in list) · page {result.page + 1} of {result.pages}")
+        # every matching row (all pages), built only when a button is clicked
+        export_buttons(df, query, category)
+    else:
+        st.caption(f"No rows match the screen ({len(df)} in list).")
+
+    if len(result.frame):
+        result.frame["Trend"] = trends(result.frame["Ticker"], horizon)
+    with metrics.timer("render", key=category):
+        format_display(result.frame, category, offset=result.start, horizon=horizon)
+
+
+def trends(tickers, horizon):
+    """Daily `horizon` PEGY history of `tickers` from the history store, for the grid's sparklines."""
     try:
-        if sel == "PEGY-1Y (abs)" and "PEGY-1Y" in df.columns:
-            df_sorted = df.copy()
-            df_sorted["_abs_pegy"] = df_sorted["PEGY-1Y"].abs()
-            df_sorted = df_sorted.sort_values(by=["_abs_pegy"], ascending=(order == "Ascending"), na_position="last").drop(columns=["_abs_pegy"]).reset_index(drop=True)
-        elif sel in df.columns:
-            df_sorted = df.sort_values(by=[sel], ascending=(order == "Ascending"), na_position="last").reset_index(drop=True)
-        else:
-            df_sorted = df
+        with metrics.timer("history"):
+            lines = get_history().sparklines(list(tickers), horizon_columns(horizon)[2])
     except Exception:
-        df_sorted = df
+        return [[] for _ in tickers]
+    return [lines.get(str(tk).upper(), []) for tk in tickers]
+
+
+def screen_controls(df, category, horizon) -> Query:
+    """Sort, screen and paging widgets for `category`'s table, as a `Query` on `horizon`."""
+    key = _safe_key(category)
+    label = HORIZONS[horizon]
+    sortable = [c for c in ["Ticker", "Name"] + numeric_columns(horizon) if c in df.columns]
+    options = [SORT_ABS_PEGY] + sortable
+    sel = st.selectbox("Sort by", options, index=0, key=f"sortcol_{key}")
+    order = st.radio("Order", ("Ascending", "Descending"), index=0, horizontal=True, key=f"sortdir_{key}")
+
+    with st.expander("🔎 Screen"):
+        c = st.columns(5)
+        pegy_min = c[0].number_input(f"PEGY-{label} ≥", value=None, step=0.1, key=f"pegy_min_{key}")
+        pegy_max = c[1].number_input(f"PEGY-{label} ≤", value=None, step=0.1, key=f"pegy_max_{key}")
+        min_growth = c[2].number_input(f"Growth {label} % ≥", value=None, step=1.0, key=f"min_growth_{key}")
+        min_dividend = c[3].number_input("Dividend % >", value=None, step=0.1, key=f"min_div_{key}")
+        top_n = c[4].number_input("Top N", value=None, min_value=1, step=10, key=f"top_n_{key}")
+
+    c = st.columns([1, 1, 4])
+    page_size = c[0].selectbox("Rows per page", PAGE_SIZES, index=1, key=f"page_size_{key}")
+    page = c[1].number_input("Page", min_value=1, value=1, step=1, key=f"page_{key}")
+    return Query(
+        horizon=horizon,
+        pegy_min=pegy_min,
+        pegy_max=pegy_max,
+        min_growth=min_growth,
+        min_dividend=min_dividend,
+        sort=sel,
+        ascending=(order == "Ascending"),
+        top_n=int(top_n) if top_n else None,
+        page=int(page) - 1,
+        page_size=page_size,
+    )
+
+
+def refresh_master(invalidated):
+    """Incrementally refresh the session's master frame (every loaded tab at once)."""
+    if st.session_state.get(MASTER_KEY) is None:
+        return
+    with st.spinner("Refreshing stale symbols..."):
+        st.session_state[MASTER_KEY] = refresh_pegy(st.session_state[MASTER_KEY], invalidated)
 
-    format_display(df_sorted, category)
 
-# Parse tickers and show UI controls
-# 0. Watchlist tickers (displayed by default)
-watchlist_tickers = ["ONDS", "OSCR", "PLTR", "RDW", "AVGO", "COST", "INTC", "AMD", "WMT", "V", "DDOG", "SNOW", "COIN", "RDDT", "CRWV"]
+# Start new sessions from the latest precomputed snapshot, if there is one
+if MASTER_KEY not in st.session_state:
+    snapshot = load_latest_snapshot()
+    if snapshot is not None:
+        st.session_state[MASTER_KEY], st.session_state[SNAPSHOT_KEY] = snapshot
 
-# Pre-defined groups
-mags_tickers = ["AAPL", "AMZN", "ASML", "GOOGL", "META", "MSFT", "NFLX", "NVDA", "ORCL", "TSLA", "TSM"]
-yolo_ai_enery_tickers = ["CCJ", "CEG", "OKLO"]
-yolo_quantum_tickers = ["IONQ", "RGTI", "QBTS", "QUBT"]
-yolo_robotics_tickers = ["SYM", "ISRG"]
-yolo_space_tickers = ["ASTS", "LMT", "PL", "RKLB"]
+if refresh:
+    refresh_master([t.strip().upper() for t in force_input.split(",") if t.strip()])
+    st.session_state.pop(SNAPSHOT_KEY, None)
+
+if st.session_state.get(SNAPSHOT_KEY):
+    age = max(0, int((time.time() - st.session_state[SNAPSHOT_KEY]) // 60))
+    st.caption(f"🕒 Loaded from a precomputed snapshot {age} min old; 🔄 Refresh Data fetches anything stale since.")
 
 # User defined tickers
 user_tickers = [t.strip().upper() for t in tickers_input.split(",") if t.strip()]
 
-# Tabs: default/first tab is Watchlist; other lists to the right. Portfolio aggregates all lists
-tab_labels = [
-    "📋 Watchlist",
-    "📝 User Defined",
-    "⭐ Magnificent 7",
-    "⚡ YOLO - AI Energy",
-    "🧬 YOLO - Quantum Computing",
-    "🤖 YOLO - Robotics",
-    "🚀 YOLO - Space Technology",
-    "📈 S&P 500 Constituents",
-    "Portfolio",
-]
-
-tabs = st.tabs(tab_labels)
-
-for label, tab in zip(tab_labels, tabs):
+# Universes come from the registry (`tickers/registry.py`); index constituent
+# lists are only loaded when their tab is opened
+registry = get_registry()
+if refresh_universes:
+    with st.spinner("Refreshing index constituents..."):
+        registry.refresh()
+
+# Tabs: default/first tab is Watchlist; other lists to the right. Portfolio aggregates the themed lists
+USER_TAB = "📝 User Defined"
+tab_universes = {registry.universes[name].label: name for name in registry.names()}
+tab_labels = list(tab_universes)
+tab_labels.insert(1, USER_TAB)
+
+def lazy_tabs(labels, key="active_tab"):
+    """Create tabs whose hidden content doesn't run.
+
+    With a Streamlit that tracks tab state (`on_change="rerun"`), switching
+    tabs reruns the script and each tab's `.open` tells whether it is the
+    selected one. Older Streamlit runs every tab body on each run, so there
+    every tab but the first waits behind a per-tab Load button instead.
+    """
+    try:
+        return st.tabs(labels, key=key, on_change="rerun")
+    except TypeError:
+        return st.tabs(labels)
+
+
+def tab_should_run(tab, index, label) -> bool:
+    """Whether `tab`'s body should run on this script run (see `lazy_tabs`)."""
+    is_open = getattr(tab, "open", None)
+    if is_open is not None:
+        return is_open
+    load_key = f"load_{_safe_key(label)}"
+    if index == 0 or st.session_state.get(load_key):
+        return True
+    if st.button("Load", key=f"btn_{load_key}"):
+        st.session_state[load_key] = True
+        return True
+    return False
+
+
+tabs = lazy_tabs(tab_labels)
+
+for index, (label, tab) in enumerate(zip(tab_labels, tabs)):
     with tab:
-        if label == "📋 Watchlist":
-            calculate_and_display_pegy(sorted(watchlist_tickers), label)
-        elif label == "📝 User Defined":
+        if not tab_should_run(tab, index, label):
+            continue
+        if label == USER_TAB:
             if user_tickers:
                 calculate_and_display_pegy(sorted(user_tickers), label)
             else:
                 st.info("No user-defined tickers provided. Enter symbols in the sidebar and rerun.")
-        elif label == "⭐ Magnificent 7":
-            calculate_and_display_pegy(mags_tickers, label)
-        elif label == "⚡ YOLO - AI Energy":
-            calculate_and_display_pegy(yolo_ai_enery_tickers, label)
-        elif label == "🧬 YOLO - Quantum Computing":
-            calculate_and_display_pegy(yolo_quantum_tickers, label)
-        elif label == "🤖 YOLO - Robotics":
-            calculate_and_display_pegy(yolo_robotics_tickers, label)
-        elif label == "🚀 YOLO - Space Technology":
-            calculate_and_display_pegy(yolo_space_tickers, label)
-        elif label == "📈 S&P 500 Constituents":
-            calculate_and_display_pegy(snp_tickers, label)
-        elif label == "Portfolio":
-            # Portfolio contains all groups except watchlist and S&P 500
-            portfolio = []
-            portfolio.extend(mags_tickers)
-            portfolio.extend(yolo_ai_enery_tickers)
-            portfolio.extend(yolo_quantum_tickers)
-            portfolio.extend(yolo_robotics_tickers)
-            portfolio.extend(yolo_space_tickers)
-            # remove duplicates and any watchlist / snp members
-            if portfolio:
-                calculate_and_display_pegy(portfolio, label)
-            else:
-                st.info("Portfolio is empty (no tickers outside watchlist/S&P).")
+            continue
+        name = tab_universes[label]
+        tickers = registry.get(name)
+        if name == "watchlist":
+            tickers = sorted(tickers)
+        if registry.universes[name].url:
+            info = registry.info(name)
+            st.caption(f"{info['count']} constituents ({'bundled seed list' if info['source'] == 'seed' else info['source']})")
+        if tickers:
+            calculate_and_display_pegy(tickers, label)
+        else:
+            st.info(f"{label} is empty.")
 
 # Add insights footer
-add_insights()
\ No newline at end of file
+add_insights()
+add_diagnostics()
\ No newline at end of file
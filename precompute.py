@@ -0,0 +1,54 @@
+"""Precompute PEGY tables for every configured universe, without Streamlit.
+
+Usage: python precompute.py [--universe snp --universe mags ...] [--refresh-universes] [--out DIR]
+                            [--format parquet] [--keep 10]
+
+Runs the same pipeline as the dashboard (`core.pipeline`, sharing its
+fundamentals store) over the union of the universes in `tickers.registry` and
+writes a versioned snapshot (see `core.snapshot`). Meant for cron, e.g.
+
+    */30 * * * * cd /path/to/pegy && .venv/bin/python precompute.py
+
+The dashboard loads the newest snapshot at startup, so page loads don't
+wait for Yahoo.
+"""
+import argparse
+import sys
+import time
+
+from core.pipeline import calculate
+from core.snapshot import DEFAULT_DIR, write_snapshot
+from core.universe import union
+from tickers import get_registry
+
+
+def main(argv=None):
+    registry = get_registry()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--universe", action="append", choices=registry.names(),
+                        help="universe to compute (repeatable; default: all)")
+    parser.add_argument("--out", default=DEFAULT_DIR, help="snapshot directory")
+    parser.add_argument("--format", action="append", default=[], choices=["parquet"],
+                        help="extra format written next to the Arrow file")
+    parser.add_argument("--keep", type=int, default=10, help="snapshots to keep")
+    parser.add_argument("--refresh-universes", action="store_true",
+                        help="re-download index constituents even if their cached list is fresh")
+    parser.add_argument("--summaries", action="store_true", help="generate missing AI summaries (slow)")
+    args = parser.parse_args(argv)
+
+    names = args.universe or registry.names()
+    if args.refresh_universes:
+        registry.refresh(names)
+    universes = {name: registry.get(name) for name in names}
+    tickers = tuple(union(*universes.values()))
+    start = time.perf_counter()
+    df = calculate(tickers, generate_summaries=args.summaries)
+    errors = int(df["Error"].notna().sum())
+    path = write_snapshot(df, args.out, universes=universes, formats=args.format, keep=args.keep)
+    print(f"{path}: {len(df)} tickers ({errors} errors) in {time.perf_counter() - start:.1f}s")
+    # every row failing means Yahoo is down; let cron report it
+    return 1 if errors == len(df) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,46 @@
+"""Keep the fundamentals store warm from a separate process.
+
+Usage: python prefetch.py [--universe watchlist --universe mags ...] [--interval 30] [--ahead 600]
+                          [--budget 100] [--workers 2] [--once]
+
+Runs the dashboard's background scheduler (`core.prefetch`) as a sidecar:
+every `--interval` seconds, up to `--budget` symbols whose cached fields
+expire within `--ahead` seconds are re-fetched into the shared store,
+most-viewed first (view counts come from the dashboard via
+`cache/access.json`). Start the dashboard with `PEGY_PREFETCH=0` so it
+doesn't run a second scheduler.
+"""
+import argparse
+import sys
+import time
+
+from core.prefetch import (DEFAULT_AHEAD, DEFAULT_BUDGET, DEFAULT_INTERVAL, DEFAULT_MAX_WORKERS,
+                           DEFAULT_UNIVERSES, Prefetcher, registry_symbols)
+from tickers import get_registry
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--universe", action="append", choices=get_registry().names(),
+                        help=f"universe to keep warm (repeatable; default: {', '.join(DEFAULT_UNIVERSES)})")
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL, help="seconds between passes")
+    parser.add_argument("--ahead", type=float, default=DEFAULT_AHEAD, help="re-fetch fields expiring within this many seconds")
+    parser.add_argument("--budget", type=int, default=DEFAULT_BUDGET, help="symbols per pass at most")
+    parser.add_argument("--workers", type=int, default=DEFAULT_MAX_WORKERS)
+    parser.add_argument("--once", action="store_true", help="run a single pass and exit")
+    args = parser.parse_args(argv)
+
+    prefetcher = Prefetcher(registry_symbols(args.universe or DEFAULT_UNIVERSES), interval=args.interval,
+                            ahead=args.ahead, budget=args.budget, max_workers=args.workers)
+    while True:
+        prefetcher.run_once()
+        run = prefetcher.last_run
+        print(f"{time.strftime('%H:%M:%S')} warmed {run['warmed']} of {run['due']} due"
+              f" ({run['candidates']} candidates) in {run['seconds']:.1f}s", flush=True)
+        if args.once:
+            return 0
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
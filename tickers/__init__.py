@@ -0,0 +1,7 @@
+"""Ticker universes: static lists in `tickers/*.py` and downloadable indexes.
+
+See `tickers.registry` for how index constituents are loaded and cached.
+"""
+from .registry import Registry, Universe, get_registry
+
+__all__ = ["Registry", "Universe", "get_registry"]
@@ -0,0 +1,5 @@
+symbols = [
+    "CCJ",
+    "CEG",
+    "OKLO",
+]
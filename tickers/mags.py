@@ -0,0 +1,13 @@
+symbols = [
+    "AAPL",
+    "AMZN",
+    "ASML",
+    "GOOGL",
+    "META",
+    "MSFT",
+    "NFLX",
+    "NVDA",
+    "ORCL",
+    "TSLA",
+    "TSM",
+]
@@ -0,0 +1,24 @@
+# Seed list for the Nasdaq-100 universe (largest members); the registry
+# replaces it with the full constituent list once it has been downloaded.
+symbols = [
+    "AAPL",
+    "MSFT",
+    "NVDA",
+    "AMZN",
+    "META",
+    "AVGO",
+    "GOOGL",
+    "GOOG",
+    "TSLA",
+    "COST",
+    "NFLX",
+    "AMD",
+    "PEP",
+    "ADBE",
+    "CSCO",
+    "TMUS",
+    "QCOM",
+    "INTU",
+    "AMGN",
+    "TXN",
+]
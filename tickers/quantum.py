@@ -0,0 +1,6 @@
+symbols = [
+    "IONQ",
+    "RGTI",
+    "QBTS",
+    "QUBT",
+]
@@ -0,0 +1,212 @@
+"""Universe registry: named ticker lists, static or loaded from an index source.
+
+Static universes are the lists in `tickers/*.py`. Index universes (S&P 500,
+Nasdaq-100) are scraped from their Wikipedia constituent tables and kept in
+a local snapshot file (`cache/universes.json`), so the network is only hit
+when a snapshot is missing or older than its TTL, or on `refresh`. Until
+the first successful download, an index falls back to its bundled seed
+list (`tickers/snp.py`, `tickers/ndx.py`).
+"""
+import json
+import os
+import threading
+import time
+import typing as t
+import urllib.request
+from dataclasses import dataclass
+from io import StringIO
+from pathlib import Path
+
+from core.singleflight import SingleFlight
+
+from . import ai_energey, mags, ndx, quantum, robotics, snp, space, watchlist
+
+CACHE_PATH = Path(os.environ.get("PEGY_UNIVERSE_CACHE") or Path(__file__).resolve().parent.parent / "cache" / "universes.json")
+DEFAULT_TTL = 7 * 24 * 3600
+# after a failed download, keep serving the old list this long before retrying
+RETRY_AFTER = 3600
+# optional user watchlists: {"name": ["SYM", ...]} or {"name": {"label": ..., "symbols": [...]}}
+WATCHLISTS_PATH = Path(os.environ.get("PEGY_WATCHLISTS") or Path(__file__).resolve().parent.parent / "watchlists.json")
+USER_AGENT = "Mozilla/5.0 (pegy universe loader)"
+
+
+@dataclass
+class Universe:
+    """A named ticker list.
+
+    `seed` is used as-is for static universes. Index universes also have a
+    `url` and the `symbol_column` of the first HTML table there holding the
+    constituents; `members` combines other universes.
+    """
+
+    name: str
+    label: str
+    seed: t.Sequence[str] = ()
+    url: t.Optional[str] = None
+    symbol_column: str = "Symbol"
+    members: t.Sequence[str] = ()
+    ttl: float = DEFAULT_TTL
+
+
+def _yahoo_symbol(symbol: str) -> str:
+    """Index lists write share classes as `BRK.B`; Yahoo wants `BRK-B`."""
+    return symbol.strip().upper().replace(".", "-")
+
+
+def fetch_constituents(url: str, symbol_column: str, timeout: float = 20.0) -> t.List[str]:
+    """Download `url` and return the symbols of the first table with `symbol_column`."""
+    import pandas as pd
+
+    req = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
+    with urllib.request.urlopen(req, timeout=timeout) as resp:
+        html = resp.read().decode("utf-8", "replace")
+    for table in pd.read_html(StringIO(html)):
+        if symbol_column in table.columns:
+            symbols = [_yahoo_symbol(s) for s in table[symbol_column].dropna().astype(str)]
+            return list(dict.fromkeys(s for s in symbols if s))
+    raise ValueError(f"{url}: no table with a {symbol_column!r} column")
+
+
+class Registry:
+    """Named universes with a JSON snapshot cache for index constituents."""
+
+    def __init__(self, universes: t.Iterable[Universe], cache_path: t.Union[str, os.PathLike] = CACHE_PATH,
+                 fetch: t.Callable[[str, str], t.List[str]] = fetch_constituents):
+        self.universes = {u.name: u for u in universes}
+        self.cache_path = Path(cache_path)
+        self.fetch = fetch
+        self._snapshots: t.Optional[dict] = None
+        self._mtime = None
+        self._retry_at: t.Dict[str, float] = {}
+        self._lock = threading.Lock()
+        # one download per universe at a time, made outside `_lock`
+        self._flight = SingleFlight("universes")
+
+    def names(self) -> t.List[str]:
+        return list(self.universes)
+
+    def _load_snapshots(self) -> dict:
+        """The cached snapshots, re-read when another process (e.g. precompute.py) rewrote the file."""
+        try:
+            mtime = self.cache_path.stat().st_mtime
+        except OSError:
+            mtime = None
+        if self._snapshots is None or mtime != self._mtime:
+            try:
+                self._snapshots = json.loads(self.cache_path.read_text())
+            except (OSError, ValueError):
+                self._snapshots = {}
+            self._mtime = mtime
+        return self._snapshots
+
+    def _save_snapshots(self):
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.cache_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self._snapshots, indent=1, sort_keys=True))
+        os.replace(tmp, self.cache_path)
+        self._mtime = self.cache_path.stat().st_mtime
+
+    def info(self, name: str) -> dict:
+        """`{"count", "fetched_at", "source"}` for `name`'s current list."""
+        universe = self.universes[name]
+        with self._lock:
+            snap = self._load_snapshots().get(name)
+        if universe.url is None:
+            return {"count": len(self.get(name)), "fetched_at": None, "source": "static"}
+        if snap is None:
+            return {"count": len(universe.seed), "fetched_at": None, "source": "seed"}
+        return {"count": len(snap["symbols"]), "fetched_at": snap["fetched_at"], "source": universe.url}
+
+    def get(self, name: str, refresh: bool = False, now: t.Optional[float] = None) -> t.List[str]:
+        """Return `name`'s tickers.
+
+        Index universes are re-downloaded when their snapshot is older than
+        the TTL, or always with `refresh`; if that fails, the old snapshot
+        (or the seed list) is returned.
+        """
+        universe = self.universes[name]
+        if universe.members:
+            return list(dict.fromkeys(tk for m in universe.members for tk in self.get(m, refresh, now)))
+        if universe.url is None:
+            return list(universe.seed)
+
+        now = time.time() if now is None else now
+        with self._lock:
+            snap = self._load_snapshots().get(name)
+            fresh = snap is not None and now - snap["fetched_at"] < universe.ttl
+            if not refresh and (fresh or now < self._retry_at.get(name, 0)):
+                return list(snap["symbols"]) if snap else list(universe.seed)
+        # concurrent callers for `name` share one download; other lookups go on meanwhile
+        self._flight.do(name, self._download, universe, now)
+        with self._lock:
+            snap = self._load_snapshots().get(name)
+        return list(snap["symbols"]) if snap else list(universe.seed)
+
+    def _download(self, universe: Universe, now: float):
+        """Fetch `universe`'s constituents and store them, or back off after a failure."""
+        try:
+            symbols = self.fetch(universe.url, universe.symbol_column)
+        except Exception:
+            symbols = None
+        with self._lock:
+            if symbols:
+                self._load_snapshots()[universe.name] = {"symbols": symbols, "fetched_at": now}
+                self._retry_at.pop(universe.name, None)
+                try:
+                    self._save_snapshots()
+                except OSError:
+                    pass
+            else:
+                self._retry_at[universe.name] = now + RETRY_AFTER
+
+    def refresh(self, names: t.Optional[t.Iterable[str]] = None) -> t.Dict[str, int]:
+        """Re-download index universes (all by default); return their sizes."""
+        names = [n for n in (names or self.universes) if self.universes[n].url]
+        return {n: len(self.get(n, refresh=True)) for n in names}
+
+
+BUILTIN = [
+    Universe("watchlist", "📋 Watchlist", watchlist.symbols),
+    Universe("mags", "⭐ Magnificent 7", mags.symbols),
+    Universe("ai_energy", "⚡ YOLO - AI Energy", ai_energey.symbols),
+    Universe("quantum", "🧬 YOLO - Quantum Computing", quantum.symbols),
+    Universe("robotics", "🤖 YOLO - Robotics", robotics.symbols),
+    Universe("space", "🚀 YOLO - Space Technology", space.symbols),
+    Universe("snp", "📈 S&P 500 Constituents", snp.symbols,
+             url="https://en.wikipedia.org/wiki/List_of_S%26P_500_companies"),
+    Universe("ndx", "📊 Nasdaq-100", ndx.symbols,
+             url="https://en.wikipedia.org/wiki/Nasdaq-100", symbol_column="Ticker"),
+    # every themed list (not the watchlist or the indexes)
+    Universe("portfolio", "Portfolio", members=("mags", "ai_energy", "quantum", "robotics", "space")),
+]
+
+
+
+def load_watchlists(path: t.Union[str, os.PathLike] = WATCHLISTS_PATH) -> t.List[Universe]:
+    """Static universes for the user watchlists in `path` (none if it doesn't exist)."""
+    try:
+        doc = json.loads(Path(path).read_text())
+    except (OSError, ValueError):
+        return []
+    out = []
+    for name, spec in doc.items():
+        if isinstance(spec, dict):
+            label, symbols = spec.get("label") or name, spec.get("symbols") or []
+        else:
+            label, symbols = name, spec
+        out.append(Universe(name, label, [_yahoo_symbol(s) for s in symbols if s.strip()]))
+    return out
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> Registry:
+    """Return the process-wide registry: built-in universes plus user watchlists."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            # user watchlists go before the aggregate Portfolio tab
+            _registry = Registry(BUILTIN[:-1] + load_watchlists() + BUILTIN[-1:])
+        return _registry
@@ -0,0 +1,4 @@
+symbols = [
+    "SYM",
+    "ISRG",
+]
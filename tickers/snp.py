@@ -1,6 +1,5 @@
-import pandas as pd
-
-# AUTO-GENERATED: S&P 500 symbols (updated at runtime)
+# Seed list for the S&P 500 universe; the registry (`tickers/registry.py`)
+# replaces it with the full constituent list once it has been downloaded.
 symbols = [
     "AAPL",
     "MSFT",
@@ -0,0 +1,6 @@
+symbols = [
+    "ASTS",
+    "LMT",
+    "PL",
+    "RKLB",
+]
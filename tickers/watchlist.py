@@ -0,0 +1,17 @@
+symbols = [
+    "ONDS",
+    "OSCR",
+    "PLTR",
+    "RDW",
+    "AVGO",
+    "COST",
+    "INTC",
+    "AMD",
+    "WMT",
+    "V",
+    "DDOG",
+    "SNOW",
+    "COIN",
+    "RDDT",
+    "CRWV",
+]